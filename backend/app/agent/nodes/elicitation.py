@@ -12,6 +12,8 @@ import json
 from difflib import SequenceMatcher
 from typing import Optional, List
 
+import numpy as np
+
 from langchain_core.runnables.config import RunnableConfig
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from app.agent.llm_config import get_model, extract_text, LLMProvider
@@ -30,11 +32,32 @@ from app.agent.prompts.b02_elicitation_generate_business_need_prompt import ELIC
 from app.agent.prompts.b03_elicitation_answer_contextual_questions_prompt import ELICITATION_ANSWER_CONTEXTUAL_QUESTIONS_PROMPT
 from app.agent.prompts.b04_elicitation_answer_whatif_questions_prompt import ELICITATION_ANSWER_WHATIF_QUESTIONS_PROMPT
 from app.services.embedding_service import (
+    ProjectEmbeddings,
     generate_embeddings,
-    fetch_existing_embeddings,
+    get_project_embeddings,
+    compute_max_similarities,
     select_most_diverse,
     select_most_diverse_among,
-    is_similar_to_existing,
+    max_similarities_to_project,
+    SIMILARITY_THRESHOLD,
+)
+from app.services.generation_stats import (
+    FIXED_OVERSAMPLE_FACTOR,
+    OVERSAMPLE_MIN,
+    TOP_UP_ROUNDS,
+    candidate_count,
+    estimate_tokens_saved,
+    get_oversampling_factor,
+    record_generation,
+)
+from app.services.candidate_pool import (
+    BUSINESS_NEED_POOL,
+    PooledCandidate,
+    context_version,
+    draw_candidates,
+    add_candidates,
+    mark_candidates,
+    record_run,
 )
 
 from app.logging_config import get_logger
@@ -74,8 +97,10 @@ async def refine_business_needs(
     statements using LLM + project context.
 
     After refinement, checks each business need against existing embeddings in the DB.
-    If a refined business need is too similar to an existing one, falls back to
-    generate_business_needs (3 candidates, pick most diverse).
+    Refined business needs too similar to an existing one are replaced in a
+    single generate_business_needs call sized to the number of collisions;
+    replacements are picked jointly so they differ from each other and from
+    the refined needs that were kept.
 
     Returns (refined_list, similarity_percentages).
     """
@@ -113,24 +138,32 @@ async def refine_business_needs(
 
         # Check refined impacts against existing embeddings in DB
         if project_id:
-            existing_rows = await fetch_existing_embeddings(project_id)
-            existing_embs = [row["embedding"] for row in existing_rows if row.get("embedding")]
+            existing = await get_project_embeddings(project_id)
 
-            if existing_embs:
-                logger.info("Checking %d refined business need(s) against %d existing embedding(s)", len(results), len(existing_embs), extra={"node": "elicitation"})
+            # An empty newest-rows window means the project has no embeddings at all
+            if len(existing):
+                logger.info("Checking %d refined business need(s) against existing embeddings", len(results), extra={"node": "elicitation"})
                 try:
                     refined_embeddings = await generate_embeddings(results)
                 except Exception as e:
                     logger.error("Error generating embeddings for similarity check: %s", e, extra={"node": "elicitation"}, exc_info=True)
                     return results, similarities
 
-                for i, (refined_emb, refined_text) in enumerate(zip(refined_embeddings, list(results))):
-                    if is_similar_to_existing(refined_emb, existing_embs):
-                        logger.debug("Refined business need #%d is too similar to existing. Falling back to generation...", i+1, extra={"node": "elicitation"})
-                        fallback = await generate_business_needs(1, data_context, model_provider, project_id)
-                        if fallback:
-                            results[i] = fallback[0]
-                            similarities[i] = 0  # auto-generated, not user-refined
+                max_sims = await max_similarities_to_project(project_id, refined_embeddings)
+                collisions = [i for i in range(len(results)) if max_sims is not None and max_sims[i] >= SIMILARITY_THRESHOLD]
+                for i in collisions:
+                    logger.debug("Refined business need #%d is too similar to existing (max_similarity=%.4f). Falling back to generation...", i+1, max_sims[i], extra={"node": "elicitation"})
+
+                if collisions:
+                    kept_embeddings = [refined_embeddings[i] for i in range(len(results)) if i not in collisions]
+                    fallback = await generate_business_needs(
+                        len(collisions), data_context, model_provider, project_id,
+                        existing=existing, avoid_embeddings=kept_embeddings,
+                    )
+                    logger.info("Replaced %d of %d colliding business need(s) with one generation call", len(fallback), len(collisions), extra={"node": "elicitation"})
+                    for i, replacement in zip(collisions, fallback):
+                        results[i] = replacement
+                        similarities[i] = 0  # auto-generated, not user-refined
 
         return results, similarities
 
@@ -139,29 +172,25 @@ async def refine_business_needs(
         return list(brief_descriptions), [100] * len(brief_descriptions)
 
 
-async def generate_business_needs(
-    quantity: int,
+async def _generate_candidates(
+    count: int,
     data_context: "DataContext",
     model_provider: LLMProvider,
-    project_id: Optional[str] = None,
+    project_id: Optional[str],
+    existing: Optional[ProjectEmbeddings],
+    extra_exclusions: Optional[List[str]] = None,
 ) -> List[str]:
-    """
-    Generate business need statements from scratch using LLM +
-    project context. Generates quantity*3 candidates, then selects the
-    `quantity` most diverse via embedding similarity against existing
-    requirements in the database. Returns a list of business need strings.
-    """
-    candidate_count = quantity * 3
-    logger.info("Generating %d candidates (quantity=%d x 3)", candidate_count, quantity, extra={"node": "elicitation"})
-
+    """Ask the LLM for `count` business need candidates, excluding the project's most diverse existing ones
+    (and `extra_exclusions`, e.g. candidates of an earlier round)."""
     # Build exclusion list from existing business needs (top 10 most diverse among themselves)
     exclusion_list_text = ""
     if project_id:
-        existing_rows = await fetch_existing_embeddings(project_id)
-        existing_with_text = [r for r in existing_rows if r.get("embedding") and r.get("business_need")]
-        if existing_with_text:
-            texts = [r["business_need"] for r in existing_with_text]
-            embs = [r["embedding"] for r in existing_with_text]
+        if existing is None:
+            existing = await get_project_embeddings(project_id)
+        with_text = [i for i, text in enumerate(existing.texts) if text]
+        if with_text:
+            texts = [existing.texts[i] for i in with_text]
+            embs = existing.matrix[with_text]
             max_exclusion = min(10, len(texts))
             diverse_indices = select_most_diverse_among(texts, embs, max_exclusion)
             exclusion_items = [texts[i] for i in diverse_indices]
@@ -169,9 +198,12 @@ async def generate_business_needs(
             for item in exclusion_items:
                 logger.debug("  - %s", item, extra={"node": "elicitation"})
             exclusion_list_text = "\n".join(f"- {item}" for item in exclusion_items)
+    if extra_exclusions:
+        extra_text = "\n".join(f"- {item}" for item in extra_exclusions)
+        exclusion_list_text = f"{exclusion_list_text}\n{extra_text}" if exclusion_list_text else extra_text
 
     prompt = get_prompt(ELICITATION_GENERATE_BUSINESS_NEED_PROMPT, data_context.language).format(
-        quantity=candidate_count,
+        quantity=count,
         project_summary=data_context.project_summary,
         domain=data_context.domain,
         business_objective=data_context.business_objective,
@@ -186,37 +218,136 @@ async def generate_business_needs(
         response = await model.ainvoke([HumanMessage(content=prompt)])
         logger.debug("Raw LLM response: %s", response.content, extra={"node": "elicitation"})
         raw = _strip_markdown_fences(extract_text(response.content).strip())
-        candidates: List[str] = json.loads(raw)
+        return json.loads(raw) or []
     except (json.JSONDecodeError, Exception) as e:
         logger.error("Error generating business needs: %s", e, extra={"node": "elicitation"}, exc_info=True)
         return []
 
-    if not candidates:
-        return []
 
-    logger.info("Got %d candidates. Selecting %d most diverse...", len(candidates), quantity, extra={"node": "elicitation"})
+async def _draw_pooled_candidates(project_id: str, version: str, limit: int) -> tuple[List[PooledCandidate], Optional[np.ndarray]]:
+    """Draw pooled candidates and drop those that now collide with persisted requirements.
 
-    # Generate embeddings for all candidates
+    Returns the usable candidates and their max similarity to the project (None when it has no embeddings).
+    """
     try:
-        candidate_embeddings = await generate_embeddings(candidates)
+        pooled = await draw_candidates(project_id, version, limit)
     except Exception as e:
-        logger.error("Error generating embeddings, falling back to first %d: %s", quantity, e, extra={"node": "elicitation"}, exc_info=True)
-        return candidates[:quantity]
+        logger.error("Error drawing pooled candidates: %s", e, extra={"node": "elicitation"}, exc_info=True)
+        return [], None
+    if not pooled:
+        return [], None
+
+    # Requirements persisted since the candidates were pooled may now be near-duplicates
+    max_sims = await max_similarities_to_project(project_id, [c.embedding for c in pooled])
+    if max_sims is None:
+        return pooled, None
+    stale = [c.id for c, sim in zip(pooled, max_sims) if sim >= SIMILARITY_THRESHOLD]
+    if stale:
+        logger.info("Rejecting %d pooled candidate(s) now too similar to existing requirements", len(stale), extra={"node": "elicitation"})
+        try:
+            await mark_candidates(stale, "rejected")
+        except Exception as e:
+            logger.error("Error rejecting pooled candidates: %s", e, extra={"node": "elicitation"}, exc_info=True)
+    keep = max_sims < SIMILARITY_THRESHOLD
+    return [c for c, ok in zip(pooled, keep) if ok], max_sims[keep]
+
+
+async def generate_business_needs(
+    quantity: int,
+    data_context: "DataContext",
+    model_provider: LLMProvider,
+    project_id: Optional[str] = None,
+    existing: Optional[ProjectEmbeddings] = None,
+    avoid_embeddings: Optional[List[List[float]]] = None,
+) -> List[str]:
+    """
+    Generate business need statements from scratch using LLM +
+    project context. Generates oversampled candidates, then selects the
+    `quantity` most diverse via embedding similarity against existing
+    requirements in the database. Returns a list of business need strings.
+
+    Candidates pooled by earlier runs on the same project context are used
+    first; the LLM is only asked for the shortfall, oversampled by a
+    per-project factor (see generation_stats) with a top-up round when too
+    few candidates pass the duplicate threshold. Candidates that are not
+    selected go back to the pool.
+
+    `existing` reuses project embeddings the caller already fetched.
+    `avoid_embeddings` (business needs already chosen in this run) switches to
+    joint selection: candidates must differ from them, from the project and
+    from each other.
+    """
+    if project_id and existing is None:
+        existing = await get_project_embeddings(project_id)
+    has_existing = existing is not None and len(existing) > 0
+    factor = await get_oversampling_factor(project_id, has_existing) if project_id else OVERSAMPLE_MIN
+
+    pooled: List[PooledCandidate] = []
+    pooled_sims: Optional[np.ndarray] = None
+    version: Optional[str] = None
+    if project_id and BUSINESS_NEED_POOL:
+        version = context_version(data_context)
+        pooled, pooled_sims = await _draw_pooled_candidates(project_id, version, candidate_count(quantity, factor))
+        logger.info("Candidate pool: %d usable candidate(s) for context %s", len(pooled), version[:8], extra={"node": "elicitation"})
+
+    # Generate for the shortfall; top up while too few candidates pass the duplicate threshold
+    shortfall = max(0, quantity - len(pooled))
+    generated: List[str] = []
+    generated_embeddings: List[List[float]] = []
+    generated_sims: List[float] = []
+    found_existing = pooled_sims is not None
+    requested = 0
+    needed = shortfall
+    for round_number in range(TOP_UP_ROUNDS + 1):
+        if needed <= 0:
+            break
+        count = candidate_count(needed, factor)
+        requested += count
+        logger.info("Generating %d candidates (%s=%d x %.2f)", count, "top-up" if round_number else "shortfall", needed, factor, extra={"node": "elicitation"})
+        batch = await _generate_candidates(count, data_context, model_provider, project_id, existing, extra_exclusions=generated)
+        if not batch:
+            break
+
+        try:
+            batch_embeddings = await generate_embeddings(batch)
+        except Exception as e:
+            fallback = [c.business_need for c in pooled] + generated + batch
+            logger.error("Error generating embeddings, falling back to first %d: %s", quantity, e, extra={"node": "elicitation"}, exc_info=True)
+            return fallback[:quantity]
+
+        # Max similarity of each candidate against every existing business need of the project
+        batch_sims = await max_similarities_to_project(project_id, batch_embeddings)
+        found_existing = found_existing or batch_sims is not None
+        generated += batch
+        generated_embeddings += list(batch_embeddings)
+        generated_sims += [float(x) for x in batch_sims] if batch_sims is not None else [0.0] * len(batch)
+        needed = shortfall - sum(1 for sim in generated_sims if sim < SIMILARITY_THRESHOLD)
+
+    candidates = [c.business_need for c in pooled] + generated
+    if not candidates:
+        return []
+    candidate_embeddings = [c.embedding for c in pooled] + generated_embeddings
+    if found_existing:
+        base_sims = pooled_sims if pooled_sims is not None else np.zeros(len(pooled), dtype=np.float32)
+        max_similarities = np.concatenate([base_sims, np.asarray(generated_sims, dtype=np.float32)])
+    else:
+        max_similarities = None
 
-    # Fetch existing embeddings from the database
-    existing_rows = await fetch_existing_embeddings(project_id) if project_id else []
-    existing_embeddings = [row["embedding"] for row in existing_rows if row.get("embedding")]
-    logger.info("Found %d existing embedding(s) in DB for comparison", len(existing_embeddings), extra={"node": "elicitation"})
+    logger.info("Got %d candidates (%d pooled, %d generated). Selecting %d most diverse...", len(candidates), len(pooled), len(generated), quantity, extra={"node": "elicitation"})
+    logger.info("Compared %d candidate(s) against existing embeddings: %s", len(candidates), "found" if max_similarities is not None else "none in DB", extra={"node": "elicitation"})
 
-    # Select the most diverse candidates
-    selected_indices = select_most_diverse(candidates, candidate_embeddings, existing_embeddings, quantity)
+    # Select the most diverse candidates (max similarities computed once, reused for logging)
+    if avoid_embeddings is not None:
+        avoid_sims = compute_max_similarities(candidate_embeddings, avoid_embeddings)
+        max_similarities = avoid_sims if max_similarities is None else np.maximum(max_similarities, avoid_sims)
+        selected_indices = select_most_diverse(candidates, candidate_embeddings, [], quantity, max_similarities, jointly=True)
+    else:
+        selected_indices = select_most_diverse(candidates, candidate_embeddings, [], quantity, max_similarities)
 
     # Log all candidates with their max similarity against existing embeddings
-    if existing_embeddings:
-        from app.services.embedding_service import _cosine_similarity
+    if max_similarities is not None:
         logger.info("All candidates and their max similarity to existing embeddings:", extra={"node": "elicitation"})
-        for i, (text, c_emb) in enumerate(zip(candidates, candidate_embeddings)):
-            max_sim = max(_cosine_similarity(c_emb, e_emb) for e_emb in existing_embeddings)
+        for i, (text, max_sim) in enumerate(zip(candidates, max_similarities)):
             marker = " <-- SELECTED" if i in selected_indices else ""
             logger.debug("[%d] (max_sim=%.4f) %s%s", i, max_sim, text, marker, extra={"node": "elicitation"})
     else:
@@ -225,9 +356,48 @@ async def generate_business_needs(
             marker = " <-- SELECTED" if i in selected_indices else ""
             logger.debug("[%d] %s%s", i, text, marker, extra={"node": "elicitation"})
 
+    if version is not None:
+        await _update_pool(project_id, version, pooled, generated, generated_embeddings, selected_indices, max_similarities)
+
+    if project_id and generated:
+        passed = sum(1 for sim in generated_sims if sim < SIMILARITY_THRESHOLD)
+        selected_generated = sum(1 for i in selected_indices if i >= len(pooled))
+        await record_generation(project_id, len(generated), passed, selected_generated)
+        fixed = shortfall * FIXED_OVERSAMPLE_FACTOR
+        saved = estimate_tokens_saved(fixed, requested, generated)
+        logger.info("Oversampling x%.2f: requested %d candidate(s) vs %d at fixed x%d (~%d output tokens saved), %d/%d passed", factor, requested, fixed, FIXED_OVERSAMPLE_FACTOR, saved, passed, len(generated), extra={"node": "elicitation"})
+
     return [candidates[i] for i in selected_indices]
 
 
+async def _update_pool(
+    project_id: str,
+    version: str,
+    pooled: List[PooledCandidate],
+    generated: List[str],
+    generated_embeddings,
+    selected_indices: List[int],
+    max_similarities,
+) -> None:
+    """Mark used pooled candidates, return the unused ones, pool unselected fresh ones and log the run's pool hit rate."""
+    selected = set(selected_indices)
+    used_ids = [c.id for i, c in enumerate(pooled) if i in selected]
+    unused_ids = [c.id for i, c in enumerate(pooled) if i not in selected]
+    leftovers = [
+        j for j in range(len(generated))
+        if len(pooled) + j not in selected
+        and (max_similarities is None or max_similarities[len(pooled) + j] < SIMILARITY_THRESHOLD)
+    ]
+    try:
+        await mark_candidates(used_ids, "selected")
+        await mark_candidates(unused_ids, "pooled")
+        await add_candidates(project_id, version, [generated[j] for j in leftovers], [generated_embeddings[j] for j in leftovers])
+    except Exception as e:
+        logger.error("Error updating candidate pool: %s", e, extra={"node": "elicitation"}, exc_info=True)
+
+    hit_rate = record_run(len(selected_indices), len(used_ids))
+    logger.info("Candidate pool hit rate %.0f%% (%d/%d from pool, %d pooled for later)", hit_rate * 100, len(used_ids), len(selected_indices), len(leftovers), extra={"node": "elicitation"})
+
 
 async def _answer_contextual_questions(
     data_context: DataContext,
@@ -8,12 +8,11 @@ from the knowledge graph built by the Elicitation node.
 
 import asyncio
 import json
-import re
 from typing import Optional, List, Dict, Any
 
 from langchain_core.runnables.config import RunnableConfig
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from app.agent.llm_config import get_model, extract_text, LLMProvider
+from langchain_core.messages import AIMessage, SystemMessage
+from app.agent.llm_config import get_model, LLMProvider
 from langgraph.types import Command
 from copilotkit.langgraph import copilotkit_emit_state, copilotkit_customize_config
 
@@ -22,26 +21,13 @@ from app.agent.utils.context_utils import extract_copilotkit_context
 from app.agent.prompts.factory import get_prompt
 from app.agent.models.data_context import DataContext, ConjecturalRequirement
 from app.agent.prompts.d01_specification_conjectural_specification_prompt import SPECIFICATION_CONJECTURAL_SPECIFICATION_PROMPT
-from app.agent.prompts.d02_specification_conjectural_refinement_prompt import SPECIFICATION_CONJECTURAL_REFINEMENT_PROMPT
+from app.agent.utils.conjectural_generation import build_refinement_prompt, generate_requirement
+from app.agent.utils.speculative_refinement import speculative_refinement_enabled, draft_key, take_draft
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-def _format_evaluation(evaluation) -> str:
-    """Format an Evaluation object as readable text for the refinement prompt."""
-    if evaluation is None:
-        return "No evaluation available."
-    lines = []
-    for criterion, score in evaluation.scores.items():
-        justification = evaluation.justifications.get(criterion, "")
-        line = f"- **{criterion}**: {score}/5"
-        if justification:
-            line += f' — "{justification}"'
-        lines.append(line)
-    return "\n".join(lines)
-
-
 def _format_requirements(existing_requirements: List[Dict[str, Any]]) -> str:
     """Format requirements list as readable text for prompts."""
     if not existing_requirements:
@@ -52,15 +38,6 @@ def _format_requirements(existing_requirements: List[Dict[str, Any]]) -> str:
     )
 
 
-def _strip_markdown_fences(raw: str) -> str:
-    """Remove markdown code fences from LLM response if present."""
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
-        if raw.endswith("```"):
-            raw = raw[:-3].strip()
-    return raw
-
-
 async def _task_generate(
     state: WorkflowState,
     config: RunnableConfig,
@@ -83,6 +60,7 @@ async def _task_generate(
 
     spec_attempt = state.get("spec_attempt", 0)
     logger.info("Current spec_attempt: %s", spec_attempt, extra={"node": "specification"})
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
 
     for i, cd in enumerate(data_context.conjectural_data):
         req_num = i + 1
@@ -106,33 +84,18 @@ async def _task_generate(
             )
         else:
             last_cr = cd.conjectural_requirements[-1]
-            prompt = get_prompt(SPECIFICATION_CONJECTURAL_REFINEMENT_PROMPT, data_context.language).format(
-                project_summary=project_summary,
-                domain=domain,
-                stakeholder=stakeholder,
-                business_objective=business_objective,
-                prev_desired_behavior=last_cr.ferc.desired_behavior,
-                prev_business_need=last_cr.ferc.business_need,
-                prev_uncertainties=last_cr.ferc.uncertainty,
-                prev_solution_assumption=last_cr.qess.solution_assumption,
-                prev_uncertainty_evaluated=last_cr.qess.uncertainty_evaluated,
-                prev_observation_analysis=last_cr.qess.observation_analysis,
-                evaluation_summary=_format_evaluation(last_cr.llm_evaluation),
-                language=data_context.language,
-            )
+            prompt = build_refinement_prompt(data_context, last_cr)
             logger.info("Using refinement prompt for requirement #%s (attempt %s)", req_num, spec_attempt + 1, extra={"node": "specification"})
 
         try:
-            response = await model.ainvoke([HumanMessage(content=prompt)])
-            logger.debug("Raw LLM response for requirement #%s: %s", req_num, response.content, extra={"node": "specification"})
-            raw_content = _strip_markdown_fences(extract_text(response.content).strip())
-            try:
-                raw_dict: Dict[str, Any] = json.loads(raw_content)
-            except json.JSONDecodeError:
-                # Repair: LLM occasionally omits the opening quote for string values
-                fixed = re.sub(r'(":\s+)([a-zA-ZáàâãéèêíïóôõöúüçñÁÀÂÃÉÈÊÍÏÓÔÕÖÚÜÇÑ])', r'\1"\2', raw_content)
-                raw_dict = json.loads(fixed)
-            cr = ConjecturalRequirement.model_validate(raw_dict)
+            cr = None
+            if spec_attempt > 0 and speculative_refinement_enabled():
+                key = draft_key(thread_id, req_num, cd.conjectural_requirements[-1].attempt)
+                cr = await take_draft(key, prompt)
+                if cr is not None:
+                    logger.info("Using speculative draft for requirement #%s", req_num, extra={"node": "specification"})
+            if cr is None:
+                cr = await generate_requirement(model, prompt, req_num)
             cr.attempt = len(cd.conjectural_requirements) + 1
             cd.conjectural_requirements.append(cr)
 
@@ -16,11 +16,19 @@ from langgraph.types import Command, interrupt
 from copilotkit.langgraph import copilotkit_customize_config, copilotkit_emit_state, copilotkit_emit_message
 
 from app.agent.state import WorkflowState
-from app.agent.models.data_context import DataContext, Evaluation
+from app.agent.models.data_context import DataContext, ConjecturalRequirement, Evaluation
 from app.agent.utils.context_utils import extract_copilotkit_context
 from app.agent.prompts.factory import get_prompt
 from app.agent.prompts.e01_validation_system_prompt import VALIDATION_SYSTEM_PROMPT
-from app.services.conjectural_persistence import persist_conjectural_data
+from app.agent.utils.conjectural_generation import build_refinement_prompt, generate_requirement
+from app.agent.utils.speculative_refinement import (
+    SpeculativeDraft,
+    speculative_refinement_enabled,
+    draft_key,
+    schedule_draft,
+    peek_judge_evaluation,
+)
+from app.services.persistence_outbox import save_conjectural_data
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -32,6 +40,77 @@ def show_requirements(requirement_ids: str):
     return {"success": True}
 
 
+def _get_judge_model(model_judge_provider: str):
+    """Return the LLM-as-Judge model for the configured provider."""
+    judge_model_name = DEFAULT_GEMINI_MODEL if model_judge_provider == "gemini" else DEFAULT_AZURE_OPENAI_JUDGE_MODEL
+    return get_model(provider=model_judge_provider, model=judge_model_name)
+
+
+def _build_validation_prompt(data_context: DataContext, req_num: int, cr: ConjecturalRequirement) -> str:
+    """Build the LLM-as-Judge prompt for a single conjectural requirement."""
+    return get_prompt(VALIDATION_SYSTEM_PROMPT, data_context.language).format(
+        project_summary=data_context.project_summary,
+        domain=data_context.domain,
+        stakeholder=data_context.stakeholder,
+        requirement_number=req_num,
+        desired_behavior=cr.ferc.desired_behavior,
+        business_need=cr.ferc.business_need,
+        uncertainties=cr.ferc.uncertainty,
+        solution_assumption=cr.qess.solution_assumption,
+        uncertainty_evaluated=cr.qess.uncertainty_evaluated,
+        observation_analysis=cr.qess.observation_analysis,
+        language=data_context.language,
+    )
+
+
+async def _judge_requirement(model, prompt: str) -> Evaluation:
+    """Invoke the LLM-as-Judge and parse its evaluation."""
+    response = await model.ainvoke([HumanMessage(content=prompt)])
+    raw_content = extract_text(response.content)
+    eval_result = json.loads(raw_content)
+    llm_eval = Evaluation.model_validate(eval_result)
+    llm_eval.compute_overall_score()
+    return llm_eval
+
+
+async def _speculate_refinement(
+    data_context: DataContext,
+    req_num: int,
+    cr: ConjecturalRequirement,
+    model_provider: str,
+    model_judge_provider: str,
+) -> SpeculativeDraft:
+    """Background task: judge attempt N and draft attempt N+1 from the judge feedback only."""
+    judge_model = _get_judge_model(model_judge_provider)
+    llm_eval = await _judge_requirement(judge_model, _build_validation_prompt(data_context, req_num, cr))
+
+    evaluated = cr.model_copy(update={"llm_evaluation": llm_eval})
+    prompt = build_refinement_prompt(data_context, evaluated)
+    spec_model = get_model(provider=model_provider, temperature=1)
+    requirement = await generate_requirement(spec_model, prompt, req_num)
+    return SpeculativeDraft(llm_evaluation=llm_eval, prompt=prompt, requirement=requirement)
+
+
+def _schedule_speculative_refinements(
+    config: RunnableConfig,
+    data_context: DataContext,
+    model_provider: str,
+    model_judge_provider: str,
+) -> None:
+    """Start one speculative judge + refinement task per requirement before suspending on the interrupt."""
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
+    # Snapshot the context: the node mutates data_context after resuming
+    snapshot = data_context.model_copy(deep=True)
+    for i, cd in enumerate(snapshot.conjectural_data):
+        if not cd.conjectural_requirements:
+            continue
+        cr = cd.conjectural_requirements[-1]
+        schedule_draft(
+            draft_key(thread_id, i + 1, cr.attempt),
+            _speculate_refinement(snapshot, i + 1, cr, model_provider, model_judge_provider),
+        )
+
+
 async def _task_evaluate(
     state: WorkflowState,
     config: RunnableConfig,
@@ -43,6 +122,10 @@ async def _task_evaluate(
 
     context = extract_copilotkit_context(state)
     require_evaluation = context['require_evaluation']
+    model_judge_provider = context.get("model_judge", "gemini")
+    spec_attempts = context.get("spec_attempts", 3)
+    speculate = speculative_refinement_enabled() and state.get("spec_attempt", 0) < spec_attempts
+    thread_id = (config or {}).get("configurable", {}).get("thread_id")
 
     # --- Step 1: Human evaluation (interrupt) ---
     if require_evaluation:
@@ -62,6 +145,10 @@ async def _task_evaluate(
                 "observation_analysis": cr.qess.observation_analysis,
             })
 
+        if speculate:
+            # Another attempt follows: draft it while the human is evaluating this one
+            _schedule_speculative_refinements(config, data_context, model_provider, model_judge_provider)
+
         logger.info("Sending %s requirements for human evaluation via interrupt", len(requirements_list), extra={"node": "validation"})
         human_evaluation_response = interrupt({
             "type": "hitl_req_approve",
@@ -104,10 +191,8 @@ async def _task_evaluate(
         logger.info("Resuming after interrupt — human evaluation already completed", extra={"node": "validation"})
 
     # --- Step 2: LLM-as-Judge evaluation ---
-    model_judge_provider = context.get("model_judge", "gemini")
     logger.info("Starting LLM-as-Judge evaluation (provider: %s) for %s requirements", model_judge_provider, len(data_context.conjectural_data), extra={"node": "validation"})
-    judge_model_name = DEFAULT_GEMINI_MODEL if model_judge_provider == "gemini" else DEFAULT_AZURE_OPENAI_JUDGE_MODEL
-    model = get_model(provider=model_judge_provider, model=judge_model_name)
+    model = _get_judge_model(model_judge_provider)
     for i, cd in enumerate(data_context.conjectural_data):
         req_num = i + 1
 
@@ -118,26 +203,14 @@ async def _task_evaluate(
         cr = cd.conjectural_requirements[-1]
         logger.info("LLM evaluating requirement #%s (attempt %s)", req_num, cr.attempt, extra={"node": "validation"})
 
-        prompt = get_prompt(VALIDATION_SYSTEM_PROMPT, data_context.language).format(
-            project_summary=data_context.project_summary,
-            domain=data_context.domain,
-            stakeholder=data_context.stakeholder,
-            requirement_number=req_num,
-            desired_behavior=cr.ferc.desired_behavior,
-            business_need=cr.ferc.business_need,
-            uncertainties=cr.ferc.uncertainty,
-            solution_assumption=cr.qess.solution_assumption,
-            uncertainty_evaluated=cr.qess.uncertainty_evaluated,
-            observation_analysis=cr.qess.observation_analysis,
-            language=data_context.language,
-        )
-
         try:
-            response = await model.ainvoke([HumanMessage(content=prompt)])
-            raw_content = extract_text(response.content)
-            eval_result = json.loads(raw_content)
-            llm_eval = Evaluation.model_validate(eval_result)
-            llm_eval.compute_overall_score()
+            llm_eval = None
+            if speculate:
+                llm_eval = await peek_judge_evaluation(draft_key(thread_id, req_num, cr.attempt))
+                if llm_eval is not None:
+                    logger.info("Reusing speculative judge evaluation for requirement #%s", req_num, extra={"node": "validation"})
+            if llm_eval is None:
+                llm_eval = await _judge_requirement(model, _build_validation_prompt(data_context, req_num, cr))
             cr.llm_evaluation = llm_eval
             logger.info("Requirement #%s evaluated (overall: %s/5)", req_num, llm_eval.overall_score, extra={"node": "validation"})
             for criterion, score in llm_eval.scores.items():
@@ -151,11 +224,11 @@ async def _task_evaluate(
         state["data_context"] = data_context.model_dump()
         await copilotkit_emit_state(config, state)
 
-    spec_attempts = context.get("spec_attempts", 3)
     if state.get("spec_attempt", 0) >= spec_attempts:
         data_context.rank_conjectural_requirements()
 
-        saved_ids = await persist_conjectural_data(context["current_project_id"], data_context, context.get("current_user_id"))
+        # Write-behind by default: codes and ids are reserved, the rows land in the background
+        saved_ids = await save_conjectural_data(context["current_project_id"], data_context, context.get("current_user_id"))
 
         msg_created_text = "📑 The following **conjectural requirements** were successfully created: " + ", ".join(saved_ids) + "."
         response = AIMessage(content=msg_created_text)
@@ -0,0 +1,76 @@
+"""
+Conjectural requirement generation shared by the workflow nodes.
+
+The Specification node drafts and refines requirements with these helpers;
+the Validation node reuses them to draft attempt N+1 speculatively while the
+run waits for the human evaluation.
+"""
+
+import json
+import re
+from typing import Any, Dict
+
+from langchain_core.messages import HumanMessage
+
+from app.agent.llm_config import extract_text
+from app.agent.models.data_context import DataContext, ConjecturalRequirement
+from app.agent.prompts.factory import get_prompt
+from app.agent.prompts.d02_specification_conjectural_refinement_prompt import SPECIFICATION_CONJECTURAL_REFINEMENT_PROMPT
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _format_evaluation(evaluation) -> str:
+    """Format an Evaluation object as readable text for the refinement prompt."""
+    if evaluation is None:
+        return "No evaluation available."
+    lines = []
+    for criterion, score in evaluation.scores.items():
+        justification = evaluation.justifications.get(criterion, "")
+        line = f"- **{criterion}**: {score}/5"
+        if justification:
+            line += f' — "{justification}"'
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _strip_markdown_fences(raw: str) -> str:
+    """Remove markdown code fences from LLM response if present."""
+    if raw.startswith("```"):
+        raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
+        if raw.endswith("```"):
+            raw = raw[:-3].strip()
+    return raw
+
+
+def build_refinement_prompt(data_context: DataContext, last_cr: ConjecturalRequirement) -> str:
+    """Build the refinement prompt for the next attempt from the previous attempt and its LLM-as-Judge feedback."""
+    return get_prompt(SPECIFICATION_CONJECTURAL_REFINEMENT_PROMPT, data_context.language).format(
+        project_summary=data_context.project_summary,
+        domain=data_context.domain,
+        stakeholder=data_context.stakeholder,
+        business_objective=data_context.business_objective,
+        prev_desired_behavior=last_cr.ferc.desired_behavior,
+        prev_business_need=last_cr.ferc.business_need,
+        prev_uncertainties=last_cr.ferc.uncertainty,
+        prev_solution_assumption=last_cr.qess.solution_assumption,
+        prev_uncertainty_evaluated=last_cr.qess.uncertainty_evaluated,
+        prev_observation_analysis=last_cr.qess.observation_analysis,
+        evaluation_summary=_format_evaluation(last_cr.llm_evaluation),
+        language=data_context.language,
+    )
+
+
+async def generate_requirement(model, prompt: str, req_num: int) -> ConjecturalRequirement:
+    """Invoke the LLM with a specification/refinement prompt and parse the conjectural requirement."""
+    response = await model.ainvoke([HumanMessage(content=prompt)])
+    logger.debug("Raw LLM response for requirement #%s: %s", req_num, response.content, extra={"node": "specification"})
+    raw_content = _strip_markdown_fences(extract_text(response.content).strip())
+    try:
+        raw_dict: Dict[str, Any] = json.loads(raw_content)
+    except json.JSONDecodeError:
+        # Repair: LLM occasionally omits the opening quote for string values
+        fixed = re.sub(r'(":\s+)([a-zA-ZáàâãéèêíïóôõöúüçñÁÀÂÃÉÈÊÍÏÓÔÕÖÚÜÇÑ])', r'\1"\2', raw_content)
+        raw_dict = json.loads(fixed)
+    return ConjecturalRequirement.model_validate(raw_dict)
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple, cast
 
 from app.services.supabase_client import get_async_supabase_client
+from app.services.repository import get_repository
 
 
 @dataclass
@@ -164,15 +165,8 @@ async def fetch_project_context_fields(project_id: Optional[str]) -> ProjectCont
     if not project_id:
         return ctx
 
-    supabase = await get_async_supabase_client()
-
     try:
-        result = await supabase.table("projects") \
-            .select("vision_extracted_text, summary, business_domain, stakeholder, business_objective, language") \
-            .eq("id", str(project_id)) \
-            .single() \
-            .execute()
-        data = result.data if isinstance(result.data, dict) else {}
+        data = await get_repository().get_project_context(str(project_id)) or {}
 
         raw_vision = data.get("vision_extracted_text")
         ctx.vision_extracted_text = str(raw_vision) if raw_vision is not None else None
@@ -0,0 +1,157 @@
+"""
+Speculative refinement — draft attempt N+1 while the run waits for the human.
+
+While the validation node is suspended on the ``hitl_req_approve`` interrupt,
+the next refinement attempt only depends on the LLM-as-Judge feedback for
+attempt N (the refinement prompt never reads the human scores). When enabled
+via ``SPECULATIVE_REFINEMENT=true``, the validation node schedules one
+background task per requirement that runs the judge and drafts the refinement.
+
+On resume:
+- Validation reuses the speculative judge evaluation instead of re-judging.
+- Specification accepts the draft only if its refinement prompt is identical
+  to the one it would build now; otherwise the draft is discarded and the
+  attempt is regenerated.
+
+Drafts live in process memory, so a resume served by another worker simply
+follows the regular path. Only a key scheduled in this process counts as a
+miss when its draft is gone (failed or expired), so the hit rate measures
+speculation, not routing.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Dict, Optional, Set
+
+from app.agent.models.data_context import ConjecturalRequirement, Evaluation
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Drafts not consumed within this window (abandoned runs) are dropped
+DRAFT_TTL_SECONDS = 60 * 60
+
+
+def speculative_refinement_enabled() -> bool:
+    """Return True when speculative refinement is switched on for this deployment."""
+    return os.environ.get("SPECULATIVE_REFINEMENT", "false").lower() == "true"
+
+
+@dataclass
+class SpeculativeDraft:
+    """Result of a background judge + refinement run for one requirement."""
+    llm_evaluation: Optional[Evaluation] = None
+    prompt: Optional[str] = None
+    requirement: Optional[ConjecturalRequirement] = None
+
+
+@dataclass
+class SpeculationStats:
+    """Counters used to measure how often speculation pays off."""
+    scheduled: int = 0
+    accepted: int = 0
+    discarded: int = 0
+    missed: int = 0
+    failed: int = 0
+    judge_reused: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        consumed = self.accepted + self.discarded + self.missed
+        return round(self.accepted / consumed, 4) if consumed else 0.0
+
+
+@dataclass
+class _Entry:
+    task: "asyncio.Task[SpeculativeDraft]"
+    created_at: float = field(default_factory=time.monotonic)
+
+
+_drafts: Dict[str, _Entry] = {}
+# Keys scheduled in this process and not consumed yet (outlive failed drafts)
+_scheduled_keys: Set[str] = set()
+_stats = SpeculationStats()
+
+
+def draft_key(thread_id: Optional[str], requirement_number: int, attempt: int) -> Optional[str]:
+    """Build the registry key for a requirement attempt (None when the run has no thread)."""
+    if not thread_id:
+        return None
+    return f"{thread_id}:{requirement_number}:{attempt}"
+
+
+def _purge_expired() -> None:
+    now = time.monotonic()
+    for key in [k for k, e in _drafts.items() if now - e.created_at > DRAFT_TTL_SECONDS]:
+        entry = _drafts.pop(key)
+        entry.task.cancel()
+        _scheduled_keys.discard(key)
+
+
+def schedule_draft(key: Optional[str], coro: Awaitable[SpeculativeDraft]) -> bool:
+    """Start a speculative draft in the background. No-op if one already exists for the key."""
+    _purge_expired()
+    if key is None or key in _drafts:
+        # Node re-executes from the top on resume — never schedule twice
+        coro.close()
+        return False
+
+    _drafts[key] = _Entry(task=asyncio.ensure_future(coro))
+    _scheduled_keys.add(key)
+    _stats.scheduled += 1
+    logger.info("Speculative refinement scheduled for %s", key, extra={"node": "speculation"})
+    return True
+
+
+async def _await_draft(entry: _Entry, key: str) -> Optional[SpeculativeDraft]:
+    try:
+        return await entry.task
+    except Exception:
+        logger.error("Speculative refinement failed for %s", key, extra={"node": "speculation"}, exc_info=True)
+        _stats.failed += 1
+        return None
+
+
+async def peek_judge_evaluation(key: Optional[str]) -> Optional[Evaluation]:
+    """Wait for a draft and return its judge evaluation, leaving the draft registered."""
+    entry = _drafts.get(key) if key else None
+    if entry is None:
+        return None
+
+    draft = await _await_draft(entry, key)
+    if draft is None or draft.llm_evaluation is None:
+        # Failed drafts cannot be accepted later — drop them now
+        _drafts.pop(key, None)
+        return None
+
+    _stats.judge_reused += 1
+    return draft.llm_evaluation
+
+
+async def take_draft(key: Optional[str], prompt: str) -> Optional[ConjecturalRequirement]:
+    """Consume the draft for `key` if it was built from exactly `prompt`; otherwise record a miss/discard."""
+    if key is None or key not in _scheduled_keys:
+        # Nothing was speculated here for this attempt
+        return None
+    _scheduled_keys.discard(key)
+    entry = _drafts.pop(key, None)
+    if entry is None:
+        _stats.missed += 1
+        return None
+
+    draft = await _await_draft(entry, key)
+    if draft is None or draft.requirement is None:
+        _stats.missed += 1
+        return None
+
+    if draft.prompt != prompt:
+        _stats.discarded += 1
+        logger.info("Speculative draft %s discarded — refinement inputs changed (hit rate %.2f)", key, _stats.hit_rate, extra={"node": "speculation"})
+        return None
+
+    _stats.accepted += 1
+    logger.info("Speculative draft %s accepted (hit rate %.2f)", key, _stats.hit_rate, extra={"node": "speculation"})
+    return draft.requirement
+
@@ -9,6 +9,10 @@ class Settings(BaseSettings):
     next_public_supabase_url: str
     next_public_supabase_anon_key: str
     supabase_service_role_key: str = ""  # Service role key for backend operations
+    # Shared PostgREST connection pool (HTTP/2, keep-alive)
+    supabase_pool_max_connections: int = 100
+    supabase_pool_max_keepalive: int = 20
+    supabase_http_timeout: float = 120
     
     # Google Gemini
     gemini_api_key: str
@@ -17,6 +21,8 @@ class Settings(BaseSettings):
     host: str = "localhost"
     port: int = 8000
     debug: bool = False
+    # Outbox / embedding backfill workers in the API lifespan (enable in one process only)
+    background_workers: bool = True
     
     # CORS
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"
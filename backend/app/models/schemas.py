@@ -73,7 +73,8 @@ class ProjectResponse(BaseModel):
     author_first_name: Optional[str] = None
     author_last_name: Optional[str] = None
     vision_document_name: Optional[str]
-    vision_extracted_text: Optional[str]
+    # Omitted (null) by the summary view of the project list
+    vision_extracted_text: Optional[str] = None
     summary: Optional[str] = None
     business_domain: Optional[str] = None
     business_objective: Optional[str] = None
@@ -4,12 +4,14 @@ Admin Router
 Handles admin-only user management endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Header
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Query, Response
+from typing import Literal, Optional
 from pydantic import BaseModel
 
-from app.routers.auth_utils import get_user_id_from_header
-from app.services.supabase_client import get_supabase_client
+from app.routers.auth_utils import get_user_id_from_header, verify_admin
+from app.routers.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, count_rows, fetch_page, set_page_headers
+from app.services.supabase_client import get_async_supabase_client
+from app.services.embedding_backfill import get_backfill_progress, request_backfill, reset_other_model_embeddings
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -29,35 +31,37 @@ class UserIdsRequest(BaseModel):
     user_ids: list[str]
 
 
-def _verify_admin(user_id: str) -> None:
-    """Verify that the user is an admin. Raises HTTPException if not."""
-    supabase = get_supabase_client()
-
-    result = supabase.table("profiles")\
-        .select("role")\
-        .eq("id", user_id)\
-        .single()\
-        .execute()
-
-    if not result.data or result.data.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-
 @router.get("/users", response_model=list[AdminUserResponse])
-async def list_users(authorization: Optional[str] = Header(None)):
-    """List all users with profile data. Admin only."""
+async def list_users(
+    response: Response,
+    role: Optional[Literal["admin", "user"]] = Query(None),
+    is_approved: Optional[bool] = Query(None),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Count"),
+    authorization: Optional[str] = Header(None),
+):
+    """List users with profile data, newest first, one keyset page at a time. Admin only."""
     user_id = get_user_id_from_header(authorization)
-    _verify_admin(user_id)
+    await verify_admin(user_id)
+
+    supabase = await get_async_supabase_client()
 
-    supabase = get_supabase_client()
+    def apply_filters(query):
+        if role is not None:
+            query = query.eq("role", role)
+        if is_approved is not None:
+            query = query.eq("is_approved", is_approved)
+        return query
 
     try:
-        result = supabase.table("profiles")\
-            .select("id, first_name, last_name, email, role, is_approved, created_at")\
-            .order("created_at", desc=True)\
-            .execute()
+        query = apply_filters(supabase.table("profiles")
+            .select("id, first_name, last_name, email, role, is_approved, created_at"))
+        users, next_cursor = await fetch_page(query, ("created_at", "id"), limit=limit, cursor=cursor, desc=True)
+        total = await count_rows(supabase, "profiles", apply_filters) if include_total else None
+        set_page_headers(response, next_cursor, total)
 
-        return result.data or []
+        return users
 
     except HTTPException:
         raise
@@ -72,12 +76,12 @@ async def approve_users(
 ):
     """Approve users by setting is_approved to true. Admin only."""
     user_id = get_user_id_from_header(authorization)
-    _verify_admin(user_id)
+    await verify_admin(user_id)
 
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("profiles")\
+        result = await supabase.table("profiles")\
             .update({"is_approved": True})\
             .in_("id", body.user_ids)\
             .execute()
@@ -95,15 +99,15 @@ async def revoke_approval(
 ):
     """Revoke user approval. Admin only. Cannot revoke own approval."""
     user_id = get_user_id_from_header(authorization)
-    _verify_admin(user_id)
+    await verify_admin(user_id)
 
     if user_id in body.user_ids:
         raise HTTPException(status_code=400, detail="You cannot revoke your own approval")
 
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        supabase.table("profiles")\
+        await supabase.table("profiles")\
             .update({"is_approved": False})\
             .in_("id", body.user_ids)\
             .execute()
@@ -121,15 +125,15 @@ async def promote_to_admin(
 ):
     """Promote users to admin role. Admin only. Cannot modify own role."""
     user_id = get_user_id_from_header(authorization)
-    _verify_admin(user_id)
+    await verify_admin(user_id)
 
     if user_id in body.user_ids:
         raise HTTPException(status_code=400, detail="You cannot modify your own role")
 
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        supabase.table("profiles")\
+        await supabase.table("profiles")\
             .update({"role": "admin", "is_approved": True})\
             .in_("id", body.user_ids)\
             .execute()
@@ -147,15 +151,15 @@ async def demote_to_user(
 ):
     """Demote users to user role. Admin only. Cannot modify own role."""
     user_id = get_user_id_from_header(authorization)
-    _verify_admin(user_id)
+    await verify_admin(user_id)
 
     if user_id in body.user_ids:
         raise HTTPException(status_code=400, detail="You cannot modify your own role")
 
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        supabase.table("profiles")\
+        await supabase.table("profiles")\
             .update({"role": "user"})\
             .in_("id", body.user_ids)\
             .execute()
@@ -164,3 +168,32 @@ async def demote_to_user(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to demote users: {str(e)}")
+
+
+@router.get("/embeddings/backfill")
+async def embedding_backfill_progress(authorization: Optional[str] = Header(None)):
+    """Progress of the business_need embedding backfill worker. Admin only."""
+    user_id = get_user_id_from_header(authorization)
+    await verify_admin(user_id)
+
+    return await get_backfill_progress()
+
+
+@router.post("/embeddings/backfill")
+async def trigger_embedding_backfill(
+    reembed_other_models: bool = Query(False, description="Also re-embed rows embedded with another model (after switching EMBEDDING_BACKEND)"),
+    authorization: Optional[str] = Header(None),
+):
+    """Start a backfill pass now instead of waiting for the next interval. Admin only."""
+    user_id = get_user_id_from_header(authorization)
+    await verify_admin(user_id)
+
+    if reembed_other_models:
+        try:
+            cleared = await reset_other_model_embeddings()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to reset embeddings: {str(e)}")
+        return {"success": True, "cleared": cleared}
+
+    request_backfill()
+    return {"success": True}
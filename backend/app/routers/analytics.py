@@ -0,0 +1,172 @@
+"""
+Analytics Router
+
+Evaluation quality across projects: org-wide (admins) or for one user.
+
+The numbers come from rollup tables maintained by a trigger on evaluation
+insert (`evaluation_analytics` RPC), so a request reads a few rows per day,
+user and provider instead of every evaluation:
+
+- agreement: LLM judge vs human on the same (requirement, attempt), per judge
+  provider and attempt
+- pass-rate trend: pass@k of the requirements created in each day/week/month
+- score distribution: criteria means and overall_score histogram per
+  (model, model_judge, evaluation type)
+"""
+
+from datetime import datetime, timedelta, timezone
+from math import sqrt
+from typing import Any, Dict, List, Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Header, Query
+
+from app.routers.auth_utils import get_user_id_from_header, verify_admin
+from app.services.evaluation_frame import CRITERIA
+from app.services.repository import get_repository
+
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+CONFUSION_KEYS = ("tp", "fp", "fn", "tn")
+# Additive columns of an `agreement` row
+AGREEMENT_SUMS = ("pairs", *CONFUSION_KEYS, "exact", "abs_diff", "llm_sum", "human_sum", "llm_sq", "human_sq", "llm_human")
+PASS_BUCKETS = ("pass_at_1", "pass_at_2", "pass_at_3", "fail")
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else 0
+
+
+def _agreement_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Agreement metrics from summed rollup counts.
+
+    Confusion counts are per criterion (score >= 4 positive, human = ground
+    truth); exact / mean_abs_diff / pearson_r compare the overall scores.
+    """
+    n = row["pairs"]
+    c = {k: row[k] for k in CONFUSION_KEYS}
+    observations = sum(c.values())
+    precision = _ratio(c["tp"], c["tp"] + c["fp"])
+    recall = _ratio(c["tp"], c["tp"] + c["fn"])
+    f1 = _ratio(2 * precision * recall, precision + recall)
+    # Cohen's kappa: observed agreement corrected by the agreement expected by chance
+    observed = _ratio(c["tp"] + c["tn"], observations)
+    expected = _ratio((c["tp"] + c["fp"]) * (c["tp"] + c["fn"]) + (c["fn"] + c["tn"]) * (c["fp"] + c["tn"]), observations ** 2)
+    kappa = _ratio(observed - expected, 1 - expected) if expected < 1 else None
+    # Pearson correlation of the criteria sums (same as of the overall scores)
+    covariance = n * row["llm_human"] - row["llm_sum"] * row["human_sum"]
+    spread = (n * row["llm_sq"] - row["llm_sum"] ** 2) * (n * row["human_sq"] - row["human_sum"] ** 2)
+    pearson = covariance / sqrt(spread) if n >= 3 and spread > 0 else None
+    return {
+        "pairs": n,
+        "confusion": c,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "accuracy": round(observed, 4),
+        "cohen_kappa": None if kappa is None else round(kappa, 4),
+        "exact_match_rate": round(_ratio(row["exact"], n), 4),
+        "mean_abs_diff": round(_ratio(row["abs_diff"], n * len(CRITERIA)), 2),
+        "pearson_r": None if pearson is None else round(pearson, 2),
+    }
+
+
+def _sum_rows(rows: List[Dict[str, Any]], keys) -> Dict[str, int]:
+    return {k: sum(int(row[k]) for row in rows) for k in keys}
+
+
+def _agreement_data(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Overall agreement, then per judge provider (overall and per attempt)."""
+    by_judge: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_judge.setdefault(row["model_judge"], []).append(row)
+
+    judges = []
+    for model_judge, judge_rows in by_judge.items():
+        judges.append({
+            "model_judge": model_judge,
+            **_agreement_entry(_sum_rows(judge_rows, AGREEMENT_SUMS)),
+            "attempts": [
+                {"attempt": row["attempt"], **_agreement_entry(_sum_rows([row], AGREEMENT_SUMS))}
+                for row in judge_rows
+            ],
+        })
+    return {"overall": _agreement_entry(_sum_rows(rows, AGREEMENT_SUMS)), "by_judge": judges}
+
+
+def _pass_rate_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    total = int(row["total"])
+    return {
+        "total": total,
+        **{
+            k: {"count": int(row[k]), "percent": round(int(row[k]) / total * 100, 1) if total else 0}
+            for k in PASS_BUCKETS
+        },
+    }
+
+
+def _pass_rate_trend_data(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One point per bucket with the LLM and human pass@k (None without evaluations of that type)."""
+    buckets: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        point = buckets.setdefault(row["bucket"], {"bucket": row["bucket"], "llm": None, "human": None})
+        if int(row["total"]) > 0:
+            point[row["type"]] = _pass_rate_entry(row)
+    return [point for point in buckets.values() if point["llm"] or point["human"]]
+
+
+def _score_distribution_data(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Criteria means and overall_score histogram per (model, model_judge, type)."""
+    result = []
+    for row in rows:
+        count = int(row["evaluations"])
+        if not count:
+            continue
+        means = {c: round(int(row[c]) / count, 2) for c in CRITERIA}
+        means["overall_score"] = round(sum(int(row[c]) for c in CRITERIA) / (len(CRITERIA) * count), 2)
+        histogram = sorted((int(criteria_sum), int(n)) for criteria_sum, n in (row.get("histogram") or {}).items())
+        result.append({
+            "model": row["model"],
+            "model_judge": row["model_judge"],
+            "type": row["type"],
+            "evaluations": count,
+            "means": means,
+            "histogram": [
+                {"overall_score": round(criteria_sum / len(CRITERIA), 2), "count": n}
+                for criteria_sum, n in histogram if n
+            ],
+        })
+    return result
+
+
+@router.get("/quality")
+async def quality_analytics(
+    user_id: Optional[UUID] = Query(None, description="Only this user's requirements (default: all users, admin only)"),
+    days: int = Query(90, ge=1, le=3650, description="Window, in days up to today (UTC)"),
+    bucket: Literal["day", "week", "month"] = Query("week", description="Granularity of the pass-rate trend"),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Judge vs human agreement, pass@k trend and score distributions by provider,
+    org-wide or for one user. Users may read their own analytics; everything
+    else is admin only.
+    """
+    caller_id = get_user_id_from_header(authorization)
+    if user_id is None or str(user_id) != caller_id:
+        await verify_admin(caller_id)
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    try:
+        agg = await get_repository().get_evaluation_analytics(since, str(user_id) if user_id else None, bucket)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute quality analytics: {e}")
+
+    return {
+        "user_id": str(user_id) if user_id else None,
+        "since": since.isoformat(),
+        "bucket": bucket,
+        "agreement": _agreement_data(agg.get("agreement") or []),
+        "pass_rate_trend": _pass_rate_trend_data(agg.get("pass_rate") or []),
+        "score_distribution": _score_distribution_data(agg.get("scores") or []),
+    }
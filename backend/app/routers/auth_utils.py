@@ -5,6 +5,8 @@ Shared authentication utilities for routers.
 from fastapi import HTTPException
 from typing import Optional
 
+from app.services.supabase_client import get_async_supabase_client
+
 
 def get_user_id_from_header(authorization: Optional[str]) -> str:
     """
@@ -22,3 +24,17 @@ def get_user_id_from_header(authorization: Optional[str]) -> str:
         raise HTTPException(status_code=401, detail="Invalid authorization format")
 
     return parts[1]
+
+
+async def verify_admin(user_id: str) -> None:
+    """Verify that the user is an admin. Raises HTTPException if not."""
+    supabase = await get_async_supabase_client()
+
+    result = await supabase.table("profiles")\
+        .select("role")\
+        .eq("id", user_id)\
+        .single()\
+        .execute()
+
+    if not result.data or result.data.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
@@ -4,12 +4,16 @@ Conjectural Requirements Router
 Handles endpoints for conjectural requirements and their evaluations.
 """
 
-from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from app.services.supabase_client import get_supabase_client
+from app.services.supabase_client import get_async_supabase_client
+from app.services.embedding_backfill import request_backfill
+from app.services.persistence_outbox import list_unsaved_entries, retry_failed_entry
+from app.routers.etags import conditional_response, get_change_versions, weak_etag
+from app.routers.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, count_rows, fetch_page, set_page_headers
 
 
 class ConjecturalRequirementUpdate(BaseModel):
@@ -24,6 +28,27 @@ class ConjecturalRequirementUpdate(BaseModel):
 
 router = APIRouter(prefix="/conjectural-requirements", tags=["conjectural-requirements"])
 
+# Projection profiles (?view=summary|full). The embedding vector is never returned.
+# summary: board fields + evaluation scores; full adds history_snapshot and the
+# evaluations' justifications / requirement_snapshot (served lazily by /{id}/history).
+REQUIREMENT_SUMMARY_COLUMNS = (
+    "id, project_id, cod_requirement, status, desired_behavior, business_need, uncertainty, "
+    "solution_assumption, uncertainty_evaluated, observation_analysis, user_id, created_at, updated_at"
+)
+EVALUATION_SUMMARY_COLUMNS = (
+    "id, requirement_id, type, attempt, ranking, unambiguous, completeness, atomicity, "
+    "verifiable, conforming, overall_score, created_at"
+)
+REQUIREMENT_VIEWS = {
+    "summary": f"{REQUIREMENT_SUMMARY_COLUMNS}, evaluations({EVALUATION_SUMMARY_COLUMNS})",
+    "full": (
+        f"{REQUIREMENT_SUMMARY_COLUMNS}, history_snapshot, "
+        f"evaluations({EVALUATION_SUMMARY_COLUMNS}, justifications, requirement_snapshot)"
+    ),
+}
+
+View = Literal["summary", "full"]
+
 
 def get_user_id_from_header(authorization: Optional[str]) -> str:
     """Extract user ID from authorization header."""
@@ -40,29 +65,47 @@ def get_user_id_from_header(authorization: Optional[str]) -> str:
 @router.get("/project/{project_id}")
 async def list_by_project(
     project_id: UUID,
+    request: Request,
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status (todo, inprogress, done)"),
+    author: Optional[UUID] = Query(None, description="Only requirements generated by this user"),
+    view: View = Query("summary", description="summary (board fields, scores) or full"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Count"),
     authorization: Optional[str] = Header(None),
 ):
     """
-    List conjectural requirements for a project.
-    Optionally filter by status.
+    List conjectural requirements for a project, one keyset page at a time.
+    Optionally filter by status and author.
     Returns requirements with their evaluations, ordered by created_at descending.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
-
-    try:
-        query = supabase.table("conjectural_requirements") \
-            .select("*, evaluations(*)") \
-            .eq("project_id", str(project_id)) \
-            .order("created_at", desc=True)
+    supabase = await get_async_supabase_client()
 
+    def apply_filters(query):
+        query = query.eq("project_id", str(project_id))
         if status is not None:
             query = query.eq("status", status)
+        if author is not None:
+            query = query.eq("user_id", str(author))
+        return query
 
-        result = query.execute()
-        return result.data
+    try:
+        versions = await get_change_versions(supabase, str(project_id))
+        if versions.get("project"):
+            not_modified = conditional_response(request, response, weak_etag(request, versions["project"]["version"]))
+            if not_modified:
+                return not_modified
+
+        query = apply_filters(supabase.table("conjectural_requirements").select(REQUIREMENT_VIEWS[view]))
+        rows, next_cursor = await fetch_page(query, ("created_at", "id"), limit=limit, cursor=cursor, desc=True)
+        total = await count_rows(supabase, "conjectural_requirements", apply_filters) if include_total else None
+        set_page_headers(response, next_cursor, total)
+        return rows
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -70,20 +113,56 @@ async def list_by_project(
         )
 
 
+@router.get("/project/{project_id}/unsaved")
+async def list_unsaved(project_id: UUID, authorization: Optional[str] = Header(None)):
+    """
+    Write-behind batches of a project whose requirements are not saved yet:
+    pending, being written, or failed after the last retry (with the REQ-C
+    codes announced to the user and the last error).
+    """
+    get_user_id_from_header(authorization)
+
+    try:
+        return await list_unsaved_entries(str(project_id))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to list unsaved conjectural requirements: {str(e)}",
+        )
+
+
+@router.post("/project/{project_id}/unsaved/{entry_id}/retry")
+async def retry_unsaved(project_id: UUID, entry_id: UUID, authorization: Optional[str] = Header(None)):
+    """Retry writing a failed batch of the project."""
+    get_user_id_from_header(authorization)
+
+    try:
+        requeued = await retry_failed_entry(str(project_id), str(entry_id))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retry unsaved conjectural requirements: {str(e)}",
+        )
+    if not requeued:
+        raise HTTPException(status_code=404, detail="No failed batch with this id in the project")
+    return {"success": True}
+
+
 @router.get("/user/has-any")
 async def has_any_conjectural(authorization: Optional[str] = Header(None)):
     """Check if the authenticated user has at least one conjectural requirement."""
     user_id = get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("conjectural_requirements") \
-            .select("id", count="exact") \
+        # Existence only: an exact count would visit every row of the user
+        result = await supabase.table("conjectural_requirements") \
+            .select("id") \
             .eq("user_id", user_id) \
             .limit(1) \
             .execute()
 
-        return {"has_conjectural": (result.count or 0) > 0}
+        return {"has_conjectural": bool(result.data)}
 
     except Exception as e:
         raise HTTPException(
@@ -95,15 +174,16 @@ async def has_any_conjectural(authorization: Optional[str] = Header(None)):
 @router.get("/by-cod/{cod_requirement}")
 async def get_requirement_by_cod(
     cod_requirement: str,
+    view: View = Query("full", description="summary (board fields, scores) or full"),
     authorization: Optional[str] = Header(None),
 ):
     """Get a single conjectural requirement by cod_requirement (e.g. REQ-C001), including evaluations."""
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("conjectural_requirements") \
-            .select("*, evaluations(*)") \
+        result = await supabase.table("conjectural_requirements") \
+            .select(REQUIREMENT_VIEWS[view]) \
             .eq("cod_requirement", cod_requirement) \
             .execute()
 
@@ -124,15 +204,16 @@ async def get_requirement_by_cod(
 @router.get("/{requirement_id}")
 async def get_requirement(
     requirement_id: UUID,
+    view: View = Query("full", description="summary (board fields, scores) or full"),
     authorization: Optional[str] = Header(None),
 ):
     """Get a single conjectural requirement by ID, including evaluations."""
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("conjectural_requirements") \
-            .select("*, evaluations(*)") \
+        result = await supabase.table("conjectural_requirements") \
+            .select(REQUIREMENT_VIEWS[view]) \
             .eq("id", str(requirement_id)) \
             .execute()
 
@@ -150,6 +231,35 @@ async def get_requirement(
         )
 
 
+@router.get("/{requirement_id}/history")
+async def get_requirement_history(
+    requirement_id: UUID,
+    authorization: Optional[str] = Header(None),
+):
+    """Get the history snapshot (all attempts and their evaluations) of a conjectural requirement."""
+    get_user_id_from_header(authorization)
+    supabase = await get_async_supabase_client()
+
+    try:
+        result = await supabase.table("conjectural_requirements") \
+            .select("id, history_snapshot") \
+            .eq("id", str(requirement_id)) \
+            .execute()
+
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Conjectural requirement not found")
+
+        return result.data[0]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get conjectural requirement history: {str(e)}",
+        )
+
+
 @router.patch("/{requirement_id}/status")
 async def update_status(
     requirement_id: UUID,
@@ -158,14 +268,14 @@ async def update_status(
 ):
     """Update the status of a conjectural requirement (todo, inprogress, done)."""
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     new_status = body.get("status")
     if new_status not in ("todo", "inprogress", "done"):
         raise HTTPException(status_code=400, detail="Invalid status. Must be: todo, inprogress, done")
 
     try:
-        check = supabase.table("conjectural_requirements") \
+        check = await supabase.table("conjectural_requirements") \
             .select("id") \
             .eq("id", str(requirement_id)) \
             .execute()
@@ -173,7 +283,7 @@ async def update_status(
         if not check.data:
             raise HTTPException(status_code=404, detail="Conjectural requirement not found")
 
-        result = supabase.table("conjectural_requirements") \
+        result = await supabase.table("conjectural_requirements") \
             .update({"status": new_status}) \
             .eq("id", str(requirement_id)) \
             .execute()
@@ -197,14 +307,14 @@ async def update_requirement(
 ):
     """Update editable fields (FERC/QESS) of a conjectural requirement."""
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     update_data = body.model_dump(exclude_none=True)
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
 
     try:
-        check = supabase.table("conjectural_requirements") \
+        check = await supabase.table("conjectural_requirements") \
             .select("id") \
             .eq("id", str(requirement_id)) \
             .execute()
@@ -212,13 +322,17 @@ async def update_requirement(
         if not check.data:
             raise HTTPException(status_code=404, detail="Conjectural requirement not found")
 
-        supabase.table("conjectural_requirements") \
+        await supabase.table("conjectural_requirements") \
             .update(update_data) \
             .eq("id", str(requirement_id)) \
             .execute()
 
-        result = supabase.table("conjectural_requirements") \
-            .select("*, evaluations(*)") \
+        # The stored embedding no longer matches the text: re-embed in the background
+        if "business_need" in update_data:
+            request_backfill()
+
+        result = await supabase.table("conjectural_requirements") \
+            .select(REQUIREMENT_VIEWS["full"]) \
             .eq("id", str(requirement_id)) \
             .execute()
 
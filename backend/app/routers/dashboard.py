@@ -2,18 +2,39 @@
 Dashboard Router
 
 Endpoints that return pre-computed chart data for the project dashboard.
+
+All charts are computed together (GET /dashboard/{project_id}/bundle); the
+result is cached per project and dropped when new evaluations are persisted.
+The per-chart endpoints return their slice of the cached bundle. Every
+endpoint carries a weak ETag of the project's change version and answers
+If-None-Match with 304 without touching the bundle.
+
+DASHBOARD_ENGINE selects how the bundle is computed:
+- "sql" (default): the `dashboard_aggregates` RPC aggregates in Postgres and
+  only the aggregates are shipped; they are rounded here exactly like the
+  frame engine rounds them.
+- "frame": every evaluation's scores are fetched into an EvaluationFrame
+  (NumPy columns) and aggregated by the `_*_data` functions below.
 """
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from typing import Optional, List, Dict, Any
 from uuid import UUID
-import statistics
+import os
+
+import numpy as np
 
-from app.services.supabase_client import get_supabase_client
+from app.routers.etags import conditional_response, get_change_versions, weak_etag
+from app.services.repository import get_repository
+from app.services.supabase_client import get_async_supabase_client
+from app.services.dashboard_cache import get_dashboard_bundle
+from app.services.evaluation_frame import CRITERIA, MISSING, EvaluationFrame, spearman_rho
 
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+DASHBOARD_ENGINE = os.environ.get("DASHBOARD_ENGINE", "sql").lower()
+
 
 def _get_user_id(authorization: Optional[str]) -> str:
     if not authorization:
@@ -24,53 +45,38 @@ def _get_user_id(authorization: Optional[str]) -> str:
     return parts[1]
 
 
-def _fetch_evaluations(project_id: str) -> List[Dict[str, Any]]:
-    """Fetch all evaluations for a project via conjectural_requirements join."""
-    supabase = get_supabase_client()
-    result = supabase.table("conjectural_requirements") \
-        .select("id, evaluations(*)") \
-        .eq("project_id", project_id) \
-        .execute()
+async def _fetch_evaluations(project_id: str) -> List[Dict[str, Any]]:
+    """Fetch the score columns of all evaluations of a project (no justifications / snapshots)."""
+    return await get_repository().get_project_evaluation_scores(project_id)
 
-    evals: List[Dict[str, Any]] = []
-    for req in result.data or []:
-        for ev in req.get("evaluations") or []:
-            evals.append(ev)
-    return evals
 
+# ── 1. Radar Chart ────────────────────────────────────────────────────────────
 
-CRITERIA = ["unambiguous", "completeness", "atomicity", "verifiable", "conforming"]
+def _radar_data(frame: EvaluationFrame) -> Dict[str, Any]:
+    """
+    Average scores across all requirements and attempts, grouped by evaluation type.
+    """
+    def avg_by_type(eval_type: str):
+        means = frame.means(eval_type)
+        return {k: round(v, 2) for k, v in means.items()} if means else None
 
+    return {"llm": avg_by_type("llm"), "human": avg_by_type("human")}
 
-# ── 1. Radar Chart ────────────────────────────────────────────────────────────
 
 @router.get("/radar/{project_id}")
 async def radar_chart(
     project_id: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None),
 ):
-    """
-    Average scores across all requirements and attempts, grouped by evaluation type.
-    """
+    """Radar chart data (see `_radar_data`)."""
     _get_user_id(authorization)
     try:
-        evals = _fetch_evaluations(str(project_id))
-        if not evals:
-            return {"llm": None, "human": None}
-
-        def avg_by_type(eval_type: str):
-            subset = [e for e in evals if e.get("type") == eval_type]
-            if not subset:
-                return None
-            result = {}
-            for c in CRITERIA:
-                vals = [e[c] for e in subset if e.get(c) is not None]
-                result[c] = round(sum(vals) / len(vals), 2) if vals else 0
-            overalls = [e.get("overall_score") for e in subset if e.get("overall_score") is not None]
-            result["overall_score"] = round(sum(overalls) / len(overalls), 2) if overalls else 0
-            return result
-
-        return {"llm": avg_by_type("llm"), "human": avg_by_type("human")}
+        bundle = await _get_bundle(str(project_id), request, response)
+        if isinstance(bundle, Response):
+            return bundle
+        return bundle["radar"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute radar data: {e}")
@@ -78,55 +84,32 @@ async def radar_chart(
 
 # ── 2. Boxplot ────────────────────────────────────────────────────────────────
 
+def _boxplot_data(frame: EvaluationFrame) -> Dict[str, Any]:
+    """
+    Boxplot statistics of overall_score grouped by attempt and evaluation type (llm/human).
+    Returns min, q1, median, q3, max for each attempt+type combination.
+    """
+    result = [
+        {"attempt": q["attempt"], "type": q["type"], **{k: round(q[k], 2) for k in ("min", "q1", "median", "q3", "max")}}
+        for q in frame.overall_quartiles()
+    ]
+    return {"attempts": result, "has_human": any(entry["type"] == "human" for entry in result)}
+
+
 @router.get("/boxplot/{project_id}")
 async def boxplot_chart(
     project_id: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None),
 ):
-    """
-    Boxplot statistics of overall_score grouped by attempt and evaluation type (llm/human).
-    Returns min, q1, median, q3, max for each attempt+type combination.
-    """
+    """Boxplot data (see `_boxplot_data`)."""
     _get_user_id(authorization)
     try:
-        evals = _fetch_evaluations(str(project_id))
-        if not evals:
-            return {"attempts": [], "has_human": False}
-
-        # Group by (attempt, type)
-        by_key: Dict[tuple, List[float]] = {}
-        has_human = False
-        for e in evals:
-            attempt = e.get("attempt")
-            eval_type = e.get("type")  # "llm" or "human"
-            score = e.get("overall_score")
-            if attempt is not None and score is not None and eval_type:
-                by_key.setdefault((attempt, eval_type), []).append(score)
-                if eval_type == "human":
-                    has_human = True
-
-        def _quartiles(scores: List[float]) -> dict:
-            scores = sorted(scores)
-            n = len(scores)
-            q1 = statistics.median(scores[: n // 2]) if n > 1 else scores[0]
-            q3 = statistics.median(scores[(n + 1) // 2 :]) if n > 1 else scores[0]
-            return {
-                "min": round(scores[0], 2),
-                "q1": round(q1, 2),
-                "median": round(statistics.median(scores), 2),
-                "q3": round(q3, 2),
-                "max": round(scores[-1], 2),
-            }
-
-        result = []
-        for (attempt, eval_type) in sorted(by_key.keys()):
-            scores = by_key[(attempt, eval_type)]
-            if not scores:
-                continue
-            entry = {"attempt": attempt, "type": eval_type, **_quartiles(scores)}
-            result.append(entry)
-
-        return {"attempts": result, "has_human": has_human}
+        bundle = await _get_bundle(str(project_id), request, response)
+        if isinstance(bundle, Response):
+            return bundle
+        return bundle["boxplot"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute boxplot data: {e}")
@@ -134,55 +117,30 @@ async def boxplot_chart(
 
 # ── 3. Confusion Matrix ──────────────────────────────────────────────────────
 
-@router.get("/confusion-matrix/{project_id}")
-async def confusion_matrix_chart(
-    project_id: UUID,
-    authorization: Optional[str] = Header(None),
-):
+def _confusion_matrix_data(frame: EvaluationFrame) -> Dict[str, Any]:
     """
     Confusion matrix comparing LLM predictions vs Human ground truth.
     Positive class: scores 4-5. Negative class: scores 1-3.
     Each criterion is treated as an independent observation.
     """
+    by_attempt = frame.pairs.confusion_by_attempt()
+    return {k: sum(counts[k] for _, counts in by_attempt) for k in ("tp", "fp", "fn", "tn")}
+
+
+@router.get("/confusion-matrix/{project_id}")
+async def confusion_matrix_chart(
+    project_id: UUID,
+    request: Request,
+    response: Response,
+    authorization: Optional[str] = Header(None),
+):
+    """Confusion matrix (see `_confusion_matrix_data`)."""
     _get_user_id(authorization)
     try:
-        evals = _fetch_evaluations(str(project_id))
-        if not evals:
-            return {"tp": 0, "fp": 0, "fn": 0, "tn": 0}
-
-        # Group evaluations by (requirement_id, attempt) to pair LLM and Human
-        pairs: Dict[str, Dict[str, Dict]] = {}
-        for e in evals:
-            key = f"{e.get('requirement_id')}_{e.get('attempt')}"
-            pairs.setdefault(key, {})
-            pairs[key][e["type"]] = e
-
-        tp = fp = fn = tn = 0
-        for pair in pairs.values():
-            llm_eval = pair.get("llm")
-            human_eval = pair.get("human")
-            if not llm_eval or not human_eval:
-                continue
-
-            for c in CRITERIA:
-                llm_score = llm_eval.get(c)
-                human_score = human_eval.get(c)
-                if llm_score is None or human_score is None:
-                    continue
-
-                llm_pos = llm_score >= 4
-                human_pos = human_score >= 4
-
-                if human_pos and llm_pos:
-                    tp += 1
-                elif not human_pos and llm_pos:
-                    fp += 1
-                elif human_pos and not llm_pos:
-                    fn += 1
-                else:
-                    tn += 1
-
-        return {"tp": tp, "fp": fp, "fn": fn, "tn": tn}
+        bundle = await _get_bundle(str(project_id), request, response)
+        if isinstance(bundle, Response):
+            return bundle
+        return bundle["confusion_matrix"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute confusion matrix: {e}")
@@ -190,141 +148,91 @@ async def confusion_matrix_chart(
 
 # ── 4. Classification Metrics (Precision, Recall, F1) ────────────────────────
 
+def _classification_metrics_data(frame: EvaluationFrame) -> Dict[str, Any]:
+    """
+    Precision, Recall and F1-Score segmented by attempt.
+    Uses same positive/negative threshold as confusion matrix (>=4 positive).
+    """
+    return {"attempts": [_classification_entry(attempt, counts) for attempt, counts in frame.pairs.confusion_by_attempt()]}
+
+
+def _classification_entry(attempt: int, c: Dict[str, int]) -> Dict[str, Any]:
+    """Precision, recall and F1 of one attempt from its TP/FP/FN counts."""
+    precision = c["tp"] / (c["tp"] + c["fp"]) if (c["tp"] + c["fp"]) > 0 else 0
+    recall = c["tp"] / (c["tp"] + c["fn"]) if (c["tp"] + c["fn"]) > 0 else 0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    return {
+        "attempt": attempt,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+    }
+
+
 @router.get("/classification-metrics/{project_id}")
 async def classification_metrics_chart(
     project_id: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None),
 ):
-    """
-    Precision, Recall and F1-Score segmented by attempt.
-    Uses same positive/negative threshold as confusion matrix (>=4 positive).
-    """
+    """Precision / recall / F1 per attempt (see `_classification_metrics_data`)."""
     _get_user_id(authorization)
     try:
-        evals = _fetch_evaluations(str(project_id))
-        if not evals:
-            return {"attempts": []}
-
-        # Group by (requirement_id, attempt)
-        pairs: Dict[str, Dict[str, Dict]] = {}
-        for e in evals:
-            key = f"{e.get('requirement_id')}_{e.get('attempt')}"
-            pairs.setdefault(key, {})
-            pairs[key][e["type"]] = e
-
-        # Accumulate TP/FP/FN per attempt
-        attempt_counts: Dict[int, Dict[str, int]] = {}
-        for pair in pairs.values():
-            llm_eval = pair.get("llm")
-            human_eval = pair.get("human")
-            if not llm_eval or not human_eval:
-                continue
-
-            attempt = llm_eval.get("attempt", 1)
-            counts = attempt_counts.setdefault(attempt, {"tp": 0, "fp": 0, "fn": 0})
-
-            for c in CRITERIA:
-                llm_score = llm_eval.get(c)
-                human_score = human_eval.get(c)
-                if llm_score is None or human_score is None:
-                    continue
-
-                llm_pos = llm_score >= 4
-                human_pos = human_score >= 4
-
-                if human_pos and llm_pos:
-                    counts["tp"] += 1
-                elif not human_pos and llm_pos:
-                    counts["fp"] += 1
-                elif human_pos and not llm_pos:
-                    counts["fn"] += 1
-
-        result = []
-        for attempt in sorted(attempt_counts.keys()):
-            c = attempt_counts[attempt]
-            precision = c["tp"] / (c["tp"] + c["fp"]) if (c["tp"] + c["fp"]) > 0 else 0
-            recall = c["tp"] / (c["tp"] + c["fn"]) if (c["tp"] + c["fn"]) > 0 else 0
-            f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
-            result.append({
-                "attempt": attempt,
-                "precision": round(precision, 4),
-                "recall": round(recall, 4),
-                "f1": round(f1, 4),
-            })
-
-        return {"attempts": result}
+        bundle = await _get_bundle(str(project_id), request, response)
+        if isinstance(bundle, Response):
+            return bundle
+        return bundle["classification_metrics"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute classification metrics: {e}")
 
 
-def _avg_criteria(ev: Dict[str, Any]) -> float | None:
-    """Return the mean of the 5 criteria scores for a single evaluation."""
-    vals = [ev[c] for c in CRITERIA if ev.get(c) is not None]
-    return round(sum(vals) / len(vals), 2) if vals else None
+# ── 5. Pass Rate (Pass@k) ───────────────────────────────────────────────────
+
+def _pass_rate_data(frame: EvaluationFrame) -> Dict[str, Any]:
+    """
+    Horizontal stacked-bar data: % of requirements that achieved a good score
+    (avg criteria >= 4) at each attempt, plus failure rate.
+    Returned separately for LLM and Human evaluations.
+    """
+    def _compute(eval_type: str):
+        total, first = frame.first_pass(eval_type)
+        if not total:
+            return None
+        pass_at_1 = int((first == 1).sum())
+        pass_at_2 = int((first == 2).sum())
+        fail = int((first == MISSING).sum())
+        buckets = {"pass_at_1": pass_at_1, "pass_at_2": pass_at_2, "pass_at_3": total - pass_at_1 - pass_at_2 - fail, "fail": fail}
+        return _pass_rate_entry(total, buckets)
+
+    return {"llm": _compute("llm"), "human": _compute("human")}
+
 
+def _pass_rate_entry(total: int, buckets: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "total": total,
+        **{
+            k: {"count": v, "percent": round(v / total * 100, 1) if total else 0}
+            for k, v in buckets.items()
+        },
+    }
 
-# ── 5. Pass Rate (Pass@k) ───────────────────────────────────────────────────
 
 @router.get("/pass-rate/{project_id}")
 async def pass_rate_chart(
     project_id: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None),
 ):
-    """
-    Horizontal stacked-bar data: % of requirements that achieved a good score
-    (avg criteria >= 4) at each attempt, plus failure rate.
-    Returned separately for LLM and Human evaluations.
-    """
+    """Pass@k data (see `_pass_rate_data`)."""
     _get_user_id(authorization)
     try:
-        evals = _fetch_evaluations(str(project_id))
-        if not evals:
-            return {"llm": None, "human": None}
-
-        # Group by (requirement_id, type) → list of evals sorted by attempt
-        groups: Dict[tuple, List[Dict[str, Any]]] = {}
-        for e in evals:
-            req_id = e.get("requirement_id")
-            eval_type = e.get("type")
-            if req_id and eval_type:
-                groups.setdefault((req_id, eval_type), []).append(e)
-
-        def _compute(eval_type: str):
-            type_groups = {k: v for k, v in groups.items() if k[1] == eval_type}
-            if not type_groups:
-                return None
-
-            total = len(type_groups)
-            buckets = {"pass_at_1": 0, "pass_at_2": 0, "pass_at_3": 0, "fail": 0}
-
-            for _key, group_evals in type_groups.items():
-                sorted_evals = sorted(group_evals, key=lambda x: x.get("attempt", 0))
-                classified = False
-                for ev in sorted_evals:
-                    attempt = ev.get("attempt")
-                    avg = _avg_criteria(ev)
-                    if avg is not None and avg >= 4.0:
-                        if attempt == 1:
-                            buckets["pass_at_1"] += 1
-                        elif attempt == 2:
-                            buckets["pass_at_2"] += 1
-                        else:
-                            buckets["pass_at_3"] += 1
-                        classified = True
-                        break
-                if not classified:
-                    buckets["fail"] += 1
-
-            return {
-                "total": total,
-                **{
-                    k: {"count": v, "percent": round(v / total * 100, 1) if total else 0}
-                    for k, v in buckets.items()
-                },
-            }
-
-        return {"llm": _compute("llm"), "human": _compute("human")}
+        bundle = await _get_bundle(str(project_id), request, response)
+        if isinstance(bundle, Response):
+            return bundle
+        return bundle["pass_rate"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute pass-rate data: {e}")
@@ -332,56 +240,159 @@ async def pass_rate_chart(
 
 # ── 6. Scatter Correlation (LLM vs Human) ───────────────────────────────────
 
+def _scatter_correlation_data(frame: EvaluationFrame) -> Dict[str, Any]:
+    """
+    Scatter plot data: each point is a (requirement, attempt) pair with the
+    average criteria score for both the Human and LLM evaluations.
+    Also returns the global Spearman rank-correlation coefficient.
+    """
+    pairs = frame.pairs
+    llm_sums = frame.criteria_sum[pairs.llm]
+    human_sums = frame.criteria_sum[pairs.human]
+    # Criteria means are multiples of 0.2: already rounded to 2 decimals
+    points = [
+        {
+            "requirement_id": frame.requirement_ids[requirement],
+            "attempt": None if attempt == MISSING else attempt,
+            "human_avg": human_avg,
+            "llm_avg": llm_avg,
+        }
+        for requirement, attempt, llm_avg, human_avg in zip(
+            frame.requirement[pairs.llm].tolist(), pairs.attempt.tolist(),
+            (llm_sums / len(CRITERIA)).tolist(), (human_sums / len(CRITERIA)).tolist(),
+        )
+    ]
+    # Ranks of the criteria sums are the ranks of the averages
+    rho = spearman_rho(human_sums, llm_sums) if len(points) >= 3 else None
+    return {"points": points, "spearman_rho": None if rho is None else round(rho, 2), "has_data": len(points) > 0}
+
+
+def _spearman_rho(points: List[Dict[str, Any]]) -> float | None:
+    """Spearman rank correlation of the human vs LLM averages of scatter points (needs 3+ points)."""
+    if len(points) < 3:
+        return None
+    rho = spearman_rho(
+        np.array([p["human_avg"] for p in points]),
+        np.array([p["llm_avg"] for p in points]),
+    )
+    return None if rho is None else round(rho, 2)
+
+
 @router.get("/scatter-correlation/{project_id}")
 async def scatter_correlation_chart(
     project_id: UUID,
+    request: Request,
+    response: Response,
+    authorization: Optional[str] = Header(None),
+):
+    """LLM vs human scatter data (see `_scatter_correlation_data`)."""
+    _get_user_id(authorization)
+    try:
+        bundle = await _get_bundle(str(project_id), request, response)
+        if isinstance(bundle, Response):
+            return bundle
+        return bundle["scatter_correlation"]
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute scatter correlation data: {e}")
+
+
+# ── Bundle ───────────────────────────────────────────────────────────────────
+
+CHARTS = {
+    "radar": _radar_data,
+    "boxplot": _boxplot_data,
+    "confusion_matrix": _confusion_matrix_data,
+    "classification_metrics": _classification_metrics_data,
+    "pass_rate": _pass_rate_data,
+    "scatter_correlation": _scatter_correlation_data,
+}
+
+
+def _bundle_from_aggregates(agg: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the chart bundle from the `dashboard_aggregates` RPC result."""
+    radar_rows = {row["type"]: row for row in agg.get("radar") or []}
+
+    def radar_for(eval_type: str):
+        row = radar_rows.get(eval_type)
+        if row is None:
+            return None
+        return {key: round(row[key], 2) for key in [*CRITERIA, "overall_score"]}
+
+    boxplot = [
+        {"attempt": row["attempt"], "type": row["type"], **{k: round(row[k], 2) for k in ("min", "q1", "median", "q3", "max")}}
+        for row in agg.get("boxplot") or []
+    ]
+
+    # NULL attempt last, as the RPC orders it
+    confusion_rows = sorted(agg.get("confusion") or [], key=lambda row: (row["attempt"] is None, row["attempt"] or 0))
+    confusion = {k: sum(row[k] for row in confusion_rows) for k in ("tp", "fp", "fn", "tn")}
+
+    pass_rows = {row["type"]: row for row in agg.get("pass_rate") or []}
+
+    def pass_rate_for(eval_type: str):
+        row = pass_rows.get(eval_type)
+        if row is None:
+            return None
+        return _pass_rate_entry(row["total"], {k: row[k] for k in ("pass_at_1", "pass_at_2", "pass_at_3", "fail")})
+
+    # Criteria are NOT NULL: the per-evaluation criteria mean is sum / 5
+    points = [
+        {
+            "requirement_id": str(row["requirement_id"]),
+            "attempt": row["attempt"],
+            "human_avg": round(row["human_sum"] / len(CRITERIA), 2),
+            "llm_avg": round(row["llm_sum"] / len(CRITERIA), 2),
+        }
+        for row in agg.get("points") or []
+    ]
+
+    return {
+        "radar": {"llm": radar_for("llm"), "human": radar_for("human")},
+        "boxplot": {"attempts": boxplot, "has_human": any(row["type"] == "human" for row in boxplot)},
+        "confusion_matrix": confusion,
+        "classification_metrics": {"attempts": [_classification_entry(row["attempt"], row) for row in confusion_rows]},
+        "pass_rate": {"llm": pass_rate_for("llm"), "human": pass_rate_for("human")},
+        "scatter_correlation": {"points": points, "spearman_rho": _spearman_rho(points), "has_data": len(points) > 0},
+    }
+
+
+async def _compute_bundle(project_id: str) -> Dict[str, Any]:
+    if DASHBOARD_ENGINE == "sql":
+        agg = await get_repository().get_project_dashboard_aggregates(project_id)
+        return _bundle_from_aggregates(agg)
+    if DASHBOARD_ENGINE == "frame":
+        frame = EvaluationFrame.from_rows(await _fetch_evaluations(project_id))
+        return {name: compute(frame) for name, compute in CHARTS.items()}
+    raise ValueError(f"Unsupported DASHBOARD_ENGINE: {DASHBOARD_ENGINE!r}")
+
+
+async def _get_bundle(project_id: str, request: Request, response: Response) -> Dict[str, Any] | Response:
+    """The project's bundle, or a 304 response when the client's ETag is current."""
+    supabase = await get_async_supabase_client()
+    project = (await get_change_versions(supabase, project_id)).get("project")
+    version = project["version"] if project else None
+    if version is not None:
+        not_modified = conditional_response(request, response, weak_etag(request, version))
+        if not_modified:
+            return not_modified
+    return await get_dashboard_bundle(project_id, _compute_bundle, version)
+
+
+@router.get("/{project_id}/bundle")
+async def dashboard_bundle(
+    project_id: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None),
 ):
     """
-    Scatter plot data: each point is a (requirement, attempt) pair with the
-    average criteria score for both the Human and LLM evaluations.
-    Also returns the global Spearman rank-correlation coefficient.
+    Data of every dashboard chart, computed from a single fetch of the
+    project's evaluation scores (cached per project).
     """
     _get_user_id(authorization)
     try:
-        evals = _fetch_evaluations(str(project_id))
-        if not evals:
-            return {"points": [], "spearman_rho": None, "has_data": False}
-
-        # Group by (requirement_id, attempt) → {llm: eval, human: eval}
-        pairs: Dict[str, Dict[str, Dict]] = {}
-        for e in evals:
-            key = f"{e.get('requirement_id')}_{e.get('attempt')}"
-            pairs.setdefault(key, {})
-            pairs[key][e["type"]] = e
-
-        points = []
-        for pair in pairs.values():
-            llm_eval = pair.get("llm")
-            human_eval = pair.get("human")
-            if not llm_eval or not human_eval:
-                continue
-            llm_avg = _avg_criteria(llm_eval)
-            human_avg = _avg_criteria(human_eval)
-            if llm_avg is None or human_avg is None:
-                continue
-            points.append({
-                "requirement_id": str(llm_eval.get("requirement_id", "")),
-                "attempt": llm_eval.get("attempt", 1),
-                "human_avg": human_avg,
-                "llm_avg": llm_avg,
-            })
-
-        spearman_rho = None
-        if len(points) >= 3:
-            import math
-            from scipy.stats import spearmanr
-            human_vals = [p["human_avg"] for p in points]
-            llm_vals = [p["llm_avg"] for p in points]
-            rho, _ = spearmanr(human_vals, llm_vals)
-            spearman_rho = None if math.isnan(rho) else round(float(rho), 2)
-
-        return {"points": points, "spearman_rho": spearman_rho, "has_data": len(points) > 0}
+        return await _get_bundle(str(project_id), request, response)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to compute scatter correlation data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute dashboard data: {e}")
@@ -0,0 +1,57 @@
+"""
+Conditional GET support for the read-heavy endpoints.
+
+Database triggers keep change versions (`get_change_versions` RPC): one per
+project, bumped by any write to the project, its requirements, conjectural
+requirements or evaluations, plus global versions of the project list and of
+the profiles (author names). An endpoint reads the versions its response
+depends on (one small query), derives a weak ETag from them and the request
+path and query, and answers 304 Not Modified to a matching If-None-Match
+without reading the rows.
+
+The versions are read before the rows, so a body is never older than its
+ETag. Responses are marked `private, no-cache`: browsers keep them but
+revalidate on every use, which is a 304 while nothing changed.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = os.environ.get("HTTP_CACHE_CONTROL", "private, no-cache")
+NOT_MODIFIED_HEADERS = ("ETag", "Cache-Control", "Vary")
+
+
+async def get_change_versions(supabase, project_id: Optional[str] = None) -> Dict[str, Any]:
+    """{"projects": int, "profiles": int, "project": {"version", counts...} | None}."""
+    params = {"p_project_id": project_id} if project_id else {}
+    result = await supabase.rpc("get_change_versions", params).execute()
+    return result.data or {}
+
+
+def weak_etag(request: Request, *versions: Any) -> str:
+    """Weak ETag of a response depending on `versions`, distinct per path and query."""
+    key = "|".join([request.url.path, str(request.url.query), *(str(v) for v in versions)])
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110): the W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set the caching headers; return a 304 response if the client already has `etag`."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={k: response.headers[k] for k in NOT_MODIFIED_HEADERS})
+    return None
@@ -0,0 +1,109 @@
+"""
+Keyset pagination shared by the list endpoints.
+
+A page is requested with `?limit=&cursor=`. The response body stays a plain
+JSON list; the cursor of the next page (if any) is returned in the
+X-Next-Cursor header and, with `?include_total=true`, the number of rows
+matching the filters in X-Total-Count. Without include_total no count is
+computed.
+
+The cursor is an opaque base64url token holding the sort key of the last row
+of the page, e.g. (created_at, id). The next page is selected with
+`k1 <= v1 AND ((k1 < v1) OR (k1 = v1 AND k2 < v2))` (>= / > ascending).
+Postgres cannot turn the OR alone into an index bound; the redundant
+`k1 <= v1` is the range condition on the (…, k1, k2) index, and the OR only
+discards the rows equal to v1 already served. Every page therefore starts its
+index scan at the cursor, however deep the client pages.
+
+Sort keys must be NOT NULL columns (see the keyset pagination migration): a
+NULL key has no place in the comparison and would end the paging.
+"""
+
+import base64
+import json
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor holding `size` key values; raises 400 if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _quote(value: str) -> str:
+    """Quote a value for a PostgREST logical filter (commas, parentheses, dots)."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_filter(keys: Sequence[str], values: Sequence[str], desc: bool) -> str:
+    """PostgREST `or=(...)` body selecting the rows after `values` in (keys) order."""
+    op = "lt" if desc else "gt"
+    first, second = keys
+    v1, v2 = (_quote(v) for v in values)
+    return f"{first}.{op}.{v1},and({first}.eq.{v1},{second}.{op}.{v2})"
+
+
+async def fetch_page(
+    query,
+    keys: Sequence[str],
+    *,
+    limit: int,
+    cursor: Optional[str],
+    desc: bool,
+) -> tuple[list[dict], Optional[str]]:
+    """Run `query` for one page ordered by `keys`; returns (rows, next cursor).
+
+    The selected columns must include every key. One extra row is fetched to
+    know whether another page follows.
+    """
+    for key in keys:
+        query = query.order(key, desc=desc)
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        # Index bound on the leading key; the OR below is only a residual filter
+        query = query.lte(keys[0], values[0]) if desc else query.gte(keys[0], values[0])
+        query = query.or_(keyset_filter(keys, values, desc))
+
+    result = await query.limit(limit + 1).execute()
+    rows = result.data or []
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = [rows[-1][key] for key in keys]
+    if any(value is None for value in last):
+        raise ValueError(f"Keyset pagination on nullable key(s) {keys}")
+    return rows, encode_cursor([str(value) for value in last])
+
+
+async def count_rows(supabase, table: str, apply_filters: Callable) -> int:
+    """Exact number of rows of `table` matching `apply_filters` (HEAD request, no rows)."""
+    query = apply_filters(supabase.table(table).select("id", count="exact", head=True))
+    result = await query.execute()
+    return result.count or 0
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int] = None) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
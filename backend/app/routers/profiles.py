@@ -9,7 +9,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 from app.routers.auth_utils import get_user_id_from_header
-from app.services.supabase_client import get_supabase_client, safe_maybe_single_execute
+from app.services.supabase_client import get_async_supabase_client, safe_maybe_single_execute
 
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
@@ -37,10 +37,10 @@ ONBOARDING_COLUMNS = (
 async def get_my_profile(authorization: Optional[str] = Header(None)):
     """Get the authenticated user's profile (role and approval status)."""
     user_id = get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("profiles")\
+        result = await supabase.table("profiles")\
             .select("role, is_approved")\
             .eq("id", user_id)\
             .single()\
@@ -61,10 +61,10 @@ async def get_my_profile(authorization: Optional[str] = Header(None)):
 async def get_onboarding_status(authorization: Optional[str] = Header(None)):
     """Get the authenticated user's onboarding completion status."""
     user_id = get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = safe_maybe_single_execute(
+        result = await safe_maybe_single_execute(
             supabase.table("profiles")
             .select(ONBOARDING_COLUMNS)
             .eq("id", user_id)
@@ -95,10 +95,10 @@ async def complete_onboarding_stage(
         raise HTTPException(status_code=400, detail=f"Invalid stage. Must be one of: {', '.join(valid_stages)}")
 
     column = f"has_completed_onboarding_{stage}"
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("profiles")\
+        result = await supabase.table("profiles")\
             .update({column: True})\
             .eq("id", user_id)\
             .execute()
@@ -4,9 +4,9 @@ Projects Router
 Handles project-related endpoints including document upload and text extraction.
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Form, Query, Request, Response
 from fastapi.responses import StreamingResponse
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 import base64
 import json
@@ -25,24 +25,31 @@ from app.services.document_parser import extract_text_from_pdf, get_pdf_metadata
 from app.services.requirement_extractor import extract_requirements_with_ai
 from app.services.language_detector import detect_language
 from app.services.vision_analyzer import analyze_vision_text
-from app.services.supabase_client import get_supabase_client
+from app.services.supabase_client import get_async_supabase_client
 from app.services.user_settings import get_user_model_preference
 from app.routers.auth_utils import get_user_id_from_header
+from app.routers.etags import conditional_response, get_change_versions, weak_etag
+from app.routers.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, count_rows, fetch_page, set_page_headers
 
 
 PROJECT_SELECT_COLUMNS = (
     "id, user_id, project_id, title, description, vision_document_name, "
     "vision_extracted_text, requirements_document_name, created_at, updated_at"
 )
+# List projection (?view=summary): the vision text is fetched per project via GET /projects/{uuid}
+PROJECT_SUMMARY_COLUMNS = (
+    "id, user_id, project_id, title, description, vision_document_name, "
+    "requirements_document_name, created_at, updated_at"
+)
 
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
-def _fetch_profiles_map(supabase, user_ids: set[str]) -> dict[str, dict]:
+async def _fetch_profiles_map(supabase, user_ids: set[str]) -> dict[str, dict]:
     if not user_ids:
         return {}
-    result = supabase.table("profiles")\
+    result = await supabase.table("profiles")\
         .select("id, first_name, last_name")\
         .in_("id", list(user_ids))\
         .execute()
@@ -59,9 +66,10 @@ def _attach_author_metadata(records: list[dict], profiles_map: dict[str, dict])
     return records
 
 
-def _fetch_requirement_counts(supabase, project_id: str) -> RequirementCounts:
+async def _fetch_requirement_counts(supabase, project_id: str) -> RequirementCounts:
+    """Count the project's requirements (fallback when it has no project_versions row)."""
     counts = RequirementCounts()
-    result = supabase.table("requirements")\
+    result = await supabase.table("requirements")\
         .select("type")\
         .eq("project_id", project_id)\
         .execute()
@@ -73,7 +81,7 @@ def _fetch_requirement_counts(supabase, project_id: str) -> RequirementCounts:
             counts.non_functional += 1
 
     # Conjectural requirements are stored in a separate table
-    conjectural_result = supabase.table("conjectural_requirements")\
+    conjectural_result = await supabase.table("conjectural_requirements")\
         .select("id", count="exact")\
         .eq("project_id", project_id)\
         .execute()
@@ -188,7 +196,7 @@ async def extract_requirements_document(
     if authorization:
         try:
             user_id = get_user_id_from_header(authorization)
-            provider = get_user_model_preference(user_id)
+            provider = await get_user_model_preference(user_id)
         except HTTPException:
             pass  # If auth is invalid, default to gemini
 
@@ -232,8 +240,8 @@ async def create_project(
     Accepts multipart/form-data to include document files.
     """
     user_id = get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
-    model_provider = get_user_model_preference(user_id)
+    supabase = await get_async_supabase_client()
+    model_provider = await get_user_model_preference(user_id)
 
     # Parse requirements JSON if provided
     requirements = None
@@ -290,7 +298,7 @@ async def create_project(
         if requirements_document_data:
             project_data["requirements_document_data"] = requirements_document_data
         
-        result = supabase.table("projects").insert(project_data).execute()
+        result = await supabase.table("projects").insert(project_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create project")
@@ -323,7 +331,7 @@ async def create_project(
                 })
             
             if reqs_to_insert:
-                supabase.table("requirements").insert(reqs_to_insert).execute()
+                await supabase.table("requirements").insert(reqs_to_insert).execute()
                 requirements_count = len(reqs_to_insert)
         
         return ProjectCreatedResponse(
@@ -343,26 +351,47 @@ async def create_project(
 
 
 @router.get("", response_model=list[ProjectResponse])
-async def list_projects(authorization: Optional[str] = Header(None)):
+async def list_projects(
+    request: Request,
+    response: Response,
+    view: Literal["summary", "full"] = Query("summary", description="summary omits vision_extracted_text"),
+    author: Optional[UUID] = Query(None, description="Only projects created by this user"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Count"),
+    authorization: Optional[str] = Header(None),
+):
     """
-    List all projects.
+    List projects, newest first, one keyset page at a time.
     Excludes document blob data to keep response size small.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
+
+    def apply_filters(query):
+        if author is not None:
+            query = query.eq("user_id", str(author))
+        return query
 
     try:
+        versions = await get_change_versions(supabase)
+        not_modified = conditional_response(request, response, weak_etag(request, versions.get("projects"), versions.get("profiles")))
+        if not_modified:
+            return not_modified
+
         # Select specific columns, excluding blob data
-        result = supabase.table("projects")\
-            .select(PROJECT_SELECT_COLUMNS)\
-            .order("created_at", desc=True)\
-            .execute()
-        
-        projects = result.data or []
+        query = apply_filters(supabase.table("projects")
+            .select(PROJECT_SUMMARY_COLUMNS if view == "summary" else PROJECT_SELECT_COLUMNS))
+        projects, next_cursor = await fetch_page(query, ("created_at", "id"), limit=limit, cursor=cursor, desc=True)
+        total = await count_rows(supabase, "projects", apply_filters) if include_total else None
+        set_page_headers(response, next_cursor, total)
+
         user_ids = {proj.get("user_id") for proj in projects if proj.get("user_id")}
-        profiles_map = _fetch_profiles_map(supabase, user_ids)
+        profiles_map = await _fetch_profiles_map(supabase, user_ids)
         return _attach_author_metadata(projects, profiles_map)
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -373,6 +402,8 @@ async def list_projects(authorization: Optional[str] = Header(None)):
 @router.get("/{uuid}", response_model=ProjectResponse)
 async def get_project(
     uuid: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None)
 ):
     """
@@ -380,11 +411,18 @@ async def get_project(
     Excludes document blob data to keep response size small.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
+        versions = await get_change_versions(supabase, str(uuid))
+        if versions.get("project"):
+            etag = weak_etag(request, versions["project"]["version"], versions.get("profiles"))
+            not_modified = conditional_response(request, response, etag)
+            if not_modified:
+                return not_modified
+
         # Select specific columns, excluding blob data
-        result = supabase.table("projects")\
+        result = await supabase.table("projects")\
             .select(PROJECT_SELECT_COLUMNS)\
             .eq("id", str(uuid))\
             .single()\
@@ -393,7 +431,7 @@ async def get_project(
         if not result.data:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        profiles_map = _fetch_profiles_map(supabase, {result.data.get("user_id")})
+        profiles_map = await _fetch_profiles_map(supabase, {result.data.get("user_id")})
         enriched = _attach_author_metadata([result.data], profiles_map)
         return enriched[0]
 
@@ -409,14 +447,24 @@ async def get_project(
 @router.get("/{uuid}/details", response_model=ProjectDetailsResponse)
 async def get_project_details(
     uuid: UUID,
+    request: Request,
+    response: Response,
     authorization: Optional[str] = Header(None)
 ):
     """Return project metadata along with requirement counts."""
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("projects")\
+        versions = await get_change_versions(supabase, str(uuid))
+        project_version = versions.get("project")
+        if project_version:
+            etag = weak_etag(request, project_version["version"], versions.get("profiles"))
+            not_modified = conditional_response(request, response, etag)
+            if not_modified:
+                return not_modified
+
+        result = await supabase.table("projects")\
             .select(PROJECT_SELECT_COLUMNS)\
             .eq("id", str(uuid))\
             .single()\
@@ -425,9 +473,17 @@ async def get_project_details(
         if not result.data:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        profiles_map = _fetch_profiles_map(supabase, {result.data.get("user_id")})
+        profiles_map = await _fetch_profiles_map(supabase, {result.data.get("user_id")})
         enriched = _attach_author_metadata([result.data], profiles_map)[0]
-        counts = _fetch_requirement_counts(supabase, str(uuid))
+        # Counts are maintained by the project_versions triggers
+        if project_version:
+            counts = RequirementCounts(
+                functional=project_version["functional"],
+                non_functional=project_version["non_functional"],
+                conjectural=project_version["conjectural"],
+            )
+        else:
+            counts = await _fetch_requirement_counts(supabase, str(uuid))
 
         return {**enriched, "requirement_counts": counts.dict()}
 
@@ -448,13 +504,13 @@ async def download_project_document(
 ):
     """Download a stored project document (vision or requirements)."""
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     if doc_type not in {"vision", "requirements"}:
         raise HTTPException(status_code=400, detail="Invalid document type")
 
     try:
-        result = supabase.table("projects")\
+        result = await supabase.table("projects")\
             .select("id, user_id, vision_document_name, vision_document_data, requirements_document_name, requirements_document_data")\
             .eq("id", str(uuid))\
             .single()\
@@ -509,11 +565,11 @@ async def delete_project(
     Delete a project and all its requirements.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
         # Verify project exists
-        check = supabase.table("projects")\
+        check = await supabase.table("projects")\
             .select("id")\
             .eq("id", str(uuid))\
             .execute()
@@ -522,7 +578,7 @@ async def delete_project(
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Delete project (requirements cascade automatically)
-        supabase.table("projects")\
+        await supabase.table("projects")\
             .delete()\
             .eq("id", str(uuid))\
             .execute()
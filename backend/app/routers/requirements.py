@@ -4,16 +4,19 @@ Requirements Router
 Handles requirement-related endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
 from typing import Optional
 from uuid import UUID
 
 from app.models.schemas import (
+    NFRCategory,
     RequirementCreate,
     RequirementResponse,
     RequirementType,
 )
-from app.services.supabase_client import get_supabase_client
+from app.services.supabase_client import get_async_supabase_client
+from app.routers.etags import conditional_response, get_change_versions, weak_etag
+from app.routers.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, count_rows, fetch_page, set_page_headers
 
 
 router = APIRouter(prefix="/requirements", tags=["requirements"])
@@ -34,37 +37,53 @@ def get_user_id_from_header(authorization: Optional[str]) -> str:
 @router.get("/project/{project_id}", response_model=list[RequirementResponse])
 async def list_requirements_by_project(
     project_id: UUID,
+    request: Request,
+    response: Response,
     type: Optional[RequirementType] = None,
+    category: Optional[NFRCategory] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Count"),
     authorization: Optional[str] = Header(None)
 ):
     """
-    List all requirements for a specific project.
-    Optionally filter by requirement type.
+    List requirements for a specific project, ordered by requirement_id,
+    one keyset page at a time.
+    Optionally filter by requirement type and category.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
-    try:
-        # Verify project exists
-        project_check = supabase.table("projects")\
-            .select("id")\
-            .eq("id", str(project_id))\
-            .execute()
-
-        if not project_check.data:
-            raise HTTPException(status_code=404, detail="Project not found")
-
-        # Build query
-        query = supabase.table("requirements")\
-            .select("*")\
-            .eq("project_id", str(project_id))
-        
+    def apply_filters(query):
+        query = query.eq("project_id", str(project_id))
         if type:
             query = query.eq("type", type.value)
-        
-        result = query.order("requirement_id").execute()
-        
-        return result.data
+        if category:
+            query = query.eq("category", category.value)
+        return query
+
+    try:
+        # A project with a version row exists; otherwise only the first page checks it
+        versions = await get_change_versions(supabase, str(project_id))
+        if versions.get("project"):
+            not_modified = conditional_response(request, response, weak_etag(request, versions["project"]["version"]))
+            if not_modified:
+                return not_modified
+        elif not cursor:
+            project_check = await supabase.table("projects")\
+                .select("id")\
+                .eq("id", str(project_id))\
+                .execute()
+
+            if not project_check.data:
+                raise HTTPException(status_code=404, detail="Project not found")
+
+        query = apply_filters(supabase.table("requirements").select("*"))
+        rows, next_cursor = await fetch_page(query, ("requirement_id", "id"), limit=limit, cursor=cursor, desc=False)
+        total = await count_rows(supabase, "requirements", apply_filters) if include_total else None
+        set_page_headers(response, next_cursor, total)
+
+        return rows
         
     except HTTPException:
         raise
@@ -84,11 +103,11 @@ async def create_requirement(
     Create a new requirement for a project.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
         # Verify project exists
-        project_check = supabase.table("projects")\
+        project_check = await supabase.table("projects")\
             .select("id")\
             .eq("id", str(requirement.project_id))\
             .execute()
@@ -105,7 +124,7 @@ async def create_requirement(
             "category": requirement.category.value if requirement.category else None,
         }
         
-        result = supabase.table("requirements").insert(req_data).execute()
+        result = await supabase.table("requirements").insert(req_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create requirement")
@@ -130,10 +149,10 @@ async def get_requirement(
     Get a specific requirement by ID.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = supabase.table("requirements")\
+        result = await supabase.table("requirements")\
             .select("*")\
             .eq("id", str(requirement_id))\
             .execute()
@@ -162,11 +181,11 @@ async def update_requirement(
     Update an existing requirement.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
         # Verify requirement exists
-        check = supabase.table("requirements")\
+        check = await supabase.table("requirements")\
             .select("id")\
             .eq("id", str(requirement_id))\
             .execute()
@@ -182,7 +201,7 @@ async def update_requirement(
             "category": requirement.category.value if requirement.category else None,
         }
         
-        result = supabase.table("requirements")\
+        result = await supabase.table("requirements")\
             .update(update_data)\
             .eq("id", str(requirement_id))\
             .execute()
@@ -207,11 +226,11 @@ async def delete_requirement(
     Delete a requirement.
     """
     get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
         # Verify requirement exists
-        check = supabase.table("requirements")\
+        check = await supabase.table("requirements")\
             .select("id")\
             .eq("id", str(requirement_id))\
             .execute()
@@ -220,7 +239,7 @@ async def delete_requirement(
             raise HTTPException(status_code=404, detail="Requirement not found")
         
         # Delete requirement
-        supabase.table("requirements")\
+        await supabase.table("requirements")\
             .delete()\
             .eq("id", str(requirement_id))\
             .execute()
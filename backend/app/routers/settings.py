@@ -9,7 +9,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 from app.routers.auth_utils import get_user_id_from_header
-from app.services.supabase_client import get_supabase_client, safe_maybe_single_execute
+from app.services.supabase_client import get_async_supabase_client, safe_maybe_single_execute
 
 
 router = APIRouter(prefix="/settings", tags=["settings"])
@@ -56,10 +56,10 @@ SETTINGS_FIELDS = (
 async def get_settings(authorization: Optional[str] = Header(None)):
     """Get the authenticated user's settings, or defaults if none saved."""
     user_id = get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
-        result = safe_maybe_single_execute(
+        result = await safe_maybe_single_execute(
             supabase.table("settings")
             .select(SETTINGS_FIELDS)
             .eq("user_id", user_id)
@@ -82,12 +82,12 @@ async def update_settings(
 ):
     """Create or update the authenticated user's settings."""
     user_id = get_user_id_from_header(authorization)
-    supabase = get_supabase_client()
+    supabase = await get_async_supabase_client()
 
     try:
         payload = {"user_id": user_id, **settings_data.model_dump()}
 
-        result = supabase.table("settings")\
+        result = await supabase.table("settings")\
             .upsert(payload, on_conflict="user_id")\
             .execute()
 
@@ -0,0 +1,150 @@
+"""
+Per-project pool of unselected business-need candidates.
+
+generate_business_needs oversamples candidates by the project's adaptive
+factor (generation_stats: DIVERSITY_MARGIN / historical pass rate, clamped to
+[OVERSAMPLE_MIN, OVERSAMPLE_MAX]) and keeps the most diverse. The remainder
+is stored in `business_need_candidates` with its
+embedding and a context version (hash of the project context + embedding
+model). Later runs on the same context draw from the pool first and only ask
+the LLM for the shortfall.
+
+Statuses: pooled (available), claimed (drawn by a run in progress), selected
+(used by a run), rejected (became a near-duplicate of a persisted
+requirement). Draws claim rows atomically (`claim_business_need_candidates`,
+SKIP LOCKED), so concurrent runs never get the same candidates; the run puts
+back what it did not use, and a claim left by a crashed run expires after
+BUSINESS_NEED_POOL_CLAIM_SECONDS. Candidates older than
+BUSINESS_NEED_POOL_MAX_AGE_DAYS are neither drawn nor kept, and each context
+keeps at most BUSINESS_NEED_POOL_MAX_PER_CONTEXT pooled candidates.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from app.agent.models.data_context import DataContext
+from app.services.embedding_service import parse_embedding, embedding_model_id
+from app.services.supabase_client import get_async_supabase_client
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BUSINESS_NEED_POOL = os.environ.get("BUSINESS_NEED_POOL", "true").lower() == "true"
+BUSINESS_NEED_POOL_CLAIM_SECONDS = int(os.environ.get("BUSINESS_NEED_POOL_CLAIM_SECONDS", "900"))
+BUSINESS_NEED_POOL_MAX_AGE_DAYS = int(os.environ.get("BUSINESS_NEED_POOL_MAX_AGE_DAYS", "30"))
+BUSINESS_NEED_POOL_MAX_PER_CONTEXT = int(os.environ.get("BUSINESS_NEED_POOL_MAX_PER_CONTEXT", "200"))
+
+
+@dataclass
+class PooledCandidate:
+    id: str
+    business_need: str
+    embedding: np.ndarray
+
+
+@dataclass
+class PoolStats:
+    """Process-wide pool counters (drawn / used / rejected / added)."""
+    drawn: int = 0
+    used: int = 0
+    rejected: int = 0
+    added: int = 0
+    requested: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return round(self.used / self.requested, 4) if self.requested else 0.0
+
+
+_stats = PoolStats()
+
+
+def context_version(data_context: DataContext) -> str:
+    """Hash of the project context candidates are generated from (plus the embedding model)."""
+    parts = [
+        embedding_model_id(),
+        data_context.project_summary,
+        data_context.domain,
+        data_context.stakeholder,
+        data_context.business_objective,
+        data_context.language,
+    ]
+    return hashlib.sha256("\x00".join(str(p or "") for p in parts).encode("utf-8")).hexdigest()[:32]
+
+
+async def draw_candidates(project_id: str, version: str, limit: int) -> List[PooledCandidate]:
+    """Claim up to `limit` pooled candidates for the project context (newest first).
+
+    Claimed candidates must be passed to `mark_candidates` (selected, rejected
+    or back to pooled) once the run has used them.
+    """
+    supabase = await get_async_supabase_client()
+    result = await supabase.rpc("claim_business_need_candidates", {
+        "p_project_id": project_id,
+        "p_context_version": version,
+        "p_embedding_model": embedding_model_id(),
+        "p_limit": limit,
+        "p_claim_seconds": BUSINESS_NEED_POOL_CLAIM_SECONDS,
+        "p_max_age_days": BUSINESS_NEED_POOL_MAX_AGE_DAYS,
+    }).execute()
+
+    candidates: List[PooledCandidate] = []
+    for row in result.data or []:
+        vector = parse_embedding(row.get("embedding"))
+        if vector is not None:
+            candidates.append(PooledCandidate(id=row["id"], business_need=row["business_need"], embedding=vector))
+    _stats.drawn += len(candidates)
+    return candidates
+
+
+async def add_candidates(project_id: str, version: str, texts: List[str], embeddings) -> None:
+    """Pool candidates that were generated but not selected."""
+    if not texts:
+        return
+    model_id = embedding_model_id()
+    rows = [
+        {
+            "project_id": project_id,
+            "business_need": text,
+            "embedding": np.asarray(embedding, dtype=np.float32).tolist(),
+            "embedding_model": model_id,
+            "context_version": version,
+        }
+        for text, embedding in zip(texts, embeddings)
+    ]
+    supabase = await get_async_supabase_client()
+    await supabase.table("business_need_candidates").insert(rows).execute()
+    _stats.added += len(rows)
+
+    pruned = await supabase.rpc("prune_business_need_candidates", {
+        "p_project_id": project_id,
+        "p_context_version": version,
+        "p_max_pooled": BUSINESS_NEED_POOL_MAX_PER_CONTEXT,
+        "p_max_age_days": BUSINESS_NEED_POOL_MAX_AGE_DAYS,
+    }).execute()
+    if pruned.data:
+        logger.info("Pruned %d expired or surplus pool candidate(s) for project %s", pruned.data, project_id)
+
+
+async def mark_candidates(ids: List[str], status: str) -> None:
+    """Move claimed candidates to `selected`, `rejected` or back to `pooled`."""
+    if not ids:
+        return
+    supabase = await get_async_supabase_client()
+    await supabase.table("business_need_candidates") \
+        .update({"status": status}) \
+        .in_("id", ids) \
+        .execute()
+    if status == "rejected":
+        _stats.rejected += len(ids)
+
+
+def record_run(requested: int, used: int) -> float:
+    """Record how many of a run's business needs came from the pool; returns the run's hit rate."""
+    _stats.requested += requested
+    _stats.used += used
+    return round(used / requested, 4) if requested else 0.0
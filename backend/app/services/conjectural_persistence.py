@@ -5,33 +5,16 @@ Saves DataContext conjectural data to the database and writes back
 the generated UUIDs into the in-memory models.
 """
 
-import re
-
 from app.agent.models.data_context import DataContext, ConjecturalData, ConjecturalRequirement, Evaluation
 from app.services.supabase_client import get_async_supabase_client
-from app.services.embedding_service import generate_embeddings
+from app.services.embedding_service import generate_embeddings, append_project_embeddings, embedding_model_id
+from app.services.ann_index import add_to_project_index
+from app.services.dashboard_cache import invalidate_dashboard_bundle
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-async def _get_next_requirement_number(supabase, project_id: str) -> int:
-    """Query the highest REQ-C number for a project and return the next one."""
-    result = await supabase.table("conjectural_requirements") \
-        .select("cod_requirement") \
-        .eq("project_id", project_id) \
-        .not_.is_("cod_requirement", "null") \
-        .order("cod_requirement", desc=True) \
-        .limit(1) \
-        .execute()
-
-    if not result.data or not result.data[0].get("cod_requirement"):
-        return 1
-
-    match = re.search(r"REQ-C(\d+)", result.data[0]["cod_requirement"])
-    return int(match.group(1)) + 1 if match else 1
-
-
 def _build_history_snapshot(cd: ConjecturalData) -> list[dict]:
     """Build a JSON-serializable history snapshot with all attempts and evaluations."""
     snapshot = []
@@ -87,11 +70,13 @@ def _build_requirement_snapshot(cr: ConjecturalRequirement) -> dict:
     }
 
 
-def _build_requirement_row(project_id: str, cr: ConjecturalRequirement, cod_requirement: str, user_id: str | None = None) -> dict:
-    """Build a database row dict from a ConjecturalRequirement (ranking=1 only)."""
+def _build_requirement_row(project_id: str, cr: ConjecturalRequirement, cod_requirement: str | None = None, user_id: str | None = None) -> dict:
+    """Build a database row dict from a ConjecturalRequirement (ranking=1 only).
+
+    Without `cod_requirement` the batch RPC allocates the next REQ-C code.
+    """
     row = {
         "project_id": project_id,
-        "cod_requirement": cod_requirement,
         "status": "todo",
         "desired_behavior": cr.ferc.desired_behavior,
         "business_need": cr.ferc.business_need,
@@ -100,22 +85,22 @@ def _build_requirement_row(project_id: str, cr: ConjecturalRequirement, cod_requ
         "uncertainty_evaluated": cr.qess.uncertainty_evaluated,
         "observation_analysis": cr.qess.observation_analysis,
     }
+    if cod_requirement:
+        row["cod_requirement"] = cod_requirement
     if user_id:
         row["user_id"] = user_id
     return row
 
 
 def _build_evaluation_row(
-    requirement_db_id: str,
     eval_type: str,
     evaluation: Evaluation,
     attempt: int,
     ranking: int | None,
     requirement_snapshot: dict,
 ) -> dict:
-    """Build a database row dict from an Evaluation."""
+    """Build a database row dict from an Evaluation (linked to its requirement by the batch RPC)."""
     return {
-        "requirement_id": requirement_db_id,
         "type": eval_type,
         "attempt": attempt,
         "ranking": ranking,
@@ -129,71 +114,116 @@ def _build_evaluation_row(
     }
 
 
-async def persist_conjectural_data(project_id: str, data_context: DataContext, user_id: str | None = None) -> list[str]:
-    """Persist conjectural requirements and evaluations to the database.
-
-    Only ranking=1 requirements are inserted into conjectural_requirements.
-    All evaluations (from all attempts) are linked to the winning requirement's ID.
-    """
-    supabase = await get_async_supabase_client()
+def _build_evaluation_rows(cd: ConjecturalData) -> list[dict]:
+    """Build evaluation rows from ALL attempts of a group (all linked to the winner)."""
+    eval_rows = []
+    for cr in cd.conjectural_requirements:
+        cr_snapshot = _build_requirement_snapshot(cr)
+        if cr.llm_evaluation and cr.llm_evaluation.scores:
+            eval_rows.append(_build_evaluation_row(
+                "llm", cr.llm_evaluation, cr.attempt, cr.ranking, cr_snapshot,
+            ))
+        if cr.human_evaluation and cr.human_evaluation.scores:
+            eval_rows.append(_build_evaluation_row(
+                "human", cr.human_evaluation, cr.attempt, cr.ranking, cr_snapshot,
+            ))
+    return eval_rows
 
-    # Get the next available REQ-C number for this project
-    next_number = await _get_next_requirement_number(supabase, project_id)
-    requirement_ids: list[str] = []
 
+def winning_groups(data_context: DataContext) -> list[tuple[ConjecturalData, ConjecturalRequirement]]:
+    """Return (group, winner) pairs for every group with a ranking=1 requirement."""
+    groups: list[tuple[ConjecturalData, ConjecturalRequirement]] = []
     for cd in data_context.conjectural_data:
-        # Build history snapshot once per group
-        history_snapshot = _build_history_snapshot(cd)
-
-        # Find the winner (ranking=1)
         winner = next((cr for cr in cd.conjectural_requirements if cr.ranking == 1), None)
         if not winner:
             logger.warning("No ranking=1 found, skipping")
             continue
+        groups.append((cd, winner))
+    return groups
+
+
+def build_batch_payload(
+    project_id: str,
+    groups: list[tuple[ConjecturalData, ConjecturalRequirement]],
+    user_id: str | None = None,
+) -> list[dict]:
+    """Build the `persist_conjectural_batch` items (without embeddings) for the winners."""
+    payload: list[dict] = []
+    for cd, winner in groups:
+        row = _build_requirement_row(project_id, winner, user_id=user_id)
+        row["history_snapshot"] = _build_history_snapshot(cd)
+        row["evaluations"] = _build_evaluation_rows(cd)
+        payload.append(row)
+    return payload
+
+
+async def write_batch_payload(project_id: str, payload: list[dict]) -> dict[int, dict]:
+    """Embed and insert a batch payload in one transaction; returns the saved items by index.
+
+    Items that already carry an embedding are not re-embedded. A failed
+    embedding call does not block the insert (the rows are saved without one).
+    """
+    supabase = await get_async_supabase_client()
 
-        # Generate business identifier
-        req_id = f"REQ-C{next_number:03d}"
-        next_number += 1
-        requirement_ids.append(req_id)
-
-        # Insert only the winning requirement
-        row = _build_requirement_row(project_id, winner, req_id, user_id)
-        row["history_snapshot"] = history_snapshot
-
-        # Generate and store embedding for the business_need
+    missing = [index for index, row in enumerate(payload) if not row.get("business_need_embedding")]
+    if missing:
         try:
-            embeddings = await generate_embeddings([winner.ferc.business_need])
-            if embeddings:
-                row["business_need_embedding"] = embeddings[0]
-                logger.info("Generated embedding for %s business_need", req_id)
+            embeddings = await generate_embeddings([payload[index]["business_need"] for index in missing])
+            logger.info("Generated %d business_need embedding(s)", len(embeddings))
+            for index, embedding in zip(missing, embeddings):
+                payload[index]["business_need_embedding"] = embedding
+                payload[index]["business_need_embedding_model"] = embedding_model_id()
         except Exception as e:
-            logger.error("Error generating embedding for %s", req_id, exc_info=True)
+            logger.error("Error generating business_need embeddings", exc_info=True)
+
+    # One round trip, one transaction: requirements + evaluations
+    result = await supabase.rpc("persist_conjectural_batch", {"payload": {"requirements": payload}}).execute()
+    saved = {item["item_index"]: item for item in result.data or []}
+
+    new_ids: list[str] = []
+    new_texts: list[str] = []
+    new_embeddings: list[list[float]] = []
+    for index, row in enumerate(payload):
+        item = saved.get(index)
+        if item is None:
+            logger.error("Failed to insert requirement #%d (%s)", index + 1, row["business_need"][:60])
+            continue
+        logger.info("Saved requirement %s → %s (%d evaluation(s))", item["cod_requirement"], item["id"], len(row["evaluations"]))
+        if row.get("business_need_embedding"):
+            new_ids.append(item["id"])
+            new_texts.append(row["business_need"])
+            new_embeddings.append(row["business_need_embedding"])
 
-        result = await supabase.table("conjectural_requirements").insert(row).execute()
+    # Keep the in-process similarity caches in sync with the new rows
+    append_project_embeddings(project_id, new_ids, new_texts, new_embeddings)
+    await add_to_project_index(project_id, new_ids, new_texts, new_embeddings)
+    if saved:
+        invalidate_dashboard_bundle(project_id)
 
-        if not result.data:
-            logger.error("Failed to insert requirement %s", req_id)
-            continue
+    return saved
+
+
+async def persist_conjectural_data(project_id: str, data_context: DataContext, user_id: str | None = None) -> list[str]:
+    """Persist conjectural requirements and evaluations to the database.
 
-        db_id = result.data[0]["id"]
-        winner.db_id = db_id
-        logger.info("Saved requirement %s → %s", req_id, db_id)
-
-        # Insert evaluations from ALL attempts, linked to the winner's db_id
-        eval_rows = []
-        for cr in cd.conjectural_requirements:
-            cr_snapshot = _build_requirement_snapshot(cr)
-            if cr.llm_evaluation and cr.llm_evaluation.scores:
-                eval_rows.append(_build_evaluation_row(
-                    db_id, "llm", cr.llm_evaluation, cr.attempt, cr.ranking, cr_snapshot,
-                ))
-            if cr.human_evaluation and cr.human_evaluation.scores:
-                eval_rows.append(_build_evaluation_row(
-                    db_id, "human", cr.human_evaluation, cr.attempt, cr.ranking, cr_snapshot,
-                ))
-
-        if eval_rows:
-            await supabase.table("evaluations").insert(eval_rows).execute()
-            logger.info("Saved %s evaluation(s) for requirement %s", len(eval_rows), db_id)
+    Only ranking=1 requirements are inserted into conjectural_requirements.
+    All evaluations (from all attempts) are linked to the winning requirement's ID.
+    The whole batch is written by the `persist_conjectural_batch` RPC in a
+    single transaction, which also allocates the REQ-C codes from the
+    project's counter; embeddings are computed once for all winners.
+    """
+    groups = winning_groups(data_context)
+    if not groups:
+        return []
+
+    saved = await write_batch_payload(project_id, build_batch_payload(project_id, groups, user_id))
+
+    requirement_ids: list[str] = []
+    for index, (cd, winner) in enumerate(groups):
+        item = saved.get(index)
+        if item is None:
+            continue
+        winner.db_id = item["id"]
+        requirement_ids.append(item["cod_requirement"])
 
     return requirement_ids
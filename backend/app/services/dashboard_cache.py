@@ -0,0 +1,66 @@
+"""
+Per-project cache of the dashboard chart bundle.
+
+The dashboard charts are computed together from one fetch of a project's
+evaluation scores; the result is kept here until new evaluations of that
+project are persisted (`invalidate_dashboard_bundle`, called by the batch
+write). Concurrent requests for the same project share one computation.
+
+Evaluations persisted by another process (agent server) cannot invalidate
+this process's entry. When the caller passes the project's change version
+(project_versions, bumped by a trigger on every write), an entry is served
+only for the version it was computed at; otherwise entries expire after
+DASHBOARD_CACHE_TTL_SECONDS.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DASHBOARD_CACHE_TTL_SECONDS = float(os.environ.get("DASHBOARD_CACHE_TTL_SECONDS", "60"))
+
+# project_id -> (computed_at, version, bundle)
+_bundles: Dict[str, Tuple[float, Optional[int], Dict[str, Any]]] = {}
+_locks: Dict[str, asyncio.Lock] = {}
+# Bumped by every invalidation; a computation started before it is not cached
+_generations: Dict[str, int] = {}
+
+
+async def get_dashboard_bundle(
+    project_id: str,
+    compute: Callable[[str], Awaitable[Dict[str, Any]]],
+    version: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Return the cached bundle of a project, computing it with `compute` on a miss.
+
+    `version` must be read before calling, so the bundle is never older than it.
+    """
+    lock = _locks.setdefault(project_id, asyncio.Lock())
+    async with lock:
+        cached = _bundles.get(project_id)
+        if cached is not None:
+            computed_at, cached_version, bundle = cached
+            if version is not None and cached_version == version:
+                return bundle
+            if version is None and time.monotonic() - computed_at < DASHBOARD_CACHE_TTL_SECONDS:
+                return bundle
+
+        generation = _generations.get(project_id, 0)
+        started = time.perf_counter()
+        bundle = await compute(project_id)
+        # Evaluations persisted while computing: serve this result but do not keep it
+        if _generations.get(project_id, 0) == generation:
+            _bundles[project_id] = (time.monotonic(), version, bundle)
+        logger.info("Computed dashboard bundle for project %s in %.1f ms", project_id, (time.perf_counter() - started) * 1000)
+        return bundle
+
+
+def invalidate_dashboard_bundle(project_id: str) -> None:
+    """Drop the cached bundle of a project (new evaluations were persisted)."""
+    _generations[project_id] = _generations.get(project_id, 0) + 1
+    _bundles.pop(project_id, None)
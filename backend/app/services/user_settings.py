@@ -4,17 +4,17 @@ User Settings Service
 Fetches user preferences from the Supabase `settings` table.
 """
 
-from app.services.supabase_client import get_supabase_client, safe_maybe_single_execute
+from app.services.supabase_client import get_async_supabase_client, safe_maybe_single_execute
 from app.agent.llm_config import LLMProvider, DEFAULT_LLM_PROVIDER
 
 
-def get_user_model_preference(user_id: str) -> LLMProvider:
+async def get_user_model_preference(user_id: str) -> LLMProvider:
     """Fetch the user's LLM provider preference from the settings table.
 
     Returns DEFAULT_LLM_PROVIDER ("gemini") when no setting is found.
     """
-    supabase = get_supabase_client()
-    result = safe_maybe_single_execute(
+    supabase = await get_async_supabase_client()
+    result = await safe_maybe_single_execute(
         supabase.table("settings")
         .select("model")
         .eq("user_id", user_id)
@@ -0,0 +1,40 @@
+"""
+Single-runner leases for background workers.
+
+Every uvicorn worker runs the API lifespan, so a background job would run once
+per process. A job that must run in one place at a time takes a named lease
+(`worker_leases` row, `acquire_worker_lease` RPC) before working and renews it
+while it works. A lease not renewed within its duration (holder crashed) can be
+taken by any other process.
+"""
+
+import os
+import socket
+import uuid
+
+from app.services.supabase_client import get_async_supabase_client
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Identifies this process as a lease holder
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def acquire_lease(name: str, seconds: int) -> bool:
+    """Take or renew lease `name` for `seconds`; True if this process holds it."""
+    supabase = await get_async_supabase_client()
+    result = await supabase.rpc("acquire_worker_lease", {
+        "p_name": name, "p_holder": HOLDER_ID, "p_seconds": seconds,
+    }).execute()
+    return bool(result.data)
+
+
+async def release_lease(name: str) -> None:
+    """Give up lease `name` if this process holds it."""
+    try:
+        supabase = await get_async_supabase_client()
+        await supabase.rpc("release_worker_lease", {"p_name": name, "p_holder": HOLDER_ID}).execute()
+    except Exception:
+        # Expires on its own
+        logger.error("Failed to release worker lease %s", name, exc_info=True)
@@ -5,6 +5,8 @@ FastAPI application for handling project and requirement management,
 including document processing and AI-powered requirement extraction.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -18,14 +20,41 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.routers import projects, requirements, conjectural_requirements, agent, dashboard, profiles, admin
+from app.routers import projects, requirements, conjectural_requirements, agent, dashboard, profiles, admin, analytics
 from app.routers import settings as settings_router
 from app.middleware.request_logging import RequestLoggingMiddleware
+from app.services.persistence_outbox import run_outbox_worker
+from app.services.embedding_backfill import run_backfill_worker
+from app.services.supabase_client import get_async_supabase_client, close_async_supabase_client
+from app.services.repository import close_repository
 
 
 # Initialize settings
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared Supabase client and run the background workers alongside the API.
+
+    Every uvicorn worker runs the lifespan: BACKGROUND_WORKERS=false keeps the
+    workers out of all but one process.
+    """
+    await get_async_supabase_client()
+    stop = asyncio.Event()
+    workers = []
+    if settings.background_workers:
+        workers = [
+            asyncio.create_task(run_outbox_worker(stop)),
+            asyncio.create_task(run_backfill_worker(stop)),
+        ]
+    yield
+    stop.set()
+    await asyncio.gather(*workers)
+    await close_repository()
+    await close_async_supabase_client()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="CONREQ Multi-Agent API",
@@ -33,6 +62,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -42,6 +72,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination headers of the list endpoints, conditional GET validator
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
 # Request logging middleware
@@ -56,6 +88,7 @@ app.include_router(dashboard.router, prefix="/api")
 app.include_router(profiles.router, prefix="/api")
 app.include_router(settings_router.router, prefix="/api")
 app.include_router(admin.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
 
 
 @app.get("/")
@@ -0,0 +1,185 @@
+"""
+The two dashboard engines must build the same bundle.
+
+The "sql" engine rounds the result of the `dashboard_aggregates` RPC; the
+"frame" engine aggregates the evaluation rows itself. Without a database the
+RPC is emulated below, statement by statement, with the same semantics as
+supabase/migrations/20261019200000_dashboard_aggregates.sql (exact numeric
+averages, percentile_cont over the lower / upper halves, DISTINCT ON pairing,
+NULLs last in ORDER BY).
+"""
+
+import random
+import uuid
+from fractions import Fraction
+from typing import Any, Dict, List, Optional
+
+from app.routers.dashboard import CHARTS, _bundle_from_aggregates
+from app.services.evaluation_frame import CRITERIA, EvaluationFrame
+
+
+def _nulls_last(value: Optional[int]):
+    return (value is None, value or 0)
+
+
+def _percentile_cont_median(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * 0.5
+    lo = int(position)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (position - lo)
+
+
+def dashboard_aggregates(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Python emulation of the `dashboard_aggregates` RPC for one project's evaluation rows."""
+    ev = [{**row, "criteria_sum": sum(row[c] for c in CRITERIA)} for row in rows]
+
+    radar = []
+    for eval_type in sorted({row["type"] for row in ev}):
+        group = [row for row in ev if row["type"] == eval_type]
+        radar.append({
+            "type": eval_type,
+            **{c: float(Fraction(sum(row[c] for row in group), len(group))) for c in CRITERIA},
+            "overall_score": float(Fraction(sum(row["criteria_sum"] for row in group), len(CRITERIA) * len(group))),
+        })
+
+    boxplot = []
+    groups = sorted({(row["attempt"], row["type"]) for row in ev if row["attempt"] is not None})
+    for attempt, eval_type in groups:
+        scores = sorted(row["criteria_sum"] / len(CRITERIA) for row in ev if (row["attempt"], row["type"]) == (attempt, eval_type))
+        n = len(scores)
+        q1 = _percentile_cont_median(scores[:n // 2])
+        q3 = _percentile_cont_median(scores[(n + 1) // 2:])
+        boxplot.append({
+            "attempt": attempt, "type": eval_type,
+            "min": scores[0],
+            "q1": scores[0] if q1 is None else q1,
+            "median": _percentile_cont_median(scores),
+            "q3": scores[-1] if q3 is None else q3,
+            "max": scores[-1],
+        })
+
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for row in ev:
+        key = (row["requirement_id"], row["attempt"], row["type"])
+        if key not in latest or row["id"] > latest[key]["id"]:
+            latest[key] = row
+    pairs = [
+        (llm, latest[(llm["requirement_id"], llm["attempt"], "human")])
+        for (_, _, eval_type), llm in latest.items()
+        if eval_type == "llm" and (llm["requirement_id"], llm["attempt"], "human") in latest
+    ]
+
+    confusion: Dict[Optional[int], Dict[str, Any]] = {}
+    for llm, human in pairs:
+        counts = confusion.setdefault(llm["attempt"], {"attempt": llm["attempt"], "tp": 0, "fp": 0, "fn": 0, "tn": 0})
+        for c in CRITERIA:
+            llm_pos, human_pos = llm[c] >= 4, human[c] >= 4
+            counts["tp" if llm_pos and human_pos else "fp" if llm_pos else "fn" if human_pos else "tn"] += 1
+
+    pass_groups: Dict[tuple, Dict[str, Any]] = {}
+    for row in ev:
+        group = pass_groups.setdefault((row["requirement_id"], row["type"]), {"passed": False, "first_pass": None})
+        if row["criteria_sum"] >= 20:
+            group["passed"] = True
+            if row["attempt"] is not None and (group["first_pass"] is None or row["attempt"] < group["first_pass"]):
+                group["first_pass"] = row["attempt"]
+    pass_rate = []
+    for eval_type in sorted({eval_type for _, eval_type in pass_groups}):
+        groups_of_type = [g for (_, t), g in pass_groups.items() if t == eval_type]
+        pass_rate.append({
+            "type": eval_type,
+            "total": len(groups_of_type),
+            "pass_at_1": sum(g["passed"] and g["first_pass"] == 1 for g in groups_of_type),
+            "pass_at_2": sum(g["passed"] and g["first_pass"] == 2 for g in groups_of_type),
+            "pass_at_3": sum(g["passed"] and g["first_pass"] not in (1, 2) for g in groups_of_type),
+            "fail": sum(not g["passed"] for g in groups_of_type),
+        })
+
+    points = [
+        {"requirement_id": llm["requirement_id"], "attempt": llm["attempt"], "llm_sum": llm["criteria_sum"], "human_sum": human["criteria_sum"]}
+        for llm, human in sorted(pairs, key=lambda pair: (pair[0]["requirement_id"], _nulls_last(pair[0]["attempt"])))
+    ]
+
+    return {
+        "radar": radar,
+        "boxplot": boxplot,
+        "confusion": sorted(confusion.values(), key=lambda row: _nulls_last(row["attempt"])),
+        "pass_rate": pass_rate,
+        "points": points,
+    }
+
+
+def _evaluation(requirement_id: str, eval_type: str, attempt: Optional[int], rng: random.Random) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "requirement_id": requirement_id,
+        "type": eval_type,
+        "attempt": attempt,
+        **{c: rng.randint(1, 5) for c in CRITERIA},
+    }
+
+
+def _synthetic_project(rng: random.Random) -> List[Dict[str, Any]]:
+    """Evaluation rows respecting UNIQUE (requirement_id, type, attempt): only NULL attempts repeat."""
+    rows = []
+    for _ in range(rng.randint(0, 12)):
+        requirement_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        for attempt in rng.sample([1, 2, 3, None], rng.randint(1, 4)):
+            for eval_type in ("llm", "human"):
+                if rng.random() < 0.8:
+                    copies = rng.randint(1, 3) if attempt is None else 1
+                    rows.extend(_evaluation(requirement_id, eval_type, attempt, rng) for _ in range(copies))
+    rng.shuffle(rows)
+    return rows
+
+
+def _frame_bundle(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    frame = EvaluationFrame.from_rows(rows)
+    return {name: compute(frame) for name, compute in CHARTS.items()}
+
+
+def test_engines_agree_on_random_projects():
+    rng = random.Random(47)
+    for _ in range(500):
+        rows = _synthetic_project(rng)
+        assert _bundle_from_aggregates(dashboard_aggregates(rows)) == _frame_bundle(rows)
+
+
+def test_null_attempt_sorts_after_numbered_attempts():
+    rng = random.Random(1)
+    requirement_id = str(uuid.UUID(int=1))
+    rows = [
+        _evaluation(requirement_id, eval_type, attempt, rng)
+        for attempt in (2, None, 1)
+        for eval_type in ("llm", "human")
+    ]
+    expected = _frame_bundle(rows)
+    bundle = _bundle_from_aggregates(dashboard_aggregates(rows))
+
+    assert [entry["attempt"] for entry in bundle["classification_metrics"]["attempts"]] == [1, 2, None]
+    assert [point["attempt"] for point in bundle["scatter_correlation"]["points"]] == [1, 2, None]
+    assert bundle == expected
+
+
+def test_duplicate_null_attempt_evaluations_pair_the_greatest_id():
+    requirement_id = str(uuid.UUID(int=1))
+    scores_low = {c: 1 for c in CRITERIA}
+    scores_high = {c: 5 for c in CRITERIA}
+    rows = [
+        {"id": str(uuid.UUID(int=20)), "requirement_id": requirement_id, "type": "llm", "attempt": None, **scores_high},
+        {"id": str(uuid.UUID(int=10)), "requirement_id": requirement_id, "type": "llm", "attempt": None, **scores_low},
+        {"id": str(uuid.UUID(int=30)), "requirement_id": requirement_id, "type": "human", "attempt": None, **scores_high},
+        {"id": str(uuid.UUID(int=5)), "requirement_id": requirement_id, "type": "human", "attempt": None, **scores_low},
+    ]
+    expected = _frame_bundle(rows)
+    bundle = _bundle_from_aggregates(dashboard_aggregates(rows))
+
+    # One pair (not 2 x 2), both sides the greatest id
+    assert bundle["confusion_matrix"] == {"tp": len(CRITERIA), "fp": 0, "fn": 0, "tn": 0}
+    assert bundle["scatter_correlation"]["points"] == [
+        {"requirement_id": requirement_id, "attempt": None, "human_avg": 5.0, "llm_avg": 5.0},
+    ]
+    assert bundle == expected
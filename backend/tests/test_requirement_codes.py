@@ -0,0 +1,120 @@
+"""
+REQ-C codes stay unique and gap-free under concurrent allocation.
+
+Dozens of connections allocate codes for the same project at once, through
+`allocate_requirement_codes` directly and through `persist_conjectural_batch`
+(which allocates a code for every requirement sent without one). Together they
+must receive exactly REQ-C001..REQ-C<n>, past 999 included. Skipped unless
+DATABASE_URL points at a migrated database (e.g. `supabase start`).
+"""
+
+import asyncio
+import json
+import os
+import random
+import uuid
+
+import pytest
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+if not DATABASE_URL:
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+asyncpg = pytest.importorskip("asyncpg")
+
+WORKERS = 48
+
+
+async def _create_project() -> tuple[uuid.UUID, uuid.UUID]:
+    user_id, project_id = uuid.uuid4(), uuid.uuid4()
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        await conn.execute(
+            "INSERT INTO auth.users (id, email, raw_user_meta_data) VALUES ($1, $2, '{}'::jsonb)",
+            user_id, f"codes-{user_id}@example.test",
+        )
+        await conn.execute("INSERT INTO public.projects (id, user_id, title) VALUES ($1, $2, 'code allocation test')", project_id, user_id)
+    finally:
+        await conn.close()
+    return user_id, project_id
+
+
+async def _drop_project(user_id: uuid.UUID, project_id: uuid.UUID) -> None:
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        # Cascades to its requirements and code counter
+        await conn.execute("DELETE FROM public.projects WHERE id = $1", project_id)
+        await conn.execute("DELETE FROM auth.users WHERE id = $1", user_id)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture
+def project():
+    user_id, project_id = asyncio.run(_create_project())
+    yield user_id, project_id
+    asyncio.run(_drop_project(user_id, project_id))
+
+
+def _requirement(project_id: uuid.UUID, user_id: uuid.UUID) -> dict:
+    return {
+        "project_id": str(project_id),
+        "user_id": str(user_id),
+        "desired_behavior": "desired behavior",
+        "business_need": f"business need {uuid.uuid4()}",
+        "uncertainty": "uncertainty",
+        "solution_assumption": "assumption",
+        "uncertainty_evaluated": "evaluated",
+        "observation_analysis": "analysis",
+        "evaluations": [],
+    }
+
+
+async def _allocate_concurrently(user_id: uuid.UUID, project_id: uuid.UUID) -> tuple[list[str], list[str], list[str]]:
+    """(codes returned by allocate_requirement_codes, by persist_conjectural_batch, stored on the rows)."""
+    rng = random.Random(38)
+    pool = await asyncpg.create_pool(DATABASE_URL, min_size=WORKERS, max_size=WORKERS)
+    start = asyncio.Event()
+
+    async def allocate(count: int) -> list[str]:
+        async with pool.acquire() as conn:
+            await start.wait()
+            rows = await conn.fetch("SELECT code FROM public.allocate_requirement_codes($1, $2) AS code", project_id, count)
+            return [row["code"] for row in rows]
+
+    async def persist(count: int) -> list[str]:
+        payload = {"requirements": [_requirement(project_id, user_id) for _ in range(count)]}
+        async with pool.acquire() as conn:
+            await start.wait()
+            rows = await conn.fetch("SELECT cod_requirement FROM public.persist_conjectural_batch($1::jsonb)", json.dumps(payload))
+            return [row["cod_requirement"] for row in rows]
+
+    try:
+        allocations = [asyncio.create_task(allocate(rng.randint(45, 60))) for _ in range(WORKERS // 2)]
+        persists = [asyncio.create_task(persist(rng.randint(1, 3))) for _ in range(WORKERS // 2)]
+        # Every worker holds its connection before any of them allocates
+        await asyncio.sleep(0.5)
+        start.set()
+        allocated = [code for codes in await asyncio.gather(*allocations) for code in codes]
+        persisted = [code for codes in await asyncio.gather(*persists) for code in codes]
+        stored = [
+            row["cod_requirement"]
+            for row in await pool.fetch("SELECT cod_requirement FROM public.conjectural_requirements WHERE project_id = $1", project_id)
+        ]
+    finally:
+        await pool.close()
+    return allocated, persisted, stored
+
+
+def test_concurrent_allocations_are_unique_and_gap_free(project):
+    user_id, project_id = project
+    allocated, persisted, stored = asyncio.run(_allocate_concurrently(user_id, project_id))
+    returned = allocated + persisted
+
+    # 24 x 45+ codes: the run crosses REQ-C999
+    assert len(returned) > 999
+    assert len(returned) == len(set(returned))
+    numbers = sorted(int(code.removeprefix("REQ-C")) for code in returned)
+    assert numbers == list(range(1, len(returned) + 1))
+    assert all(code == f"REQ-C{int(code.removeprefix('REQ-C')):03d}" for code in returned)
+    # Persisted rows carry the codes their call returned
+    assert sorted(stored) == sorted(persisted)
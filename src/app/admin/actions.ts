@@ -1,6 +1,7 @@
 'use server'
 
 import { createClient } from '@/lib/supabase/server'
+import { fetchAllPages } from '@/lib/pagination'
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
 
@@ -25,7 +26,7 @@ export async function fetchAllUsers(): Promise<{ data?: AdminUser[]; error?: str
   try {
     const userId = await getAuthUserId()
 
-    const response = await fetch(`${API_BASE_URL}/api/admin/users`, {
+    const { ok, data, response } = await fetchAllPages<AdminUser>(`${API_BASE_URL}/api/admin/users`, {
       method: 'GET',
       headers: {
         'Authorization': `Bearer ${userId}`,
@@ -33,13 +34,12 @@ export async function fetchAllUsers(): Promise<{ data?: AdminUser[]; error?: str
       cache: 'no-store',
     })
 
-    if (!response.ok) {
+    if (!ok) {
       const body = await response.json().catch(() => ({}))
       return { error: body.detail || 'Failed to fetch users' }
     }
 
-    const data = await response.json()
-    return { data: data as AdminUser[] }
+    return { data }
   } catch (err) {
     return { error: err instanceof Error ? err.message : 'Failed to fetch users' }
   }
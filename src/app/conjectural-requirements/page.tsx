@@ -24,6 +24,8 @@ import InterruptFormEvaluation from '@/components/conjectural-requirements/Inter
 import type { RequirementItem } from '@/components/conjectural-requirements/InterruptFormEvaluation';
 import Spinner from "@/components/ui/Spinner";
 import { useAuth } from '@/contexts/AuthContext';
+import { createClient } from '@/lib/supabase/client';
+import { fetchPage } from '@/lib/pagination';
 import Button from '@/components/ui/Button';
 import Textarea from '@/components/ui/Textarea';
 import type { ConjecturalRequirement, ConjecturalEvaluation, ConjecturalStatus } from '@/types';
@@ -34,6 +36,8 @@ import EvaluationRadarCard from '@/components/conjectural-requirements/Evaluatio
 
 
 const TOAST_DURATION_MS = 5000;
+// ~40s of polling for requirements still being persisted in the background
+const PERSIST_WAIT_ATTEMPTS = 12;
 
 interface AgentState {
   run_id: string;
@@ -315,6 +319,19 @@ function ConjecturalRequirementsInner() {
     }
   });
   
+  // Write-behind persistence: a requirement id is known before its row exists, retry 404s with backoff
+  const fetchRequirementWhenVisible = useCallback(async (id: string): Promise<ConjecturalRequirement | null> => {
+    for (let attempt = 0; attempt < PERSIST_WAIT_ATTEMPTS; attempt++) {
+      const res = await fetch(`${API_URL}/api/conjectural-requirements/${id}`, {
+        headers: { Authorization: `Bearer ${user?.id || ""}` },
+      });
+      if (res.ok) return res.json();
+      if (res.status !== 404) return null;
+      await new Promise((resolve) => setTimeout(resolve, Math.min(500 * 2 ** attempt, 4000)));
+    }
+    return null;
+  }, [API_URL, user?.id]);
+
   const paramSchema = z.object({ requirement_ids: z.string().describe("The JSON string containing requirement ids") });
 
   useFrontendTool({
@@ -324,15 +341,9 @@ function ConjecturalRequirementsInner() {
     handler: async ({ requirement_ids }) => {
       const ids: string[] = JSON.parse(requirement_ids);
 
-      //step 1: Fetch each requirement by ID in parallel
+      //step 1: Fetch each requirement by ID in parallel (rows are written in the background, so wait for them)
       const results = await Promise.allSettled(
-        ids.map(async (id) => {
-          const res = await fetch(`${API_URL}/api/conjectural-requirements/${id}`, {
-            headers: { Authorization: `Bearer ${user?.id || ""}` },
-          });
-          if (!res.ok) return null;
-          return res.json();
-        })
+        ids.map((id) => fetchRequirementWhenVisible(id))
       );
 
       const newRequirements: ConjecturalRequirement[] = results
@@ -364,7 +375,7 @@ function ConjecturalRequirementsInner() {
 
       return <EvaluationRadarCard evaluations={evaluations} requirementId={requirementId} />;
     },
-  }, [API_URL, user?.id]);
+  }, [API_URL, user?.id, fetchRequirementWhenVisible]);
 
   const showEvalParamSchema = z.object({ cod_requirement: z.string().describe("The conjectural requirement code (e.g. REQ-C001)") });
 
@@ -404,6 +415,8 @@ function ConjecturalRequirementsInner() {
   const [kanbanRequirements, setKanbanRequirements] = useState<ConjecturalRequirement[]>([]);
   const [kanbanLoading, setKanbanLoading] = useState(false);
   const [kanbanError, setKanbanError] = useState<string | null>(null);
+  const [kanbanNextCursor, setKanbanNextCursor] = useState<string | null>(null);
+  const [kanbanLoadingMore, setKanbanLoadingMore] = useState(false);
   const [newCardIds, setNewCardIds] = useState<Set<string>>(new Set());
   const [selectedRequirement, setSelectedRequirement] = useState<ConjecturalRequirement | null>(null);
 
@@ -453,20 +466,24 @@ function ConjecturalRequirementsInner() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [selectedProject?.id, projectIdFromQuery, currentProjectId, fetchRequirements]);
 
-  // Fetch kanban conjectural requirements (ranking = 1 only)
+  // Fetch kanban conjectural requirements (ranking = 1 only), first page;
+  // the following pages are loaded on demand
   const fetchKanbanRequirements = useCallback(async (projectId: string, signal: AbortSignal) => {
     setKanbanLoading(true);
     setKanbanError(null);
     setKanbanRequirements([]);
+    setKanbanNextCursor(null);
     try {
-      const res = await fetch(`${API_URL}/api/conjectural-requirements/project/${projectId}`, {
-        headers: { Authorization: `Bearer ${user?.id || ""}` },
-        signal,
-      });
-      if (!res.ok) throw new Error("Failed to fetch conjectural requirements");
-      const data: ConjecturalRequirement[] = await res.json();
+      const { ok, data, nextCursor } = await fetchPage<ConjecturalRequirement>(
+        `${API_URL}/api/conjectural-requirements/project/${projectId}`,
+        null,
+        { headers: { Authorization: `Bearer ${user?.id || ""}` }, signal },
+      );
+      if (!ok) throw new Error("Failed to fetch conjectural requirements");
       if (!signal.aborted) {
-        setKanbanRequirements(data);
+        // Realtime inserts may have landed while the page was loading
+        setKanbanRequirements((prev) => [...prev, ...data.filter((r) => !prev.some((p) => p.id === r.id))]);
+        setKanbanNextCursor(nextCursor);
       }
     } catch (err) {
       if (signal.aborted) return;
@@ -478,6 +495,25 @@ function ConjecturalRequirementsInner() {
     }
   }, [API_URL, user?.id]);
 
+  const loadMoreKanbanRequirements = useCallback(async () => {
+    if (!selectedProject?.id || !kanbanNextCursor || kanbanLoadingMore) return;
+    setKanbanLoadingMore(true);
+    try {
+      const { ok, data, nextCursor } = await fetchPage<ConjecturalRequirement>(
+        `${API_URL}/api/conjectural-requirements/project/${selectedProject.id}`,
+        kanbanNextCursor,
+        { headers: { Authorization: `Bearer ${user?.id || ""}` } },
+      );
+      if (!ok) throw new Error("Failed to fetch conjectural requirements");
+      setKanbanRequirements((prev) => [...prev, ...data.filter((r) => !prev.some((p) => p.id === r.id))]);
+      setKanbanNextCursor(nextCursor);
+    } catch (err) {
+      setKanbanError(err instanceof Error ? err.message : "Unknown error");
+    } finally {
+      setKanbanLoadingMore(false);
+    }
+  }, [API_URL, user?.id, selectedProject?.id, kanbanNextCursor, kanbanLoadingMore]);
+
   useEffect(() => {
     if (!selectedProject?.id) return;
     const controller = new AbortController();
@@ -485,6 +521,29 @@ function ConjecturalRequirementsInner() {
     return () => controller.abort();
   }, [selectedProject?.id, fetchKanbanRequirements]);
 
+  // Add requirements to the board as soon as their (write-behind) rows are inserted
+  useEffect(() => {
+    if (!selectedProject?.id) return;
+    const supabase = createClient();
+    const channel = supabase
+      .channel(`conjectural-requirements-${selectedProject.id}`)
+      .on(
+        "postgres_changes",
+        { event: "INSERT", schema: "public", table: "conjectural_requirements", filter: `project_id=eq.${selectedProject.id}` },
+        async (payload) => {
+          const id = (payload.new as { id?: string }).id;
+          if (!id) return;
+          const requirement = await fetchRequirementWhenVisible(id);
+          if (!requirement) return;
+          setKanbanRequirements((prev) => (prev.some((r) => r.id === requirement.id) ? prev : [requirement, ...prev]));
+        }
+      )
+      .subscribe();
+    return () => {
+      supabase.removeChannel(channel);
+    };
+  }, [selectedProject?.id, fetchRequirementWhenVisible]);
+
   // Kanban status change handler
   const handleKanbanStatusChange = useCallback(async (requirementId: string, newStatus: ConjecturalStatus) => {
     // Optimistic update
@@ -649,6 +708,18 @@ function ConjecturalRequirementsInner() {
           );
         }}
       />
+
+      {kanbanNextCursor && !kanbanLoading && (
+        <div className="flex justify-center mt-4">
+          <button
+            className="px-4 py-2.5 border border-border-light dark:border-gray-600 rounded-lg text-sm text-gray-600 dark:text-gray-300 hover:bg-gray-50 dark:hover:bg-gray-700 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+            onClick={loadMoreKanbanRequirements}
+            disabled={kanbanLoadingMore}
+          >
+            {kanbanLoadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </>
   );
 }
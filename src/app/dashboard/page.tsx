@@ -53,21 +53,17 @@ export default function DashboardPage() {
     setScatterData(null);
 
     try {
-      const [radar, boxplot, confusion, metrics, passRate, scatter] = await Promise.all([
-        fetch(`${API_URL}/api/dashboard/radar/${pid}`, { headers }).then((r) => r.json()),
-        fetch(`${API_URL}/api/dashboard/boxplot/${pid}`, { headers }).then((r) => r.json()),
-        fetch(`${API_URL}/api/dashboard/confusion-matrix/${pid}`, { headers }).then((r) => r.json()),
-        fetch(`${API_URL}/api/dashboard/classification-metrics/${pid}`, { headers }).then((r) => r.json()),
-        fetch(`${API_URL}/api/dashboard/pass-rate/${pid}`, { headers }).then((r) => r.json()),
-        fetch(`${API_URL}/api/dashboard/scatter-correlation/${pid}`, { headers }).then((r) => r.json()),
-      ]);
-
-      setRadarData(radar);
-      setBoxplotData(boxplot);
-      setConfusionData(confusion);
-      setMetricsData(metrics);
-      setPassRateData(passRate);
-      setScatterData(scatter);
+      // All charts come from one cached server-side computation
+      const res = await fetch(`${API_URL}/api/dashboard/${pid}/bundle`, { headers });
+      if (!res.ok) throw new Error('Failed to fetch dashboard data');
+      const bundle = await res.json();
+
+      setRadarData(bundle.radar);
+      setBoxplotData(bundle.boxplot);
+      setConfusionData(bundle.confusion_matrix);
+      setMetricsData(bundle.classification_metrics);
+      setPassRateData(bundle.pass_rate);
+      setScatterData(bundle.scatter_correlation);
     } catch (err) {
       console.error('Failed to fetch dashboard data:', err);
     } finally {
@@ -36,6 +36,9 @@ function RequirementsInner() {
     currentProjectId,
     isLoading,
     error,
+    hasMore,
+    isLoadingMore,
+    loadMoreRequirements,
     fetchRequirements,
     deleteRequirement,
     clearRequirements
@@ -222,6 +225,9 @@ function RequirementsInner() {
         currentPage={currentPage}
         totalPages={totalPages}
         onPageChange={setCurrentPage}
+        hasMore={hasMore && !projectNotFound}
+        isLoadingMore={isLoadingMore}
+        onLoadMore={loadMoreRequirements}
       />
     </>
   );
@@ -289,7 +289,29 @@ export default function ConjecturalDetailView({
     return () => window.removeEventListener("keydown", handleKeyDown);
   }, [open, onClose]);
 
-  const historyEntries: HistorySnapshotEntry[] = (requirement?.history_snapshot as HistorySnapshotEntry[]) ?? [];
+  // The board list is fetched with the summary view: load the history snapshot on demand
+  const [loadedHistory, setLoadedHistory] = useState<{ id: string; entries: unknown[] | null } | null>(null);
+
+  useEffect(() => {
+    if (!open || !requirement || requirement.history_snapshot !== undefined) return;
+    if (loadedHistory?.id === requirement.id) return;
+    const controller = new AbortController();
+    fetch(`${API_URL}/api/conjectural-requirements/${requirement.id}/history`, {
+      headers: { Authorization: `Bearer ${userId}` },
+      signal: controller.signal,
+    })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => {
+        if (data) setLoadedHistory({ id: requirement.id, entries: data.history_snapshot ?? null });
+      })
+      .catch(() => {});
+    return () => controller.abort();
+  }, [open, requirement, userId, loadedHistory?.id]);
+
+  const historySource = requirement?.history_snapshot !== undefined
+    ? requirement?.history_snapshot
+    : loadedHistory?.id === requirement?.id ? loadedHistory?.entries : null;
+  const historyEntries: HistorySnapshotEntry[] = (historySource as HistorySnapshotEntry[]) ?? [];
 
   const handleSave = useCallback(async () => {
     if (!requirement) return;
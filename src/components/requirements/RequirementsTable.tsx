@@ -15,6 +15,10 @@ interface RequirementsTableProps {
   currentPage: number;
   totalPages: number;
   onPageChange: (page: number) => void;
+  // Rows not loaded yet (the list is fetched one server page at a time)
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
 export default function RequirementsTable({ 
@@ -24,7 +28,10 @@ export default function RequirementsTable({
   onDelete,
   currentPage,
   totalPages,
-  onPageChange
+  onPageChange,
+  hasMore = false,
+  isLoadingMore = false,
+  onLoadMore,
 }: RequirementsTableProps) {
   const [selectedRequirement, setSelectedRequirement] = useState<Requirement | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -48,6 +55,16 @@ export default function RequirementsTable({
     );
   }
 
+  const loadMoreButton = hasMore && (
+    <button
+      className="flex items-center px-3 py-2.5 ml-[10px] border border-border-light dark:border-gray-600 rounded-lg text-sm text-gray-600 dark:text-gray-300 hover:bg-gray-50 dark:hover:bg-gray-700 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+      onClick={() => onLoadMore?.()}
+      disabled={isLoadingMore}
+    >
+      {isLoadingMore ? 'Loading...' : 'Load more'}
+    </button>
+  );
+
   if (isLoading || requirements.length === 0) {
     return (
       <Card className="flex items-center justify-center py-12">
@@ -57,9 +74,12 @@ export default function RequirementsTable({
             <span className="ml-3 text-gray-600 dark:text-gray-300">Loading requirements...</span>
           </>
         ) : (
-          <p className="text-gray-500 dark:text-gray-400 text-center">
-            No requirements found.
-          </p>
+          <div className="flex flex-col items-center gap-3">
+            <p className="text-gray-500 dark:text-gray-400 text-center">
+              {hasMore ? 'No requirements found in the loaded pages.' : 'No requirements found.'}
+            </p>
+            {loadMoreButton}
+          </div>
         )}
       </Card>
     );
@@ -183,6 +203,7 @@ export default function RequirementsTable({
             >
                 Next
             </button>
+            {loadMoreButton}
         </div>
       </div>
     </Card>
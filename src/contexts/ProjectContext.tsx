@@ -3,6 +3,7 @@
 import { createContext, useContext, useState, useEffect, useCallback, useRef, ReactNode, useMemo } from 'react';
 import { useAuth } from './AuthContext';
 import { Project } from '@/types';
+import { fetchAllPages } from '@/lib/pagination';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 const API_PREFIX = "/api";
@@ -66,18 +67,16 @@ export function ProjectProvider({ children }: { children: ReactNode }) {
     setError(null);
 
     try {
-      const response = await fetch(`${API_BASE_URL}${API_PREFIX}/projects`, {
+      const { ok, data } = await fetchAllPages<Project>(`${API_BASE_URL}${API_PREFIX}/projects`, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${user.id}`,
         },
       });
 
-      if (!response.ok) {
+      if (!ok) {
         throw new Error('Failed to fetch projects');
       }
-
-      const data = await response.json();
       
       // Update module-level cache
       cachedProjects = data;
@@ -3,6 +3,7 @@
 import { createContext, useContext, useState, useCallback, ReactNode } from 'react';
 import { useAuth } from './AuthContext';
 import { Requirement, RequirementAPI, mapBackendTypeToFrontend } from '@/types';
+import { fetchPage } from '@/lib/pagination';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 const API_PREFIX = "/api";
@@ -28,6 +29,10 @@ interface RequirementsContextType {
   currentProjectId: string | null;
   isLoading: boolean;
   error: string | null;
+  // More requirements are available on the server (loaded one page at a time)
+  hasMore: boolean;
+  isLoadingMore: boolean;
+  loadMoreRequirements: () => Promise<void>;
   fetchRequirements: (projectId: string, projectAuthor: string, forceRefresh?: boolean) => Promise<Requirement[]>;
   prefetchRequirements: (projectId: string, projectAuthor: string) => Promise<void>;
   clearRequirements: () => void;
@@ -42,6 +47,7 @@ interface RequirementsCache {
   projectId: string;
   requirements: Requirement[];
   projectAuthor: string;
+  nextCursor: string | null;
 }
 let cachedRequirements: RequirementsCache | null = null;
 
@@ -53,16 +59,19 @@ export function RequirementsProvider({ children }: { children: ReactNode }) {
       return {
         requirements: cachedRequirements.requirements,
         projectId: cachedRequirements.projectId,
+        nextCursor: cachedRequirements.nextCursor,
       };
     }
-    return { requirements: [], projectId: null };
+    return { requirements: [], projectId: null, nextCursor: null };
   };
 
   const initialState = getInitialState();
   
   const [requirements, setRequirements] = useState<Requirement[]>(initialState.requirements);
   const [currentProjectId, setCurrentProjectId] = useState<string | null>(initialState.projectId);
+  const [nextCursor, setNextCursor] = useState<string | null>(initialState.nextCursor);
   const [isLoading, setIsLoading] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const fetchRequirements = useCallback(async (
@@ -73,6 +82,7 @@ export function RequirementsProvider({ children }: { children: ReactNode }) {
     if (!user?.id) {
       setRequirements([]);
       setCurrentProjectId(null);
+      setNextCursor(null);
       return [];
     }
 
@@ -80,6 +90,7 @@ export function RequirementsProvider({ children }: { children: ReactNode }) {
     if (!forceRefresh && cachedRequirements?.projectId === projectId) {
       setRequirements(cachedRequirements.requirements);
       setCurrentProjectId(projectId);
+      setNextCursor(cachedRequirements.nextCursor);
       setIsLoading(false);
       return cachedRequirements.requirements;
     }
@@ -90,32 +101,34 @@ export function RequirementsProvider({ children }: { children: ReactNode }) {
     try {
       const url = `${API_BASE_URL}${API_PREFIX}/requirements/project/${projectId}`;
 
-      const response = await fetch(url, {
+      // First page only; the rest is loaded on demand (loadMoreRequirements)
+      const { ok, status, data, nextCursor: cursor } = await fetchPage<RequirementAPI>(url, null, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${user.id}`,
         },
       });
 
-      if (!response.ok) {
-        if (response.status === 404) {
+      if (!ok) {
+        if (status === 404) {
           const emptyResult: Requirement[] = [];
-          cachedRequirements = { projectId, requirements: emptyResult, projectAuthor };
+          cachedRequirements = { projectId, requirements: emptyResult, projectAuthor, nextCursor: null };
           setRequirements(emptyResult);
           setCurrentProjectId(projectId);
+          setNextCursor(null);
           return emptyResult;
         }
         throw new Error('Failed to fetch requirements');
       }
 
-      const data: RequirementAPI[] = await response.json();
       const transformed = data.map(req => transformRequirement(req, projectAuthor));
       
       // Update module-level cache
-      cachedRequirements = { projectId, requirements: transformed, projectAuthor };
+      cachedRequirements = { projectId, requirements: transformed, projectAuthor, nextCursor: cursor };
       
       setRequirements(transformed);
       setCurrentProjectId(projectId);
+      setNextCursor(cursor);
       
       return transformed;
     } catch (err) {
@@ -140,34 +153,66 @@ export function RequirementsProvider({ children }: { children: ReactNode }) {
     try {
       const url = `${API_BASE_URL}${API_PREFIX}/requirements/project/${projectId}`;
 
-      const response = await fetch(url, {
+      const { ok, status, data, nextCursor: cursor } = await fetchPage<RequirementAPI>(url, null, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${user.id}`,
         },
       });
 
-      if (!response.ok) {
-        if (response.status === 404) {
-          cachedRequirements = { projectId, requirements: [], projectAuthor };
+      if (!ok) {
+        if (status === 404) {
+          cachedRequirements = { projectId, requirements: [], projectAuthor, nextCursor: null };
           return;
         }
         throw new Error('Failed to prefetch requirements');
       }
 
-      const data: RequirementAPI[] = await response.json();
       const transformed = data.map(req => transformRequirement(req, projectAuthor));
       
       // Update module-level cache
-      cachedRequirements = { projectId, requirements: transformed, projectAuthor };
+      cachedRequirements = { projectId, requirements: transformed, projectAuthor, nextCursor: cursor };
     } catch (err) {
       console.error('Error prefetching requirements:', err);
     }
   }, [user?.id]);
 
+  // Append the next page of the current project
+  const loadMoreRequirements = useCallback(async (): Promise<void> => {
+    if (!user?.id || !currentProjectId || !nextCursor || isLoadingMore) return;
+
+    setIsLoadingMore(true);
+    try {
+      const url = `${API_BASE_URL}${API_PREFIX}/requirements/project/${currentProjectId}`;
+      const { ok, data, nextCursor: cursor } = await fetchPage<RequirementAPI>(url, nextCursor, {
+        method: 'GET',
+        headers: {
+          'Authorization': `Bearer ${user.id}`,
+        },
+      });
+
+      if (!ok) {
+        throw new Error('Failed to load more requirements');
+      }
+
+      const projectAuthor = cachedRequirements?.projectAuthor ?? 'Unknown';
+      const transformed = data.map(req => transformRequirement(req, projectAuthor));
+      const updatedRequirements = [...requirements, ...transformed];
+
+      cachedRequirements = { projectId: currentProjectId, requirements: updatedRequirements, projectAuthor, nextCursor: cursor };
+      setRequirements(updatedRequirements);
+      setNextCursor(cursor);
+    } catch (err) {
+      console.error('Error loading more requirements:', err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }, [user?.id, currentProjectId, nextCursor, isLoadingMore, requirements]);
+
   const clearRequirements = useCallback(() => {
     setRequirements([]);
     setCurrentProjectId(null);
+    setNextCursor(null);
     cachedRequirements = null;
   }, []);
 
@@ -217,6 +262,9 @@ export function RequirementsProvider({ children }: { children: ReactNode }) {
         currentProjectId,
         isLoading,
         error,
+        hasMore: nextCursor !== null,
+        isLoadingMore,
+        loadMoreRequirements,
         fetchRequirements,
         prefetchRequirements,
         clearRequirements,
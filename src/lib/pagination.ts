@@ -0,0 +1,62 @@
+// Keyset-paginated list endpoints return one page per request and the cursor
+// of the next page in the X-Next-Cursor header.
+
+// Page size of lists loaded on demand (board, requirements)
+export const LIST_PAGE_SIZE = 100;
+// Page size when a list has to be complete (project picker, admin users)
+export const PAGE_SIZE = 500;
+
+export interface PagedResult<T> {
+  ok: boolean;
+  status: number;
+  data: T[];
+  response: Response;
+}
+
+export interface Page<T> extends PagedResult<T> {
+  // Cursor of the next page; null on the last page or on failure
+  nextCursor: string | null;
+}
+
+function withParams(url: string, params: Record<string, string>): string {
+  const separator = url.includes("?") ? "&" : "?";
+  return `${url}${separator}${new URLSearchParams(params).toString()}`;
+}
+
+// Fetches one page: the first one without a cursor, the following ones with
+// the nextCursor of the previous page.
+export async function fetchPage<T>(
+  url: string,
+  cursor: string | null,
+  init?: RequestInit,
+  limit: number = LIST_PAGE_SIZE,
+): Promise<Page<T>> {
+  const params: Record<string, string> = { limit: String(limit) };
+  if (cursor) params.cursor = cursor;
+  const response = await fetch(withParams(url, params), init);
+  if (!response.ok) {
+    return { ok: false, status: response.status, data: [], nextCursor: null, response };
+  }
+  const data = (await response.json()) as T[];
+  return { ok: true, status: response.status, data, nextCursor: response.headers.get("X-Next-Cursor"), response };
+}
+
+// Follows X-Next-Cursor until the last page and concatenates the rows.
+// Stops at the first failed response, which is returned as-is.
+// Only for lists that must be complete; user-facing lists page on demand.
+export async function fetchAllPages<T>(url: string, init?: RequestInit): Promise<PagedResult<T>> {
+  const data: T[] = [];
+  let cursor: string | null = null;
+
+  for (;;) {
+    const page: Page<T> = await fetchPage<T>(url, cursor, init, PAGE_SIZE);
+    if (!page.ok) {
+      return { ok: false, status: page.status, data, response: page.response };
+    }
+    data.push(...page.data);
+    cursor = page.nextCursor;
+    if (!cursor) {
+      return { ok: true, status: page.status, data, response: page.response };
+    }
+  }
+}
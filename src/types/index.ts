@@ -129,7 +129,8 @@ export interface ConjecturalEvaluation {
   verifiable: number;
   conforming: number;
   overall_score: number;
-  justifications: Record<string, string>;
+  // Only in the full view
+  justifications?: Record<string, string>;
   created_at: string;
 }
 
@@ -147,7 +148,8 @@ export interface ConjecturalRequirement {
   uncertainty_evaluated: string;
   observation_analysis: string;
   evaluations: ConjecturalEvaluation[];
-  history_snapshot: unknown[] | null;
+  // Only in the full view (single-requirement endpoints); lists use ?view=summary
+  history_snapshot?: unknown[] | null;
   created_at: string;
   updated_at: string;
 }
@@ -0,0 +1,79 @@
+-- ============================================================
+-- Migration: ANN index + batch similarity RPCs for business needs
+-- Duplicate/diversity checks run inside Postgres against every
+-- embedding of the project (not only the newest 50), and only
+-- the scores travel back over PostgREST.
+-- ============================================================
+
+-- 1. HNSW index on cosine distance
+CREATE INDEX IF NOT EXISTS "idx_conj_req_business_need_embedding_hnsw"
+    ON "public"."conjectural_requirements"
+    USING "hnsw" ("business_need_embedding" "extensions"."vector_cosine_ops");
+
+
+-- 2. Top-k nearest neighbours for a batch of query vectors
+--    query_embeddings: JSON array of vectors, e.g. [[0.1, ...], [0.3, ...]]
+--    iterative_scan keeps scanning the index until the project filter
+--    yields match_count rows (pgvector >= 0.8), so results stay complete
+--    regardless of how many other projects share the index.
+CREATE OR REPLACE FUNCTION "public"."match_business_need_neighbors"(
+    "query_project_id" "uuid",
+    "query_embeddings" "jsonb",
+    "match_count" integer DEFAULT 5
+) RETURNS TABLE("query_index" integer, "id" "uuid", "business_need" "text", "similarity" double precision)
+    LANGUAGE "sql" STABLE
+    SET "search_path" TO 'public', 'extensions'
+    SET hnsw.iterative_scan TO 'relaxed_order'
+    AS $$
+  SELECT (q.ord - 1)::integer AS query_index, n.id, n.business_need, n.similarity
+  FROM jsonb_array_elements_text(query_embeddings) WITH ORDINALITY AS q(embedding, ord)
+  CROSS JOIN LATERAL (
+    SELECT cr.id,
+           cr.business_need,
+           1 - (cr.business_need_embedding <=> q.embedding::vector) AS similarity
+    FROM conjectural_requirements cr
+    WHERE cr.project_id = query_project_id
+      AND cr.business_need_embedding IS NOT NULL
+    ORDER BY cr.business_need_embedding <=> q.embedding::vector
+    LIMIT match_count
+  ) n
+  ORDER BY query_index, n.similarity DESC;
+$$;
+
+
+ALTER FUNCTION "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer) OWNER TO "postgres";
+
+
+-- 3. Max similarity per query vector (NULL when the project has no embeddings)
+--    strict_order: relaxed_order may return the scanned rows slightly out
+--    of order, so LIMIT 1 could miss the nearest one and underestimate
+--    the similarity of a near-duplicate.
+CREATE OR REPLACE FUNCTION "public"."max_business_need_similarity"(
+    "query_project_id" "uuid",
+    "query_embeddings" "jsonb"
+) RETURNS TABLE("query_index" integer, "max_similarity" double precision)
+    LANGUAGE "sql" STABLE
+    SET "search_path" TO 'public', 'extensions'
+    SET hnsw.iterative_scan TO 'strict_order'
+    AS $$
+  SELECT (q.ord - 1)::integer AS query_index, n.similarity AS max_similarity
+  FROM jsonb_array_elements_text(query_embeddings) WITH ORDINALITY AS q(embedding, ord)
+  LEFT JOIN LATERAL (
+    SELECT 1 - (cr.business_need_embedding <=> q.embedding::vector) AS similarity
+    FROM conjectural_requirements cr
+    WHERE cr.project_id = query_project_id
+      AND cr.business_need_embedding IS NOT NULL
+    ORDER BY cr.business_need_embedding <=> q.embedding::vector
+    LIMIT 1
+  ) n ON true
+  ORDER BY query_index;
+$$;
+
+
+ALTER FUNCTION "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb") OWNER TO "postgres";
+
+
+GRANT ALL ON FUNCTION "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer) TO "authenticated";
+GRANT ALL ON FUNCTION "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer) TO "service_role";
+GRANT ALL ON FUNCTION "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb") TO "authenticated";
+GRANT ALL ON FUNCTION "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb") TO "service_role";
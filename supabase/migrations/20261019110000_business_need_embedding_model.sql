@@ -0,0 +1,110 @@
+-- ============================================================
+-- Migration: namespace business_need embeddings by model
+-- Every stored vector records the embedding backend/model that
+-- produced it, and the similarity RPCs only compare vectors of
+-- the same model (query_model). NULL query_model keeps the old,
+-- unfiltered behaviour for callers that do not pass it.
+-- ============================================================
+
+-- 1. Model id column; existing vectors all came from Azure text-embedding-3-small
+ALTER TABLE "public"."conjectural_requirements"
+    ADD COLUMN IF NOT EXISTS "business_need_embedding_model" "text";
+
+UPDATE "public"."conjectural_requirements"
+    SET "business_need_embedding_model" = 'azure:text-embedding-3-small'
+    WHERE "business_need_embedding" IS NOT NULL
+      AND "business_need_embedding_model" IS NULL;
+
+
+-- 2. Newest embeddings of a project (per-project cache)
+DROP FUNCTION IF EXISTS "public"."match_business_need_embeddings"("query_project_id" "uuid", "match_count" integer);
+
+CREATE OR REPLACE FUNCTION "public"."match_business_need_embeddings"(
+    "query_project_id" "uuid",
+    "match_count" integer DEFAULT 50,
+    "query_model" "text" DEFAULT NULL
+) RETURNS TABLE("id" "uuid", "positive_impact" "text", "embedding" "extensions"."vector")
+    LANGUAGE "sql" STABLE
+    AS $$SELECT id, business_need, business_need_embedding AS embedding
+  FROM conjectural_requirements
+  WHERE project_id = query_project_id
+    AND business_need_embedding IS NOT NULL
+    AND (query_model IS NULL OR business_need_embedding_model = query_model)
+  ORDER BY created_at DESC
+  LIMIT match_count;$$;
+
+
+ALTER FUNCTION "public"."match_business_need_embeddings"("query_project_id" "uuid", "match_count" integer, "query_model" "text") OWNER TO "postgres";
+
+
+-- 3. Top-k nearest neighbours for a batch of query vectors
+DROP FUNCTION IF EXISTS "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer);
+
+CREATE OR REPLACE FUNCTION "public"."match_business_need_neighbors"(
+    "query_project_id" "uuid",
+    "query_embeddings" "jsonb",
+    "match_count" integer DEFAULT 5,
+    "query_model" "text" DEFAULT NULL
+) RETURNS TABLE("query_index" integer, "id" "uuid", "business_need" "text", "similarity" double precision)
+    LANGUAGE "sql" STABLE
+    SET "search_path" TO 'public', 'extensions'
+    SET hnsw.iterative_scan TO 'relaxed_order'
+    AS $$
+  SELECT (q.ord - 1)::integer AS query_index, n.id, n.business_need, n.similarity
+  FROM jsonb_array_elements_text(query_embeddings) WITH ORDINALITY AS q(embedding, ord)
+  CROSS JOIN LATERAL (
+    SELECT cr.id,
+           cr.business_need,
+           1 - (cr.business_need_embedding <=> q.embedding::vector) AS similarity
+    FROM conjectural_requirements cr
+    WHERE cr.project_id = query_project_id
+      AND cr.business_need_embedding IS NOT NULL
+      AND (query_model IS NULL OR cr.business_need_embedding_model = query_model)
+    ORDER BY cr.business_need_embedding <=> q.embedding::vector
+    LIMIT match_count
+  ) n
+  ORDER BY query_index, n.similarity DESC;
+$$;
+
+
+ALTER FUNCTION "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer, "query_model" "text") OWNER TO "postgres";
+
+
+-- 4. Max similarity per query vector (NULL when the project has no embeddings of the model)
+--    strict_order so that LIMIT 1 is the nearest row (see the previous migration)
+DROP FUNCTION IF EXISTS "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb");
+
+CREATE OR REPLACE FUNCTION "public"."max_business_need_similarity"(
+    "query_project_id" "uuid",
+    "query_embeddings" "jsonb",
+    "query_model" "text" DEFAULT NULL
+) RETURNS TABLE("query_index" integer, "max_similarity" double precision)
+    LANGUAGE "sql" STABLE
+    SET "search_path" TO 'public', 'extensions'
+    SET hnsw.iterative_scan TO 'strict_order'
+    AS $$
+  SELECT (q.ord - 1)::integer AS query_index, n.similarity AS max_similarity
+  FROM jsonb_array_elements_text(query_embeddings) WITH ORDINALITY AS q(embedding, ord)
+  LEFT JOIN LATERAL (
+    SELECT 1 - (cr.business_need_embedding <=> q.embedding::vector) AS similarity
+    FROM conjectural_requirements cr
+    WHERE cr.project_id = query_project_id
+      AND cr.business_need_embedding IS NOT NULL
+      AND (query_model IS NULL OR cr.business_need_embedding_model = query_model)
+    ORDER BY cr.business_need_embedding <=> q.embedding::vector
+    LIMIT 1
+  ) n ON true
+  ORDER BY query_index;
+$$;
+
+
+ALTER FUNCTION "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb", "query_model" "text") OWNER TO "postgres";
+
+
+GRANT ALL ON FUNCTION "public"."match_business_need_embeddings"("query_project_id" "uuid", "match_count" integer, "query_model" "text") TO "anon";
+GRANT ALL ON FUNCTION "public"."match_business_need_embeddings"("query_project_id" "uuid", "match_count" integer, "query_model" "text") TO "authenticated";
+GRANT ALL ON FUNCTION "public"."match_business_need_embeddings"("query_project_id" "uuid", "match_count" integer, "query_model" "text") TO "service_role";
+GRANT ALL ON FUNCTION "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer, "query_model" "text") TO "authenticated";
+GRANT ALL ON FUNCTION "public"."match_business_need_neighbors"("query_project_id" "uuid", "query_embeddings" "jsonb", "match_count" integer, "query_model" "text") TO "service_role";
+GRANT ALL ON FUNCTION "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb", "query_model" "text") TO "authenticated";
+GRANT ALL ON FUNCTION "public"."max_business_need_similarity"("query_project_id" "uuid", "query_embeddings" "jsonb", "query_model" "text") TO "service_role";
@@ -0,0 +1,149 @@
+-- ============================================================
+-- Migration: per-project pool of business-need candidates
+-- generate_business_needs oversamples candidates and keeps only
+-- the most diverse; the rest are pooled here (with embeddings)
+-- and drawn by later runs on the same project context before
+-- the LLM is asked for more.
+-- Runs claim candidates atomically (SKIP LOCKED), so concurrent
+-- runs never draw the same ones; a claim left by a crashed run
+-- expires. The pool is bounded by age and per-context size.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS "public"."business_need_candidates" (
+    "id" "uuid" DEFAULT "gen_random_uuid"() NOT NULL,
+    "project_id" "uuid" NOT NULL,
+    "business_need" "text" NOT NULL,
+    "embedding" "extensions"."vector"(1536) NOT NULL,
+    "embedding_model" "text" NOT NULL,
+    -- Hash of the project context the candidate was generated from
+    "context_version" "text" NOT NULL,
+    "status" "text" DEFAULT 'pooled'::"text" NOT NULL,
+    "created_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "business_need_candidates_status_check" CHECK (("status" = ANY (ARRAY['pooled'::"text", 'claimed'::"text", 'selected'::"text", 'rejected'::"text"])))
+);
+
+
+ALTER TABLE "public"."business_need_candidates" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."business_need_candidates"
+    ADD CONSTRAINT "business_need_candidates_pkey" PRIMARY KEY ("id");
+
+
+ALTER TABLE ONLY "public"."business_need_candidates"
+    ADD CONSTRAINT "business_need_candidates_project_id_fkey" FOREIGN KEY ("project_id") REFERENCES "public"."projects"("id") ON DELETE CASCADE;
+
+
+-- Draw path: pooled candidates of a project/context/model, newest first
+CREATE INDEX IF NOT EXISTS "idx_business_need_candidates_draw"
+    ON "public"."business_need_candidates" USING "btree" ("project_id", "context_version", "embedding_model", "created_at" DESC)
+    WHERE ("status" = 'pooled'::"text");
+
+
+-- Expired claims of a project
+CREATE INDEX IF NOT EXISTS "idx_business_need_candidates_claimed"
+    ON "public"."business_need_candidates" USING "btree" ("project_id", "updated_at")
+    WHERE ("status" = 'claimed'::"text");
+
+
+CREATE OR REPLACE TRIGGER "trg_business_need_candidates_updated_at" BEFORE UPDATE ON "public"."business_need_candidates" FOR EACH ROW EXECUTE FUNCTION "public"."update_updated_at_column"();
+
+
+-- Claim up to p_limit pooled candidates of a project context (newest first, at most
+-- p_max_age_days old). Claims older than p_claim_seconds belong to a run that never
+-- finished and go back to the pool first. The run then marks each claimed candidate
+-- selected, rejected or pooled again.
+CREATE OR REPLACE FUNCTION "public"."claim_business_need_candidates"(
+    "p_project_id" "uuid",
+    "p_context_version" "text",
+    "p_embedding_model" "text",
+    "p_limit" integer,
+    "p_claim_seconds" integer DEFAULT 900,
+    "p_max_age_days" integer DEFAULT 30
+) RETURNS TABLE("id" "uuid", "business_need" "text", "embedding" "extensions"."vector")
+    LANGUAGE "plpgsql"
+    AS $$
+BEGIN
+  UPDATE business_need_candidates c
+  SET status = 'pooled'
+  WHERE c.project_id = p_project_id
+    AND c.status = 'claimed'
+    AND c.updated_at < now() - make_interval(secs => p_claim_seconds);
+
+  RETURN QUERY
+  UPDATE business_need_candidates b
+  SET status = 'claimed'
+  WHERE b.id IN (
+    SELECT c.id
+    FROM business_need_candidates c
+    WHERE c.project_id = p_project_id
+      AND c.context_version = p_context_version
+      AND c.embedding_model = p_embedding_model
+      AND c.status = 'pooled'
+      AND c.created_at > now() - make_interval(days => p_max_age_days)
+    ORDER BY c.created_at DESC
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING b.id, b.business_need, b.embedding;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."claim_business_need_candidates"("p_project_id" "uuid", "p_context_version" "text", "p_embedding_model" "text", "p_limit" integer, "p_claim_seconds" integer, "p_max_age_days" integer) OWNER TO "postgres";
+
+
+-- Bound the pool of a project: drop candidates older than p_max_age_days (claims
+-- excepted) and the pooled candidates of a context beyond its newest p_max_pooled.
+-- Returns the number of rows deleted.
+CREATE OR REPLACE FUNCTION "public"."prune_business_need_candidates"(
+    "p_project_id" "uuid",
+    "p_context_version" "text",
+    "p_max_pooled" integer DEFAULT 200,
+    "p_max_age_days" integer DEFAULT 30
+) RETURNS integer
+    LANGUAGE "sql"
+    AS $$
+  WITH expired AS (
+    DELETE FROM business_need_candidates c
+    WHERE c.project_id = p_project_id
+      AND c.status <> 'claimed'
+      AND c.created_at < now() - make_interval(days => p_max_age_days)
+    RETURNING 1
+  ), overflow AS (
+    DELETE FROM business_need_candidates c
+    WHERE c.id IN (
+      SELECT p.id
+      FROM business_need_candidates p
+      WHERE p.project_id = p_project_id
+        AND p.context_version = p_context_version
+        AND p.status = 'pooled'
+        AND p.created_at >= now() - make_interval(days => p_max_age_days)
+      ORDER BY p.created_at DESC
+      OFFSET p_max_pooled
+    )
+    RETURNING 1
+  )
+  SELECT ((SELECT count(*) FROM expired) + (SELECT count(*) FROM overflow))::integer;
+$$;
+
+
+ALTER FUNCTION "public"."prune_business_need_candidates"("p_project_id" "uuid", "p_context_version" "text", "p_max_pooled" integer, "p_max_age_days" integer) OWNER TO "postgres";
+
+
+CREATE POLICY "Service role full access business need candidates" ON "public"."business_need_candidates" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+CREATE POLICY "Users can view own business need candidates" ON "public"."business_need_candidates" FOR SELECT USING (("project_id" IN ( SELECT "projects"."id"
+   FROM "public"."projects"
+  WHERE ("projects"."user_id" = "auth"."uid"()))));
+
+
+ALTER TABLE "public"."business_need_candidates" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."business_need_candidates" TO "authenticated";
+GRANT ALL ON TABLE "public"."business_need_candidates" TO "service_role";
+GRANT ALL ON FUNCTION "public"."claim_business_need_candidates"("p_project_id" "uuid", "p_context_version" "text", "p_embedding_model" "text", "p_limit" integer, "p_claim_seconds" integer, "p_max_age_days" integer) TO "service_role";
+GRANT ALL ON FUNCTION "public"."prune_business_need_candidates"("p_project_id" "uuid", "p_context_version" "text", "p_max_pooled" integer, "p_max_age_days" integer) TO "service_role";
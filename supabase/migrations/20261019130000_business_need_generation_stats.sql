@@ -0,0 +1,57 @@
+-- ============================================================
+-- Migration: per-project business-need generation statistics
+-- Counts how many generated candidates passed the duplicate
+-- threshold and how many were selected, so the oversampling
+-- factor of generate_business_needs adapts per project.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS "public"."business_need_generation_stats" (
+    "project_id" "uuid" NOT NULL,
+    "generated" integer DEFAULT 0 NOT NULL,
+    "passed" integer DEFAULT 0 NOT NULL,
+    "selected" integer DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL
+);
+
+
+ALTER TABLE "public"."business_need_generation_stats" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."business_need_generation_stats"
+    ADD CONSTRAINT "business_need_generation_stats_pkey" PRIMARY KEY ("project_id");
+
+
+ALTER TABLE ONLY "public"."business_need_generation_stats"
+    ADD CONSTRAINT "business_need_generation_stats_project_id_fkey" FOREIGN KEY ("project_id") REFERENCES "public"."projects"("id") ON DELETE CASCADE;
+
+
+-- Atomic increment (concurrent runs on the same project must not lose counts)
+CREATE OR REPLACE FUNCTION "public"."record_business_need_generation"(
+    "p_project_id" "uuid",
+    "p_generated" integer,
+    "p_passed" integer,
+    "p_selected" integer
+) RETURNS "void"
+    LANGUAGE "sql"
+    AS $$
+  INSERT INTO business_need_generation_stats (project_id, generated, passed, selected)
+  VALUES (p_project_id, p_generated, p_passed, p_selected)
+  ON CONFLICT (project_id) DO UPDATE
+    SET generated = business_need_generation_stats.generated + EXCLUDED.generated,
+        passed = business_need_generation_stats.passed + EXCLUDED.passed,
+        selected = business_need_generation_stats.selected + EXCLUDED.selected,
+        updated_at = now();
+$$;
+
+
+ALTER FUNCTION "public"."record_business_need_generation"("p_project_id" "uuid", "p_generated" integer, "p_passed" integer, "p_selected" integer) OWNER TO "postgres";
+
+
+CREATE POLICY "Service role full access business need generation stats" ON "public"."business_need_generation_stats" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+ALTER TABLE "public"."business_need_generation_stats" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."business_need_generation_stats" TO "service_role";
+GRANT ALL ON FUNCTION "public"."record_business_need_generation"("p_project_id" "uuid", "p_generated" integer, "p_passed" integer, "p_selected" integer) TO "service_role";
@@ -0,0 +1,88 @@
+-- ============================================================
+-- Migration: single-transaction bulk persistence
+-- persist_conjectural_batch inserts every winning conjectural
+-- requirement of a run (with history snapshot and embedding)
+-- and all of its evaluations in one call / one transaction,
+-- returning the generated ids in payload order.
+--
+-- payload: {"requirements": [{
+--     "project_id", "cod_requirement", "status", "desired_behavior",
+--     "business_need", "uncertainty", "solution_assumption",
+--     "uncertainty_evaluated", "observation_analysis", "user_id",
+--     "history_snapshot", "business_need_embedding" ([...] | null),
+--     "business_need_embedding_model",
+--     "evaluations": [{"type", "attempt", "ranking", "unambiguous",
+--         "completeness", "atomicity", "verifiable", "conforming",
+--         "justifications", "requirement_snapshot"}]
+-- }]}
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION "public"."persist_conjectural_batch"("payload" "jsonb")
+RETURNS TABLE("item_index" integer, "id" "uuid", "cod_requirement" "text")
+    LANGUAGE "plpgsql"
+    SET "search_path" TO 'public', 'extensions'
+    AS $$
+#variable_conflict use_column
+DECLARE
+  item jsonb;
+  item_ord bigint;
+  new_id uuid;
+BEGIN
+  FOR item, item_ord IN
+    SELECT r.value, r.ordinality
+    FROM jsonb_array_elements(COALESCE(payload->'requirements', '[]'::jsonb)) WITH ORDINALITY AS r(value, ordinality)
+  LOOP
+    INSERT INTO conjectural_requirements (
+      project_id, cod_requirement, status, desired_behavior, business_need, uncertainty,
+      solution_assumption, uncertainty_evaluated, observation_analysis, user_id,
+      history_snapshot, business_need_embedding, business_need_embedding_model
+    )
+    VALUES (
+      (item->>'project_id')::uuid,
+      item->>'cod_requirement',
+      COALESCE(item->>'status', 'todo')::conjectural_status,
+      item->>'desired_behavior',
+      item->>'business_need',
+      item->>'uncertainty',
+      item->>'solution_assumption',
+      item->>'uncertainty_evaluated',
+      item->>'observation_analysis',
+      (item->>'user_id')::uuid,
+      item->'history_snapshot',
+      CASE WHEN jsonb_typeof(item->'business_need_embedding') = 'array'
+           THEN (item->>'business_need_embedding')::vector END,
+      item->>'business_need_embedding_model'
+    )
+    RETURNING conjectural_requirements.id INTO new_id;
+
+    INSERT INTO evaluations (
+      requirement_id, type, attempt, ranking, unambiguous, completeness, atomicity,
+      verifiable, conforming, justifications, requirement_snapshot
+    )
+    SELECT new_id,
+           (e->>'type')::evaluation_type,
+           (e->>'attempt')::integer,
+           (e->>'ranking')::integer,
+           (e->>'unambiguous')::integer,
+           (e->>'completeness')::integer,
+           (e->>'atomicity')::integer,
+           (e->>'verifiable')::integer,
+           (e->>'conforming')::integer,
+           COALESCE(e->'justifications', '{}'::jsonb),
+           e->'requirement_snapshot'
+    FROM jsonb_array_elements(COALESCE(item->'evaluations', '[]'::jsonb)) AS e;
+
+    item_index := (item_ord - 1)::integer;
+    id := new_id;
+    cod_requirement := item->>'cod_requirement';
+    RETURN NEXT;
+  END LOOP;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."persist_conjectural_batch"("payload" "jsonb") OWNER TO "postgres";
+
+
+GRANT ALL ON FUNCTION "public"."persist_conjectural_batch"("payload" "jsonb") TO "authenticated";
+GRANT ALL ON FUNCTION "public"."persist_conjectural_batch"("payload" "jsonb") TO "service_role";
@@ -0,0 +1,155 @@
+-- ============================================================
+-- Migration: atomic REQ-C code allocation
+-- Codes used to be derived from the highest cod_requirement
+-- (text ordering, racy across concurrent runs, wrong past 999).
+-- A per-project counter row is incremented with an upsert,
+-- which locks the row, so concurrent allocations never overlap.
+-- Uniqueness is enforced by the existing
+-- conjectural_requirements_project_requirement_id_key
+-- UNIQUE ("project_id", "cod_requirement") constraint.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS "public"."requirement_code_counters" (
+    "project_id" "uuid" NOT NULL,
+    "last_number" integer DEFAULT 0 NOT NULL
+);
+
+
+ALTER TABLE "public"."requirement_code_counters" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."requirement_code_counters"
+    ADD CONSTRAINT "requirement_code_counters_pkey" PRIMARY KEY ("project_id");
+
+
+ALTER TABLE ONLY "public"."requirement_code_counters"
+    ADD CONSTRAINT "requirement_code_counters_project_id_fkey" FOREIGN KEY ("project_id") REFERENCES "public"."projects"("id") ON DELETE CASCADE;
+
+
+-- Seed counters from the numeric part of existing codes (not their text order)
+INSERT INTO "public"."requirement_code_counters" ("project_id", "last_number")
+SELECT "project_id", MAX((substring("cod_requirement" FROM 'REQ-C(\d+)'))::integer)
+FROM "public"."conjectural_requirements"
+WHERE "cod_requirement" ~ 'REQ-C\d+'
+GROUP BY "project_id"
+ON CONFLICT ("project_id") DO NOTHING;
+
+
+-- Allocate p_count consecutive codes for a project, e.g. REQ-C007, REQ-C008
+CREATE OR REPLACE FUNCTION "public"."allocate_requirement_codes"("p_project_id" "uuid", "p_count" integer DEFAULT 1)
+RETURNS SETOF "text"
+    LANGUAGE "plpgsql" SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+DECLARE
+  last_allocated integer;
+BEGIN
+  IF p_count IS NULL OR p_count < 1 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO requirement_code_counters AS c (project_id, last_number)
+  VALUES (
+    p_project_id,
+    -- First allocation for a project created before the counter existed
+    COALESCE((
+      SELECT MAX((substring(cr.cod_requirement FROM 'REQ-C(\d+)'))::integer)
+      FROM conjectural_requirements cr
+      WHERE cr.project_id = p_project_id AND cr.cod_requirement ~ 'REQ-C\d+'
+    ), 0) + p_count
+  )
+  ON CONFLICT (project_id) DO UPDATE SET last_number = c.last_number + p_count
+  RETURNING c.last_number INTO last_allocated;
+
+  RETURN QUERY
+    -- At least three digits; never truncated (lpad cuts longer strings) past 999
+    SELECT 'REQ-C' || lpad(n::text, greatest(3, length(n::text)), '0')
+    FROM generate_series(last_allocated - p_count + 1, last_allocated) AS n;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."allocate_requirement_codes"("p_project_id" "uuid", "p_count" integer) OWNER TO "postgres";
+
+
+-- persist_conjectural_batch: allocate codes in the same transaction when the payload has none
+CREATE OR REPLACE FUNCTION "public"."persist_conjectural_batch"("payload" "jsonb")
+RETURNS TABLE("item_index" integer, "id" "uuid", "cod_requirement" "text")
+    LANGUAGE "plpgsql"
+    SET "search_path" TO 'public', 'extensions'
+    AS $$
+#variable_conflict use_column
+DECLARE
+  item jsonb;
+  item_ord bigint;
+  new_id uuid;
+  new_code text;
+BEGIN
+  FOR item, item_ord IN
+    SELECT r.value, r.ordinality
+    FROM jsonb_array_elements(COALESCE(payload->'requirements', '[]'::jsonb)) WITH ORDINALITY AS r(value, ordinality)
+  LOOP
+    new_code := item->>'cod_requirement';
+    IF new_code IS NULL THEN
+      SELECT code INTO new_code FROM allocate_requirement_codes((item->>'project_id')::uuid, 1) AS code;
+    END IF;
+
+    INSERT INTO conjectural_requirements (
+      project_id, cod_requirement, status, desired_behavior, business_need, uncertainty,
+      solution_assumption, uncertainty_evaluated, observation_analysis, user_id,
+      history_snapshot, business_need_embedding, business_need_embedding_model
+    )
+    VALUES (
+      (item->>'project_id')::uuid,
+      new_code,
+      COALESCE(item->>'status', 'todo')::conjectural_status,
+      item->>'desired_behavior',
+      item->>'business_need',
+      item->>'uncertainty',
+      item->>'solution_assumption',
+      item->>'uncertainty_evaluated',
+      item->>'observation_analysis',
+      (item->>'user_id')::uuid,
+      item->'history_snapshot',
+      CASE WHEN jsonb_typeof(item->'business_need_embedding') = 'array'
+           THEN (item->>'business_need_embedding')::vector END,
+      item->>'business_need_embedding_model'
+    )
+    RETURNING conjectural_requirements.id INTO new_id;
+
+    INSERT INTO evaluations (
+      requirement_id, type, attempt, ranking, unambiguous, completeness, atomicity,
+      verifiable, conforming, justifications, requirement_snapshot
+    )
+    SELECT new_id,
+           (e->>'type')::evaluation_type,
+           (e->>'attempt')::integer,
+           (e->>'ranking')::integer,
+           (e->>'unambiguous')::integer,
+           (e->>'completeness')::integer,
+           (e->>'atomicity')::integer,
+           (e->>'verifiable')::integer,
+           (e->>'conforming')::integer,
+           COALESCE(e->'justifications', '{}'::jsonb),
+           e->'requirement_snapshot'
+    FROM jsonb_array_elements(COALESCE(item->'evaluations', '[]'::jsonb)) AS e;
+
+    item_index := (item_ord - 1)::integer;
+    id := new_id;
+    cod_requirement := new_code;
+    RETURN NEXT;
+  END LOOP;
+END;
+$$;
+
+
+CREATE POLICY "Service role full access requirement code counters" ON "public"."requirement_code_counters" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+ALTER TABLE "public"."requirement_code_counters" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."requirement_code_counters" TO "service_role";
+-- SECURITY DEFINER: only the backend may allocate codes (the default privileges grant EXECUTE to everyone)
+REVOKE ALL ON FUNCTION "public"."allocate_requirement_codes"("p_project_id" "uuid", "p_count" integer) FROM PUBLIC, "anon", "authenticated";
+GRANT ALL ON FUNCTION "public"."allocate_requirement_codes"("p_project_id" "uuid", "p_count" integer) TO "service_role";
@@ -0,0 +1,229 @@
+-- ============================================================
+-- Migration: write-behind persistence outbox
+-- The validation node no longer blocks on embeddings + inserts:
+-- it pre-allocates ids and calls enqueue_conjectural_outbox,
+-- which reserves the REQ-C codes and writes one outbox row with
+-- the run's payload in the same transaction (a failed insert
+-- burns no codes), and returns. A worker claims pending
+-- rows (SKIP LOCKED lease), computes embeddings, calls
+-- persist_conjectural_batch and retries with backoff.
+-- persist_conjectural_batch now accepts a pre-allocated "id"
+-- per item and skips items already inserted, so a replayed
+-- entry (worker crashed after commit) is a no-op. Entries that
+-- are not saved yet, failed ones included, are listed per
+-- project by the API, which can also requeue a failed entry.
+-- conjectural_requirements is added to supabase_realtime so the
+-- board is notified when the rows become visible.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS "public"."conjectural_persist_outbox" (
+    "id" "uuid" DEFAULT "gen_random_uuid"() NOT NULL,
+    "project_id" "uuid" NOT NULL,
+    -- {"requirements": [...]} as accepted by persist_conjectural_batch (embeddings filled in by the worker)
+    "payload" "jsonb" NOT NULL,
+    "status" "text" DEFAULT 'pending'::"text" NOT NULL,
+    "attempts" integer DEFAULT 0 NOT NULL,
+    "last_error" "text",
+    "next_attempt_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    "locked_at" timestamp with time zone,
+    "created_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "conjectural_persist_outbox_status_check" CHECK (("status" = ANY (ARRAY['pending'::"text", 'processing'::"text", 'done'::"text", 'failed'::"text"])))
+);
+
+
+ALTER TABLE "public"."conjectural_persist_outbox" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."conjectural_persist_outbox"
+    ADD CONSTRAINT "conjectural_persist_outbox_pkey" PRIMARY KEY ("id");
+
+
+ALTER TABLE ONLY "public"."conjectural_persist_outbox"
+    ADD CONSTRAINT "conjectural_persist_outbox_project_id_fkey" FOREIGN KEY ("project_id") REFERENCES "public"."projects"("id") ON DELETE CASCADE;
+
+
+-- Claim path: due entries that are not finished
+CREATE INDEX IF NOT EXISTS "idx_conjectural_persist_outbox_due"
+    ON "public"."conjectural_persist_outbox" USING "btree" ("next_attempt_at")
+    WHERE ("status" = ANY (ARRAY['pending'::"text", 'processing'::"text"]));
+
+
+-- Unsaved entries of a project (pending, processing or failed), shown to its users
+CREATE INDEX IF NOT EXISTS "idx_conjectural_persist_outbox_project_unsaved"
+    ON "public"."conjectural_persist_outbox" USING "btree" ("project_id", "created_at" DESC)
+    WHERE ("status" <> 'done'::"text");
+
+
+CREATE OR REPLACE TRIGGER "trg_conjectural_persist_outbox_updated_at" BEFORE UPDATE ON "public"."conjectural_persist_outbox" FOR EACH ROW EXECUTE FUNCTION "public"."update_updated_at_column"();
+
+
+-- Claim up to p_limit due entries (optionally one specific entry). Entries left in
+-- 'processing' longer than p_lease_seconds belong to a dead worker and are reclaimed.
+CREATE OR REPLACE FUNCTION "public"."claim_conjectural_outbox"(
+    "p_limit" integer DEFAULT 10,
+    "p_lease_seconds" integer DEFAULT 120,
+    "p_entry_id" "uuid" DEFAULT NULL
+) RETURNS SETOF "public"."conjectural_persist_outbox"
+    LANGUAGE "sql"
+    AS $$
+  UPDATE conjectural_persist_outbox o
+  SET status = 'processing', attempts = o.attempts + 1, locked_at = now()
+  WHERE o.id IN (
+    SELECT c.id
+    FROM conjectural_persist_outbox c
+    WHERE (p_entry_id IS NULL OR c.id = p_entry_id)
+      AND (
+        (c.status = 'pending' AND c.next_attempt_at <= now())
+        OR (c.status = 'processing' AND c.locked_at < now() - make_interval(secs => p_lease_seconds))
+      )
+    ORDER BY c.next_attempt_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING o.*;
+$$;
+
+
+ALTER FUNCTION "public"."claim_conjectural_outbox"("p_limit" integer, "p_lease_seconds" integer, "p_entry_id" "uuid") OWNER TO "postgres";
+
+
+-- Reserve REQ-C codes for every item of p_requirements and queue them as one entry.
+-- Returns the entry id and the codes in item order.
+CREATE OR REPLACE FUNCTION "public"."enqueue_conjectural_outbox"("p_project_id" "uuid", "p_requirements" "jsonb")
+RETURNS TABLE("entry_id" "uuid", "codes" "text"[])
+    LANGUAGE "plpgsql"
+    SET "search_path" TO 'public'
+    AS $$
+DECLARE
+  allocated text[];
+BEGIN
+  SELECT array_agg(a.code ORDER BY a.code_ord) INTO allocated
+  FROM allocate_requirement_codes(p_project_id, jsonb_array_length(p_requirements)) WITH ORDINALITY AS a(code, code_ord);
+
+  INSERT INTO conjectural_persist_outbox (project_id, payload)
+  VALUES (
+    p_project_id,
+    jsonb_build_object('requirements', (
+      SELECT COALESCE(jsonb_agg(r.value || jsonb_build_object('cod_requirement', allocated[r.ordinality]) ORDER BY r.ordinality), '[]'::jsonb)
+      FROM jsonb_array_elements(p_requirements) WITH ORDINALITY AS r(value, ordinality)
+    ))
+  )
+  RETURNING conjectural_persist_outbox.id INTO entry_id;
+
+  codes := COALESCE(allocated, '{}'::text[]);
+  RETURN NEXT;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."enqueue_conjectural_outbox"("p_project_id" "uuid", "p_requirements" "jsonb") OWNER TO "postgres";
+
+
+-- persist_conjectural_batch: honour pre-allocated ids and skip items already persisted
+CREATE OR REPLACE FUNCTION "public"."persist_conjectural_batch"("payload" "jsonb")
+RETURNS TABLE("item_index" integer, "id" "uuid", "cod_requirement" "text")
+    LANGUAGE "plpgsql"
+    SET "search_path" TO 'public', 'extensions'
+    AS $$
+#variable_conflict use_column
+DECLARE
+  item jsonb;
+  item_ord bigint;
+  new_id uuid;
+  new_code text;
+  existing record;
+BEGIN
+  FOR item, item_ord IN
+    SELECT r.value, r.ordinality
+    FROM jsonb_array_elements(COALESCE(payload->'requirements', '[]'::jsonb)) WITH ORDINALITY AS r(value, ordinality)
+  LOOP
+    -- Replayed outbox entry: the requirement is already there, report it again
+    SELECT cr.id, cr.cod_requirement INTO existing
+    FROM conjectural_requirements cr
+    WHERE cr.id = (item->>'id')::uuid;
+    IF FOUND THEN
+      item_index := (item_ord - 1)::integer;
+      id := existing.id;
+      cod_requirement := existing.cod_requirement;
+      RETURN NEXT;
+      CONTINUE;
+    END IF;
+
+    new_code := item->>'cod_requirement';
+    IF new_code IS NULL THEN
+      SELECT code INTO new_code FROM allocate_requirement_codes((item->>'project_id')::uuid, 1) AS code;
+    END IF;
+
+    INSERT INTO conjectural_requirements (
+      id, project_id, cod_requirement, status, desired_behavior, business_need, uncertainty,
+      solution_assumption, uncertainty_evaluated, observation_analysis, user_id,
+      history_snapshot, business_need_embedding, business_need_embedding_model
+    )
+    VALUES (
+      COALESCE((item->>'id')::uuid, gen_random_uuid()),
+      (item->>'project_id')::uuid,
+      new_code,
+      COALESCE(item->>'status', 'todo')::conjectural_status,
+      item->>'desired_behavior',
+      item->>'business_need',
+      item->>'uncertainty',
+      item->>'solution_assumption',
+      item->>'uncertainty_evaluated',
+      item->>'observation_analysis',
+      (item->>'user_id')::uuid,
+      item->'history_snapshot',
+      CASE WHEN jsonb_typeof(item->'business_need_embedding') = 'array'
+           THEN (item->>'business_need_embedding')::vector END,
+      item->>'business_need_embedding_model'
+    )
+    RETURNING conjectural_requirements.id INTO new_id;
+
+    INSERT INTO evaluations (
+      requirement_id, type, attempt, ranking, unambiguous, completeness, atomicity,
+      verifiable, conforming, justifications, requirement_snapshot
+    )
+    SELECT new_id,
+           (e->>'type')::evaluation_type,
+           (e->>'attempt')::integer,
+           (e->>'ranking')::integer,
+           (e->>'unambiguous')::integer,
+           (e->>'completeness')::integer,
+           (e->>'atomicity')::integer,
+           (e->>'verifiable')::integer,
+           (e->>'conforming')::integer,
+           COALESCE(e->'justifications', '{}'::jsonb),
+           e->'requirement_snapshot'
+    FROM jsonb_array_elements(COALESCE(item->'evaluations', '[]'::jsonb)) AS e;
+
+    item_index := (item_ord - 1)::integer;
+    id := new_id;
+    cod_requirement := new_code;
+    RETURN NEXT;
+  END LOOP;
+END;
+$$;
+
+
+CREATE POLICY "Service role full access conjectural persist outbox" ON "public"."conjectural_persist_outbox" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+ALTER TABLE "public"."conjectural_persist_outbox" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."conjectural_persist_outbox" TO "service_role";
+GRANT ALL ON FUNCTION "public"."claim_conjectural_outbox"("p_limit" integer, "p_lease_seconds" integer, "p_entry_id" "uuid") TO "service_role";
+GRANT ALL ON FUNCTION "public"."enqueue_conjectural_outbox"("p_project_id" "uuid", "p_requirements" "jsonb") TO "service_role";
+
+
+-- Realtime: notify the board when write-behind rows become visible (RLS still applies)
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_publication_tables
+    WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'conjectural_requirements'
+  ) THEN
+    ALTER PUBLICATION "supabase_realtime" ADD TABLE "public"."conjectural_requirements";
+  END IF;
+END;
+$$;
@@ -0,0 +1,197 @@
+-- ============================================================
+-- Migration: business_need embedding backfill
+-- business_need_hash is a generated content hash of the text;
+-- business_need_embedding_hash records which text the stored
+-- vector was computed from. A row needs (re-)embedding when it
+-- has no vector or its text was edited since (hashes differ);
+-- both are served by one partial index. After switching the
+-- embedding model, reset_business_need_embeddings clears the
+-- vectors of other models so they fall under that index. The
+-- backfill worker pages through such rows and writes vectors
+-- back in bulk; a write is discarded if the text changed
+-- meanwhile. A lease row (worker_leases) keeps passes to one
+-- worker at a time across API processes.
+-- ============================================================
+
+-- 1. Content hashes
+ALTER TABLE "public"."conjectural_requirements"
+    ADD COLUMN IF NOT EXISTS "business_need_hash" "text" GENERATED ALWAYS AS ("md5"(COALESCE("business_need", ''::"text"))) STORED;
+
+ALTER TABLE "public"."conjectural_requirements"
+    ADD COLUMN IF NOT EXISTS "business_need_embedding_hash" "text";
+
+-- Existing vectors are assumed to match their current text
+UPDATE "public"."conjectural_requirements"
+    SET "business_need_embedding_hash" = "business_need_hash"
+    WHERE "business_need_embedding" IS NOT NULL
+      AND "business_need_embedding_hash" IS NULL;
+
+
+-- 2. Rows inserted with a vector (persist_conjectural_batch) embed their own text
+CREATE OR REPLACE FUNCTION "public"."set_business_need_embedding_hash"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    AS $$
+BEGIN
+  IF NEW.business_need_embedding IS NOT NULL AND NEW.business_need_embedding_hash IS NULL THEN
+    NEW.business_need_embedding_hash := md5(COALESCE(NEW.business_need, ''));
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."set_business_need_embedding_hash"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE TRIGGER "trg_conjectural_requirements_embedding_hash" BEFORE INSERT ON "public"."conjectural_requirements" FOR EACH ROW EXECUTE FUNCTION "public"."set_business_need_embedding_hash"();
+
+
+-- 3. Missing / edited vectors
+CREATE INDEX IF NOT EXISTS "idx_conjectural_requirements_stale_embedding"
+    ON "public"."conjectural_requirements" USING "btree" ("id")
+    WHERE (("business_need_embedding" IS NULL) OR ("business_need_embedding_hash" IS DISTINCT FROM "business_need_hash"));
+
+
+-- 4. Next page of rows needing an embedding (keyset on id). p_model is kept for
+-- callers; vectors of other models are cleared by reset_business_need_embeddings.
+CREATE OR REPLACE FUNCTION "public"."next_stale_business_need_embeddings"(
+    "p_model" "text",
+    "p_after" "uuid" DEFAULT NULL,
+    "p_limit" integer DEFAULT 256
+) RETURNS TABLE("id" "uuid", "project_id" "uuid", "business_need" "text", "business_need_hash" "text")
+    LANGUAGE "sql" STABLE
+    AS $$
+  SELECT cr.id, cr.project_id, cr.business_need, cr.business_need_hash
+  FROM conjectural_requirements cr
+  WHERE (p_after IS NULL OR cr.id > p_after)
+    AND COALESCE(cr.business_need, '') <> ''
+    AND (
+      cr.business_need_embedding IS NULL
+      OR cr.business_need_embedding_hash IS DISTINCT FROM cr.business_need_hash
+    )
+  ORDER BY cr.id
+  LIMIT p_limit;
+$$;
+
+
+ALTER FUNCTION "public"."next_stale_business_need_embeddings"("p_model" "text", "p_after" "uuid", "p_limit" integer) OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."count_stale_business_need_embeddings"("p_model" "text") RETURNS bigint
+    LANGUAGE "sql" STABLE
+    AS $$
+  SELECT count(*)
+  FROM conjectural_requirements cr
+  WHERE COALESCE(cr.business_need, '') <> ''
+    AND (
+      cr.business_need_embedding IS NULL
+      OR cr.business_need_embedding_hash IS DISTINCT FROM cr.business_need_hash
+    );
+$$;
+
+
+ALTER FUNCTION "public"."count_stale_business_need_embeddings"("p_model" "text") OWNER TO "postgres";
+
+
+-- 5. Bulk write-back: payload [{"id", "hash", "embedding": [...], "model"}]
+-- Only rows whose text still has the embedded hash are updated.
+CREATE OR REPLACE FUNCTION "public"."write_business_need_embeddings"("payload" "jsonb") RETURNS integer
+    LANGUAGE "sql"
+    SET "search_path" TO 'public', 'extensions'
+    AS $$
+  WITH updated AS (
+    UPDATE conjectural_requirements cr
+    SET business_need_embedding = (x.embedding::text)::vector,
+        business_need_embedding_hash = x.hash,
+        business_need_embedding_model = x.model
+    FROM jsonb_to_recordset(payload) AS x(id uuid, hash text, embedding jsonb, model text)
+    WHERE cr.id = x.id
+      AND cr.business_need_hash = x.hash
+    RETURNING 1
+  )
+  SELECT count(*)::integer FROM updated;
+$$;
+
+
+ALTER FUNCTION "public"."write_business_need_embeddings"("payload" "jsonb") OWNER TO "postgres";
+
+
+-- 6. Re-embed after a model switch: clear the vectors of every other model
+-- (similarity search ignores them already). Returns the rows cleared.
+CREATE OR REPLACE FUNCTION "public"."reset_business_need_embeddings"("p_model" "text") RETURNS integer
+    LANGUAGE "sql"
+    AS $$
+  WITH cleared AS (
+    UPDATE conjectural_requirements cr
+    SET business_need_embedding = NULL,
+        business_need_embedding_hash = NULL
+    WHERE cr.business_need_embedding IS NOT NULL
+      AND cr.business_need_embedding_model IS DISTINCT FROM p_model
+    RETURNING 1
+  )
+  SELECT count(*)::integer FROM cleared;
+$$;
+
+
+ALTER FUNCTION "public"."reset_business_need_embeddings"("p_model" "text") OWNER TO "postgres";
+
+
+-- 7. Single-runner leases for background workers running in every API process.
+-- A holder keeps its lease by renewing it before it expires; an expired lease
+-- (crashed holder) can be taken by anyone.
+CREATE TABLE IF NOT EXISTS "public"."worker_leases" (
+    "name" "text" NOT NULL,
+    "holder" "text" NOT NULL,
+    "expires_at" timestamp with time zone NOT NULL
+);
+
+
+ALTER TABLE "public"."worker_leases" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."worker_leases"
+    ADD CONSTRAINT "worker_leases_pkey" PRIMARY KEY ("name");
+
+
+-- Take or renew lease p_name for p_seconds; true if p_holder holds it afterwards
+CREATE OR REPLACE FUNCTION "public"."acquire_worker_lease"("p_name" "text", "p_holder" "text", "p_seconds" integer) RETURNS boolean
+    LANGUAGE "sql"
+    AS $$
+  WITH taken AS (
+    INSERT INTO worker_leases AS l (name, holder, expires_at)
+    VALUES (p_name, p_holder, now() + make_interval(secs => p_seconds))
+    ON CONFLICT (name) DO UPDATE
+      SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+      WHERE l.holder = EXCLUDED.holder OR l.expires_at < now()
+    RETURNING 1
+  )
+  SELECT EXISTS (SELECT 1 FROM taken);
+$$;
+
+
+ALTER FUNCTION "public"."acquire_worker_lease"("p_name" "text", "p_holder" "text", "p_seconds" integer) OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."release_worker_lease"("p_name" "text", "p_holder" "text") RETURNS "void"
+    LANGUAGE "sql"
+    AS $$
+  DELETE FROM worker_leases WHERE name = p_name AND holder = p_holder;
+$$;
+
+
+ALTER FUNCTION "public"."release_worker_lease"("p_name" "text", "p_holder" "text") OWNER TO "postgres";
+
+
+CREATE POLICY "Service role full access worker leases" ON "public"."worker_leases" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+ALTER TABLE "public"."worker_leases" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."worker_leases" TO "service_role";
+GRANT ALL ON FUNCTION "public"."next_stale_business_need_embeddings"("p_model" "text", "p_after" "uuid", "p_limit" integer) TO "service_role";
+GRANT ALL ON FUNCTION "public"."count_stale_business_need_embeddings"("p_model" "text") TO "service_role";
+GRANT ALL ON FUNCTION "public"."write_business_need_embeddings"("payload" "jsonb") TO "service_role";
+GRANT ALL ON FUNCTION "public"."reset_business_need_embeddings"("p_model" "text") TO "service_role";
+GRANT ALL ON FUNCTION "public"."acquire_worker_lease"("p_name" "text", "p_holder" "text", "p_seconds" integer) TO "service_role";
+GRANT ALL ON FUNCTION "public"."release_worker_lease"("p_name" "text", "p_holder" "text") TO "service_role";
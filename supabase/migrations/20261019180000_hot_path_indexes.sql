@@ -0,0 +1,39 @@
+-- ============================================================
+-- Migration: indexes for hot access paths
+-- conjectural_requirements
+--   (project_id, created_at, id): list_by_project (newest
+--     first), match_business_need_embeddings / newest-embeddings
+--     reads (backward scan) and the full-project embedding scan
+--     ordered by created_at, id.
+--   (cod_requirement): /by-cod/{cod} filters by code only, so
+--     the UNIQUE (project_id, cod_requirement) index cannot serve
+--     it (project_id is its leading column).
+--   (user_id): /user/has-any.
+-- projects (user_id): every RLS policy resolves a project_id
+--   through "projects.user_id = auth.uid()".
+-- requirements (project_id, requirement_id): project context
+--   reads are filtered by project and ordered by requirement_id;
+--   it supersedes the single-column project_id index.
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS "idx_conjectural_requirements_project_created"
+    ON "public"."conjectural_requirements" USING "btree" ("project_id", "created_at", "id");
+
+
+CREATE INDEX IF NOT EXISTS "idx_conjectural_requirements_cod"
+    ON "public"."conjectural_requirements" USING "btree" ("cod_requirement");
+
+
+CREATE INDEX IF NOT EXISTS "idx_conjectural_requirements_user"
+    ON "public"."conjectural_requirements" USING "btree" ("user_id");
+
+
+CREATE INDEX IF NOT EXISTS "idx_projects_user_id"
+    ON "public"."projects" USING "btree" ("user_id");
+
+
+CREATE INDEX IF NOT EXISTS "idx_requirements_project_requirement"
+    ON "public"."requirements" USING "btree" ("project_id", "requirement_id");
+
+
+DROP INDEX IF EXISTS "public"."idx_requirements_project_id";
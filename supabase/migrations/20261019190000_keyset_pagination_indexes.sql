@@ -0,0 +1,35 @@
+-- ============================================================
+-- Migration: keyset pagination indexes
+-- List endpoints page on (created_at, id) / (requirement_id, id)
+-- with "k1 <= v1 AND ((k1 < v1) OR (k1 = v1 AND k2 < v2))": the
+-- OR alone is not an index condition, the redundant k1 <= v1 is,
+-- so each page is a range scan of these indexes starting at the
+-- cursor (forward or backward), the OR a residual filter.
+-- Sort keys must be NOT NULL: projects.created_at was nullable
+-- (a NULL row sorted first and broke the cursor); existing NULLs
+-- take their updated_at.
+-- conjectural_requirements (project_id, created_at, id) already
+-- exists (hot path indexes).
+-- requirements (project_id, requirement_id, id) supersedes the
+-- (project_id, requirement_id) index.
+-- ============================================================
+
+UPDATE "public"."projects"
+    SET "created_at" = COALESCE("updated_at", "now"())
+    WHERE "created_at" IS NULL;
+
+ALTER TABLE "public"."projects" ALTER COLUMN "created_at" SET NOT NULL;
+
+
+CREATE INDEX IF NOT EXISTS "idx_projects_created_id"
+    ON "public"."projects" USING "btree" ("created_at", "id");
+
+
+CREATE INDEX IF NOT EXISTS "idx_profiles_created_id"
+    ON "public"."profiles" USING "btree" ("created_at", "id");
+
+
+CREATE INDEX IF NOT EXISTS "idx_requirements_project_requirement_id_id"
+    ON "public"."requirements" USING "btree" ("project_id", "requirement_id", "id");
+
+DROP INDEX IF EXISTS "public"."idx_requirements_project_requirement";
@@ -0,0 +1,137 @@
+-- ============================================================
+-- Migration: dashboard analytics aggregates
+-- dashboard_aggregates(project) computes every dashboard chart
+-- aggregate in one statement instead of shipping all evaluation
+-- rows to the API. Values are unrounded; the API rounds them
+-- like the Python implementation does.
+--
+-- radar:      per type, mean of each criterion and overall_score
+-- boxplot:    per (attempt, type), min / q1 / median / q3 / max of
+--             overall_score. q1/q3 are the medians of the lower /
+--             upper half, the middle value excluded for odd n
+--             (same as the Python implementation, not
+--             percentile_cont(0.25/0.75)).
+-- confusion:  per attempt, LLM vs human positives (score >= 4) of
+--             every criterion of every (requirement, attempt) pair.
+--             NULL attempts escape the unique constraint: of
+--             duplicate evaluations the greatest id is paired.
+-- pass_rate:  per type, requirements whose first passing attempt
+--             (criteria mean >= 4, i.e. criteria sum >= 20) is
+--             1, 2 or later, or that never pass
+-- points:     per (requirement, attempt) pair, criteria sums of
+--             the LLM and human evaluations (scatter plot),
+--             ordered by (requirement, attempt), NULL attempt last
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION "public"."dashboard_aggregates"("p_project_id" "uuid") RETURNS "jsonb"
+    LANGUAGE "sql" STABLE
+    AS $$
+  WITH ev AS (
+    SELECT e.id, e.requirement_id, e.type::text AS type, e.attempt,
+           e.unambiguous, e.completeness, e.atomicity, e.verifiable, e.conforming,
+           e.overall_score,
+           e.unambiguous + e.completeness + e.atomicity + e.verifiable + e.conforming AS criteria_sum
+    FROM evaluations e
+    JOIN conjectural_requirements cr ON cr.id = e.requirement_id
+    WHERE cr.project_id = p_project_id
+  ),
+  radar AS (
+    SELECT type,
+           avg(unambiguous)::float8 AS unambiguous,
+           avg(completeness)::float8 AS completeness,
+           avg(atomicity)::float8 AS atomicity,
+           avg(verifiable)::float8 AS verifiable,
+           avg(conforming)::float8 AS conforming,
+           -- numeric average: exact, like the frame engine's integer sums
+           avg(overall_score)::float8 AS overall_score
+    FROM ev
+    GROUP BY type
+  ),
+  ranked AS (
+    SELECT attempt, type, overall_score::float8 AS overall_score,
+           row_number() OVER (PARTITION BY attempt, type ORDER BY overall_score) AS rn,
+           count(*) OVER (PARTITION BY attempt, type) AS n
+    FROM ev
+    WHERE attempt IS NOT NULL
+  ),
+  boxplot AS (
+    SELECT attempt, type,
+           min(overall_score) AS min,
+           -- a single score is its own q1 / q3
+           COALESCE(percentile_cont(0.5) WITHIN GROUP (ORDER BY overall_score) FILTER (WHERE rn <= n / 2), min(overall_score)) AS q1,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY overall_score) AS median,
+           COALESCE(percentile_cont(0.5) WITHIN GROUP (ORDER BY overall_score) FILTER (WHERE rn > (n + 1) / 2), max(overall_score)) AS q3,
+           max(overall_score) AS max
+    FROM ranked
+    GROUP BY attempt, type
+  ),
+  latest AS (
+    SELECT DISTINCT ON (requirement_id, attempt, type) *
+    FROM ev
+    ORDER BY requirement_id, attempt, type, id DESC
+  ),
+  pairs AS (
+    SELECT l.requirement_id, l.attempt,
+           l.unambiguous AS l_unambiguous, l.completeness AS l_completeness, l.atomicity AS l_atomicity,
+           l.verifiable AS l_verifiable, l.conforming AS l_conforming, l.criteria_sum AS llm_sum,
+           h.unambiguous AS h_unambiguous, h.completeness AS h_completeness, h.atomicity AS h_atomicity,
+           h.verifiable AS h_verifiable, h.conforming AS h_conforming, h.criteria_sum AS human_sum
+    FROM latest l
+    JOIN latest h ON h.requirement_id = l.requirement_id
+             AND h.attempt IS NOT DISTINCT FROM l.attempt
+             AND h.type = 'human'
+    WHERE l.type = 'llm'
+  ),
+  confusion AS (
+    SELECT p.attempt,
+           count(*) FILTER (WHERE c.llm_pos AND c.human_pos) AS tp,
+           count(*) FILTER (WHERE c.llm_pos AND NOT c.human_pos) AS fp,
+           count(*) FILTER (WHERE NOT c.llm_pos AND c.human_pos) AS fn,
+           count(*) FILTER (WHERE NOT c.llm_pos AND NOT c.human_pos) AS tn
+    FROM pairs p
+    CROSS JOIN LATERAL (VALUES
+      (p.l_unambiguous >= 4, p.h_unambiguous >= 4),
+      (p.l_completeness >= 4, p.h_completeness >= 4),
+      (p.l_atomicity >= 4, p.h_atomicity >= 4),
+      (p.l_verifiable >= 4, p.h_verifiable >= 4),
+      (p.l_conforming >= 4, p.h_conforming >= 4)
+    ) AS c(llm_pos, human_pos)
+    GROUP BY p.attempt
+  ),
+  pass_groups AS (
+    SELECT type,
+           bool_or(criteria_sum >= 20) AS passed,
+           min(attempt) FILTER (WHERE criteria_sum >= 20) AS first_pass
+    FROM ev
+    GROUP BY requirement_id, type
+  ),
+  pass_rate AS (
+    SELECT type,
+           count(*) AS total,
+           count(*) FILTER (WHERE passed AND first_pass = 1) AS pass_at_1,
+           count(*) FILTER (WHERE passed AND first_pass = 2) AS pass_at_2,
+           count(*) FILTER (WHERE passed AND first_pass IS DISTINCT FROM 1 AND first_pass IS DISTINCT FROM 2) AS pass_at_3,
+           count(*) FILTER (WHERE NOT passed) AS fail
+    FROM pass_groups
+    GROUP BY type
+  )
+  SELECT jsonb_build_object(
+    'radar', COALESCE((SELECT jsonb_agg(to_jsonb(r)) FROM radar r), '[]'::jsonb),
+    'boxplot', COALESCE((SELECT jsonb_agg(to_jsonb(b) ORDER BY b.attempt, b.type COLLATE "C") FROM boxplot b), '[]'::jsonb),
+    'confusion', COALESCE((SELECT jsonb_agg(to_jsonb(c) ORDER BY c.attempt) FROM confusion c), '[]'::jsonb),
+    'pass_rate', COALESCE((SELECT jsonb_agg(to_jsonb(pr)) FROM pass_rate pr), '[]'::jsonb),
+    'points', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+               'requirement_id', p.requirement_id, 'attempt', p.attempt,
+               'llm_sum', p.llm_sum, 'human_sum', p.human_sum
+             ) ORDER BY p.requirement_id, p.attempt)
+      FROM pairs p
+    ), '[]'::jsonb)
+  );
+$$;
+
+
+ALTER FUNCTION "public"."dashboard_aggregates"("p_project_id" "uuid") OWNER TO "postgres";
+
+
+GRANT ALL ON FUNCTION "public"."dashboard_aggregates"("p_project_id" "uuid") TO "service_role";
@@ -0,0 +1,407 @@
+-- ============================================================
+-- Migration: evaluation quality rollups
+-- Org / user / provider level analytics are served from rollup
+-- tables maintained on evaluation insert instead of scanning
+-- every evaluation. A rollup row is keyed by UTC day, the
+-- requirement's author and the providers that produced it, so
+-- the analytics cost depends on the window and the number of
+-- users / providers, not on the number of evaluations.
+--
+-- evaluation_score_rollups:     evaluations and criterion sums
+--                               per (type, attempt, criteria sum)
+--                               (score histogram and means)
+-- evaluation_agreement_rollups: LLM vs human pairs of the same
+--                               (requirement, attempt): per
+--                               criterion confusion counts and
+--                               the moments of the criteria sums
+--                               (mean abs. difference, Pearson r)
+-- requirement_pass_rollups:     per (requirement, type), bucket of
+--                               the first passing attempt (criteria
+--                               sum >= 20), by requirement day
+--
+-- The providers are recorded on the requirement when it is
+-- inserted (user settings at that time). Rollups are a history
+-- of what was evaluated: deleting requirements does not remove
+-- their counts; rebuild_evaluation_rollups() recomputes them.
+-- ============================================================
+
+-- 1. Providers that generated / judged a requirement
+ALTER TABLE "public"."conjectural_requirements"
+    ADD COLUMN IF NOT EXISTS "model" "text";
+
+ALTER TABLE "public"."conjectural_requirements"
+    ADD COLUMN IF NOT EXISTS "model_judge" "text";
+
+
+CREATE OR REPLACE FUNCTION "public"."set_conjectural_requirement_models"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  IF NEW.user_id IS NOT NULL AND (NEW.model IS NULL OR NEW.model_judge IS NULL) THEN
+    SELECT COALESCE(NEW.model, s.model), COALESCE(NEW.model_judge, s.model_judge)
+    INTO NEW.model, NEW.model_judge
+    FROM settings s
+    WHERE s.user_id = NEW.user_id
+    LIMIT 1;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."set_conjectural_requirement_models"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE TRIGGER "trg_conjectural_requirements_models" BEFORE INSERT ON "public"."conjectural_requirements" FOR EACH ROW EXECUTE FUNCTION "public"."set_conjectural_requirement_models"();
+
+
+-- Existing requirements: best effort from the author's current settings
+UPDATE "public"."conjectural_requirements" cr
+    SET "model" = s.model, "model_judge" = s.model_judge
+    FROM "public"."settings" s
+    WHERE s.user_id = cr.user_id
+      AND cr.model IS NULL
+      AND cr.model_judge IS NULL;
+
+
+-- 2. Rollup tables (NULL user / provider / attempt are keys of their own)
+CREATE TABLE IF NOT EXISTS "public"."evaluation_score_rollups" (
+    "day" "date" NOT NULL,
+    "user_id" "uuid",
+    "model" "text",
+    "model_judge" "text",
+    "type" "public"."evaluation_type" NOT NULL,
+    "attempt" integer,
+    "criteria_sum" integer NOT NULL,
+    "evaluations" bigint DEFAULT 0 NOT NULL,
+    "unambiguous" bigint DEFAULT 0 NOT NULL,
+    "completeness" bigint DEFAULT 0 NOT NULL,
+    "atomicity" bigint DEFAULT 0 NOT NULL,
+    "verifiable" bigint DEFAULT 0 NOT NULL,
+    "conforming" bigint DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "evaluation_score_rollups_key" UNIQUE NULLS NOT DISTINCT ("day", "user_id", "model", "model_judge", "type", "attempt", "criteria_sum")
+);
+
+
+ALTER TABLE "public"."evaluation_score_rollups" OWNER TO "postgres";
+
+
+CREATE TABLE IF NOT EXISTS "public"."evaluation_agreement_rollups" (
+    "day" "date" NOT NULL,
+    "user_id" "uuid",
+    "model" "text",
+    "model_judge" "text",
+    "attempt" integer,
+    "pairs" bigint DEFAULT 0 NOT NULL,
+    "tp" bigint DEFAULT 0 NOT NULL,
+    "fp" bigint DEFAULT 0 NOT NULL,
+    "fn" bigint DEFAULT 0 NOT NULL,
+    "tn" bigint DEFAULT 0 NOT NULL,
+    "exact" bigint DEFAULT 0 NOT NULL,
+    "abs_diff" bigint DEFAULT 0 NOT NULL,
+    "llm_sum" bigint DEFAULT 0 NOT NULL,
+    "human_sum" bigint DEFAULT 0 NOT NULL,
+    "llm_sq" bigint DEFAULT 0 NOT NULL,
+    "human_sq" bigint DEFAULT 0 NOT NULL,
+    "llm_human" bigint DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "evaluation_agreement_rollups_key" UNIQUE NULLS NOT DISTINCT ("day", "user_id", "model", "model_judge", "attempt")
+);
+
+
+ALTER TABLE "public"."evaluation_agreement_rollups" OWNER TO "postgres";
+
+
+CREATE TABLE IF NOT EXISTS "public"."requirement_pass_rollups" (
+    "day" "date" NOT NULL,
+    "user_id" "uuid",
+    "model" "text",
+    "model_judge" "text",
+    "type" "public"."evaluation_type" NOT NULL,
+    "requirements" bigint DEFAULT 0 NOT NULL,
+    "pass_at_1" bigint DEFAULT 0 NOT NULL,
+    "pass_at_2" bigint DEFAULT 0 NOT NULL,
+    "pass_at_3" bigint DEFAULT 0 NOT NULL,
+    "fail" bigint DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "requirement_pass_rollups_key" UNIQUE NULLS NOT DISTINCT ("day", "user_id", "model", "model_judge", "type")
+);
+
+
+ALTER TABLE "public"."requirement_pass_rollups" OWNER TO "postgres";
+
+
+-- Org-wide reads scan a day range, per-user reads a (user, day) range
+CREATE INDEX IF NOT EXISTS "idx_evaluation_score_rollups_user_day" ON "public"."evaluation_score_rollups" USING "btree" ("user_id", "day");
+CREATE INDEX IF NOT EXISTS "idx_evaluation_agreement_rollups_user_day" ON "public"."evaluation_agreement_rollups" USING "btree" ("user_id", "day");
+CREATE INDEX IF NOT EXISTS "idx_requirement_pass_rollups_user_day" ON "public"."requirement_pass_rollups" USING "btree" ("user_id", "day");
+
+
+-- 3. Add the contribution of new evaluations (atomic increments, like
+-- record_business_need_generation). Pass buckets depend on every
+-- evaluation of a (requirement, type): the group's previous bucket is
+-- retracted and its new one added.
+CREATE OR REPLACE FUNCTION "public"."apply_evaluation_rollups"("p_evaluation_ids" "uuid"[]) RETURNS "void"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  INSERT INTO evaluation_score_rollups AS r (
+    day, user_id, model, model_judge, type, attempt, criteria_sum,
+    evaluations, unambiguous, completeness, atomicity, verifiable, conforming
+  )
+  SELECT (e.created_at AT TIME ZONE 'UTC')::date, cr.user_id, cr.model, cr.model_judge, e.type, e.attempt,
+         e.unambiguous + e.completeness + e.atomicity + e.verifiable + e.conforming,
+         count(*), sum(e.unambiguous), sum(e.completeness), sum(e.atomicity), sum(e.verifiable), sum(e.conforming)
+  FROM evaluations e
+  JOIN conjectural_requirements cr ON cr.id = e.requirement_id
+  WHERE e.id = ANY(p_evaluation_ids)
+  GROUP BY 1, 2, 3, 4, 5, 6, 7
+  ON CONFLICT (day, user_id, model, model_judge, type, attempt, criteria_sum) DO UPDATE
+    SET evaluations = r.evaluations + EXCLUDED.evaluations,
+        unambiguous = r.unambiguous + EXCLUDED.unambiguous,
+        completeness = r.completeness + EXCLUDED.completeness,
+        atomicity = r.atomicity + EXCLUDED.atomicity,
+        verifiable = r.verifiable + EXCLUDED.verifiable,
+        conforming = r.conforming + EXCLUDED.conforming,
+        updated_at = now();
+
+  -- Pairs with at least one new member (the other one may be older)
+  WITH ev AS (
+    SELECT e.id, e.requirement_id, e.type, e.attempt, e.created_at,
+           e.unambiguous, e.completeness, e.atomicity, e.verifiable, e.conforming,
+           e.unambiguous + e.completeness + e.atomicity + e.verifiable + e.conforming AS criteria_sum
+    FROM evaluations e
+    WHERE e.requirement_id IN (SELECT requirement_id FROM evaluations WHERE id = ANY(p_evaluation_ids))
+  ),
+  pairs AS (
+    SELECT l.requirement_id, l.attempt,
+           (greatest(l.created_at, h.created_at) AT TIME ZONE 'UTC')::date AS day,
+           l.criteria_sum AS llm_sum, h.criteria_sum AS human_sum, c.tp, c.fp, c.fn, c.tn
+    FROM ev l
+    JOIN ev h ON h.requirement_id = l.requirement_id
+             AND h.attempt IS NOT DISTINCT FROM l.attempt
+             AND h.type = 'human'
+    CROSS JOIN LATERAL (
+      SELECT count(*) FILTER (WHERE llm_pos AND human_pos) AS tp,
+             count(*) FILTER (WHERE llm_pos AND NOT human_pos) AS fp,
+             count(*) FILTER (WHERE NOT llm_pos AND human_pos) AS fn,
+             count(*) FILTER (WHERE NOT llm_pos AND NOT human_pos) AS tn
+      FROM (VALUES
+        (l.unambiguous >= 4, h.unambiguous >= 4),
+        (l.completeness >= 4, h.completeness >= 4),
+        (l.atomicity >= 4, h.atomicity >= 4),
+        (l.verifiable >= 4, h.verifiable >= 4),
+        (l.conforming >= 4, h.conforming >= 4)
+      ) AS v(llm_pos, human_pos)
+    ) c
+    WHERE l.type = 'llm'
+      AND (l.id = ANY(p_evaluation_ids) OR h.id = ANY(p_evaluation_ids))
+  )
+  INSERT INTO evaluation_agreement_rollups AS r (
+    day, user_id, model, model_judge, attempt,
+    pairs, tp, fp, fn, tn, exact, abs_diff, llm_sum, human_sum, llm_sq, human_sq, llm_human
+  )
+  SELECT p.day, cr.user_id, cr.model, cr.model_judge, p.attempt,
+         count(*), sum(p.tp), sum(p.fp), sum(p.fn), sum(p.tn),
+         count(*) FILTER (WHERE p.llm_sum = p.human_sum),
+         sum(abs(p.llm_sum - p.human_sum)),
+         sum(p.llm_sum), sum(p.human_sum),
+         sum(p.llm_sum * p.llm_sum), sum(p.human_sum * p.human_sum), sum(p.llm_sum * p.human_sum)
+  FROM pairs p
+  JOIN conjectural_requirements cr ON cr.id = p.requirement_id
+  GROUP BY 1, 2, 3, 4, 5
+  ON CONFLICT (day, user_id, model, model_judge, attempt) DO UPDATE
+    SET pairs = r.pairs + EXCLUDED.pairs,
+        tp = r.tp + EXCLUDED.tp,
+        fp = r.fp + EXCLUDED.fp,
+        fn = r.fn + EXCLUDED.fn,
+        tn = r.tn + EXCLUDED.tn,
+        exact = r.exact + EXCLUDED.exact,
+        abs_diff = r.abs_diff + EXCLUDED.abs_diff,
+        llm_sum = r.llm_sum + EXCLUDED.llm_sum,
+        human_sum = r.human_sum + EXCLUDED.human_sum,
+        llm_sq = r.llm_sq + EXCLUDED.llm_sq,
+        human_sq = r.human_sq + EXCLUDED.human_sq,
+        llm_human = r.llm_human + EXCLUDED.llm_human,
+        updated_at = now();
+
+  -- Previous (-1, without the new evaluations) and current (+1) state of each touched group
+  WITH touched AS (
+    SELECT DISTINCT requirement_id, type
+    FROM evaluations
+    WHERE id = ANY(p_evaluation_ids)
+  ),
+  states AS (
+    SELECT t.requirement_id, t.type, s.sign, s.passed, s.first_pass
+    FROM touched t
+    CROSS JOIN LATERAL (
+      SELECT -1 AS sign, count(*) AS evaluations,
+             bool_or(x.criteria_sum >= 20) AS passed,
+             min(x.attempt) FILTER (WHERE x.criteria_sum >= 20) AS first_pass
+      FROM (
+        SELECT e.attempt, e.unambiguous + e.completeness + e.atomicity + e.verifiable + e.conforming AS criteria_sum
+        FROM evaluations e
+        WHERE e.requirement_id = t.requirement_id AND e.type = t.type AND e.id <> ALL(p_evaluation_ids)
+      ) x
+      UNION ALL
+      SELECT 1, count(*),
+             bool_or(x.criteria_sum >= 20),
+             min(x.attempt) FILTER (WHERE x.criteria_sum >= 20)
+      FROM (
+        SELECT e.attempt, e.unambiguous + e.completeness + e.atomicity + e.verifiable + e.conforming AS criteria_sum
+        FROM evaluations e
+        WHERE e.requirement_id = t.requirement_id AND e.type = t.type
+      ) x
+    ) s
+    WHERE s.evaluations > 0
+  )
+  INSERT INTO requirement_pass_rollups AS r (
+    day, user_id, model, model_judge, type, requirements, pass_at_1, pass_at_2, pass_at_3, fail
+  )
+  SELECT (cr.created_at AT TIME ZONE 'UTC')::date, cr.user_id, cr.model, cr.model_judge, s.type,
+         sum(s.sign),
+         sum(CASE WHEN s.passed AND s.first_pass = 1 THEN s.sign ELSE 0 END),
+         sum(CASE WHEN s.passed AND s.first_pass = 2 THEN s.sign ELSE 0 END),
+         sum(CASE WHEN s.passed AND s.first_pass IS DISTINCT FROM 1 AND s.first_pass IS DISTINCT FROM 2 THEN s.sign ELSE 0 END),
+         sum(CASE WHEN NOT s.passed THEN s.sign ELSE 0 END)
+  FROM states s
+  JOIN conjectural_requirements cr ON cr.id = s.requirement_id
+  GROUP BY 1, 2, 3, 4, 5
+  ON CONFLICT (day, user_id, model, model_judge, type) DO UPDATE
+    SET requirements = r.requirements + EXCLUDED.requirements,
+        pass_at_1 = r.pass_at_1 + EXCLUDED.pass_at_1,
+        pass_at_2 = r.pass_at_2 + EXCLUDED.pass_at_2,
+        pass_at_3 = r.pass_at_3 + EXCLUDED.pass_at_3,
+        fail = r.fail + EXCLUDED.fail,
+        updated_at = now();
+END;
+$$;
+
+
+ALTER FUNCTION "public"."apply_evaluation_rollups"("p_evaluation_ids" "uuid"[]) OWNER TO "postgres";
+
+
+-- 4. One rollup update per insert statement (persist_conjectural_batch
+-- inserts all evaluations of a requirement at once). The triggers run as
+-- the owner: the inserting role has no access to the rollup tables.
+CREATE OR REPLACE FUNCTION "public"."evaluations_apply_rollups"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  PERFORM apply_evaluation_rollups(ARRAY(SELECT id FROM new_evaluations));
+  RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."evaluations_apply_rollups"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE TRIGGER "trg_evaluations_rollups" AFTER INSERT ON "public"."evaluations" REFERENCING NEW TABLE AS "new_evaluations" FOR EACH STATEMENT EXECUTE FUNCTION "public"."evaluations_apply_rollups"();
+
+
+-- 5. Recompute every rollup from the evaluations (backfill / after deletions)
+CREATE OR REPLACE FUNCTION "public"."rebuild_evaluation_rollups"() RETURNS "void"
+    LANGUAGE "plpgsql"
+    AS $$
+BEGIN
+  -- No evaluation inserted (and counted twice) while rebuilding
+  LOCK TABLE evaluations IN SHARE MODE;
+  DELETE FROM evaluation_score_rollups;
+  DELETE FROM evaluation_agreement_rollups;
+  DELETE FROM requirement_pass_rollups;
+  PERFORM apply_evaluation_rollups(ARRAY(SELECT id FROM evaluations));
+END;
+$$;
+
+
+ALTER FUNCTION "public"."rebuild_evaluation_rollups"() OWNER TO "postgres";
+
+
+SELECT "public"."rebuild_evaluation_rollups"();
+
+
+-- 6. Analytics over a window, org-wide or for one user.
+-- agreement: per (model_judge, attempt); pass_rate: per (bucket, type)
+-- with bucket a date_trunc unit; scores: per (model, model_judge, type)
+-- with the criterion sums and the criteria-sum histogram.
+CREATE OR REPLACE FUNCTION "public"."evaluation_analytics"(
+    "p_since" "date",
+    "p_user_id" "uuid" DEFAULT NULL,
+    "p_bucket" "text" DEFAULT 'week'
+) RETURNS "jsonb"
+    LANGUAGE "sql" STABLE
+    AS $$
+  WITH agreement AS (
+    SELECT model_judge, attempt,
+           sum(pairs) AS pairs, sum(tp) AS tp, sum(fp) AS fp, sum(fn) AS fn, sum(tn) AS tn,
+           sum(exact) AS exact, sum(abs_diff) AS abs_diff,
+           sum(llm_sum) AS llm_sum, sum(human_sum) AS human_sum,
+           sum(llm_sq) AS llm_sq, sum(human_sq) AS human_sq, sum(llm_human) AS llm_human
+    FROM evaluation_agreement_rollups
+    WHERE day >= p_since AND (p_user_id IS NULL OR user_id = p_user_id)
+    GROUP BY model_judge, attempt
+  ),
+  pass_rate AS (
+    SELECT date_trunc(p_bucket, day::timestamp)::date AS bucket, type::text AS type,
+           sum(requirements) AS total, sum(pass_at_1) AS pass_at_1, sum(pass_at_2) AS pass_at_2,
+           sum(pass_at_3) AS pass_at_3, sum(fail) AS fail
+    FROM requirement_pass_rollups
+    WHERE day >= p_since AND (p_user_id IS NULL OR user_id = p_user_id)
+    GROUP BY 1, 2
+  ),
+  histogram AS (
+    SELECT model, model_judge, type::text AS type, criteria_sum,
+           sum(evaluations) AS evaluations,
+           sum(unambiguous) AS unambiguous, sum(completeness) AS completeness, sum(atomicity) AS atomicity,
+           sum(verifiable) AS verifiable, sum(conforming) AS conforming
+    FROM evaluation_score_rollups
+    WHERE day >= p_since AND (p_user_id IS NULL OR user_id = p_user_id)
+    GROUP BY 1, 2, 3, 4
+  ),
+  scores AS (
+    SELECT model, model_judge, type,
+           sum(evaluations) AS evaluations,
+           sum(unambiguous) AS unambiguous, sum(completeness) AS completeness, sum(atomicity) AS atomicity,
+           sum(verifiable) AS verifiable, sum(conforming) AS conforming,
+           jsonb_object_agg(criteria_sum, evaluations) AS histogram
+    FROM histogram
+    GROUP BY 1, 2, 3
+  )
+  SELECT jsonb_build_object(
+    'agreement', COALESCE((SELECT jsonb_agg(to_jsonb(a) ORDER BY a.model_judge, a.attempt) FROM agreement a), '[]'::jsonb),
+    'pass_rate', COALESCE((SELECT jsonb_agg(to_jsonb(p) ORDER BY p.bucket, p.type) FROM pass_rate p), '[]'::jsonb),
+    'scores', COALESCE((SELECT jsonb_agg(to_jsonb(s) ORDER BY s.model, s.model_judge, s.type) FROM scores s), '[]'::jsonb)
+  );
+$$;
+
+
+ALTER FUNCTION "public"."evaluation_analytics"("p_since" "date", "p_user_id" "uuid", "p_bucket" "text") OWNER TO "postgres";
+
+
+CREATE POLICY "Service role full access evaluation score rollups" ON "public"."evaluation_score_rollups" USING (("auth"."role"() = 'service_role'::"text"));
+CREATE POLICY "Service role full access evaluation agreement rollups" ON "public"."evaluation_agreement_rollups" USING (("auth"."role"() = 'service_role'::"text"));
+CREATE POLICY "Service role full access requirement pass rollups" ON "public"."requirement_pass_rollups" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+ALTER TABLE "public"."evaluation_score_rollups" ENABLE ROW LEVEL SECURITY;
+ALTER TABLE "public"."evaluation_agreement_rollups" ENABLE ROW LEVEL SECURITY;
+ALTER TABLE "public"."requirement_pass_rollups" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."evaluation_score_rollups" TO "service_role";
+GRANT ALL ON TABLE "public"."evaluation_agreement_rollups" TO "service_role";
+GRANT ALL ON TABLE "public"."requirement_pass_rollups" TO "service_role";
+-- The rollups are only written by the trigger and the backend (the default privileges grant EXECUTE to everyone)
+REVOKE ALL ON FUNCTION "public"."apply_evaluation_rollups"("p_evaluation_ids" "uuid"[]) FROM PUBLIC, "anon", "authenticated";
+REVOKE ALL ON FUNCTION "public"."rebuild_evaluation_rollups"() FROM PUBLIC, "anon", "authenticated";
+GRANT ALL ON FUNCTION "public"."apply_evaluation_rollups"("p_evaluation_ids" "uuid"[]) TO "service_role";
+GRANT ALL ON FUNCTION "public"."rebuild_evaluation_rollups"() TO "service_role";
+GRANT ALL ON FUNCTION "public"."evaluation_analytics"("p_since" "date", "p_user_id" "uuid", "p_bucket" "text") TO "service_role";
@@ -0,0 +1,290 @@
+-- ============================================================
+-- Migration: change versions for conditional GETs
+-- Statement-level triggers bump a version whenever the data a
+-- read endpoint returns changes; the API derives weak ETags
+-- from them and answers 304 without re-reading the rows.
+--
+-- project_versions:  one row per project, bumped by any write to
+--                    the project, its requirements, conjectural
+--                    requirements or evaluations. Also keeps the
+--                    requirement counts of the project details.
+-- resource_versions: global versions of the project list
+--                    ('projects') and of the author names
+--                    ('profiles').
+--
+-- Writes to one project serialize on its version row until they
+-- commit (like allocate_requirement_codes on its counter).
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS "public"."project_versions" (
+    "project_id" "uuid" NOT NULL,
+    "version" bigint DEFAULT 0 NOT NULL,
+    "functional" integer DEFAULT 0 NOT NULL,
+    "non_functional" integer DEFAULT 0 NOT NULL,
+    "conjectural" integer DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL
+);
+
+
+ALTER TABLE "public"."project_versions" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."project_versions"
+    ADD CONSTRAINT "project_versions_pkey" PRIMARY KEY ("project_id");
+
+
+ALTER TABLE ONLY "public"."project_versions"
+    ADD CONSTRAINT "project_versions_project_id_fkey" FOREIGN KEY ("project_id") REFERENCES "public"."projects"("id") ON DELETE CASCADE;
+
+
+CREATE TABLE IF NOT EXISTS "public"."resource_versions" (
+    "resource" "text" NOT NULL,
+    "version" bigint DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL
+);
+
+
+ALTER TABLE "public"."resource_versions" OWNER TO "postgres";
+
+
+ALTER TABLE ONLY "public"."resource_versions"
+    ADD CONSTRAINT "resource_versions_pkey" PRIMARY KEY ("resource");
+
+
+-- 1. Atomic bumps. Deleting a project cascades to its requirements,
+-- whose triggers then find no project: no row is recreated for it.
+CREATE OR REPLACE FUNCTION "public"."bump_project_version"(
+    "p_project_id" "uuid",
+    "p_functional" integer DEFAULT 0,
+    "p_non_functional" integer DEFAULT 0,
+    "p_conjectural" integer DEFAULT 0
+) RETURNS "void"
+    LANGUAGE "sql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+  INSERT INTO project_versions AS pv (project_id, version, functional, non_functional, conjectural)
+  SELECT p_project_id, 1, p_functional, p_non_functional, p_conjectural
+  WHERE EXISTS (SELECT 1 FROM projects WHERE id = p_project_id)
+  ON CONFLICT (project_id) DO UPDATE
+    SET version = pv.version + 1,
+        functional = pv.functional + EXCLUDED.functional,
+        non_functional = pv.non_functional + EXCLUDED.non_functional,
+        conjectural = pv.conjectural + EXCLUDED.conjectural,
+        updated_at = now();
+$$;
+
+
+ALTER FUNCTION "public"."bump_project_version"("p_project_id" "uuid", "p_functional" integer, "p_non_functional" integer, "p_conjectural" integer) OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."bump_resource_version"("p_resource" "text") RETURNS "void"
+    LANGUAGE "sql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+  INSERT INTO resource_versions AS rv (resource, version)
+  VALUES (p_resource, 1)
+  ON CONFLICT (resource) DO UPDATE
+    SET version = rv.version + 1,
+        updated_at = now();
+$$;
+
+
+ALTER FUNCTION "public"."bump_resource_version"("p_resource" "text") OWNER TO "postgres";
+
+
+-- 2. Trigger functions. A trigger with transition tables handles a single
+-- event, so each table gets one trigger per event sharing its function
+-- (new_rows on INSERT / UPDATE, old_rows on DELETE / UPDATE).
+CREATE OR REPLACE FUNCTION "public"."projects_bump_versions"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM bump_project_version(n.id) FROM new_rows n;
+  END IF;
+  PERFORM bump_resource_version('projects');
+  RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."projects_bump_versions"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."requirements_bump_project_versions"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM bump_project_version(
+      n.project_id,
+      (count(*) FILTER (WHERE n.type = 'functional'))::integer,
+      (count(*) FILTER (WHERE n.type = 'non_functional'))::integer
+    )
+    FROM new_rows n
+    GROUP BY n.project_id;
+  END IF;
+  IF TG_OP IN ('DELETE', 'UPDATE') THEN
+    PERFORM bump_project_version(
+      o.project_id,
+      -(count(*) FILTER (WHERE o.type = 'functional'))::integer,
+      -(count(*) FILTER (WHERE o.type = 'non_functional'))::integer
+    )
+    FROM old_rows o
+    GROUP BY o.project_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."requirements_bump_project_versions"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."conjectural_requirements_bump_project_versions"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM bump_project_version(n.project_id, 0, 0, count(*)::integer)
+    FROM new_rows n
+    GROUP BY n.project_id;
+  END IF;
+  IF TG_OP IN ('DELETE', 'UPDATE') THEN
+    PERFORM bump_project_version(o.project_id, 0, 0, -count(*)::integer)
+    FROM old_rows o
+    GROUP BY o.project_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."conjectural_requirements_bump_project_versions"() OWNER TO "postgres";
+
+
+-- Evaluations deleted with their requirement are covered by the requirement's trigger
+CREATE OR REPLACE FUNCTION "public"."evaluations_bump_project_versions"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM bump_project_version(p.project_id)
+    FROM (
+      SELECT DISTINCT cr.project_id
+      FROM new_rows n
+      JOIN conjectural_requirements cr ON cr.id = n.requirement_id
+    ) p;
+  ELSE
+    PERFORM bump_project_version(p.project_id)
+    FROM (
+      SELECT DISTINCT cr.project_id
+      FROM old_rows o
+      JOIN conjectural_requirements cr ON cr.id = o.requirement_id
+    ) p;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."evaluations_bump_project_versions"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."profiles_bump_version"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    SECURITY DEFINER
+    SET "search_path" TO 'public'
+    AS $$
+BEGIN
+  PERFORM bump_resource_version('profiles');
+  RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."profiles_bump_version"() OWNER TO "postgres";
+
+
+-- 3. Triggers
+CREATE OR REPLACE TRIGGER "trg_projects_versions_insert" AFTER INSERT ON "public"."projects" REFERENCING NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."projects_bump_versions"();
+CREATE OR REPLACE TRIGGER "trg_projects_versions_update" AFTER UPDATE ON "public"."projects" REFERENCING OLD TABLE AS "old_rows" NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."projects_bump_versions"();
+CREATE OR REPLACE TRIGGER "trg_projects_versions_delete" AFTER DELETE ON "public"."projects" REFERENCING OLD TABLE AS "old_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."projects_bump_versions"();
+
+CREATE OR REPLACE TRIGGER "trg_requirements_versions_insert" AFTER INSERT ON "public"."requirements" REFERENCING NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."requirements_bump_project_versions"();
+CREATE OR REPLACE TRIGGER "trg_requirements_versions_update" AFTER UPDATE ON "public"."requirements" REFERENCING OLD TABLE AS "old_rows" NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."requirements_bump_project_versions"();
+CREATE OR REPLACE TRIGGER "trg_requirements_versions_delete" AFTER DELETE ON "public"."requirements" REFERENCING OLD TABLE AS "old_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."requirements_bump_project_versions"();
+
+CREATE OR REPLACE TRIGGER "trg_conjectural_requirements_versions_insert" AFTER INSERT ON "public"."conjectural_requirements" REFERENCING NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."conjectural_requirements_bump_project_versions"();
+CREATE OR REPLACE TRIGGER "trg_conjectural_requirements_versions_update" AFTER UPDATE ON "public"."conjectural_requirements" REFERENCING OLD TABLE AS "old_rows" NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."conjectural_requirements_bump_project_versions"();
+CREATE OR REPLACE TRIGGER "trg_conjectural_requirements_versions_delete" AFTER DELETE ON "public"."conjectural_requirements" REFERENCING OLD TABLE AS "old_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."conjectural_requirements_bump_project_versions"();
+
+CREATE OR REPLACE TRIGGER "trg_evaluations_versions_insert" AFTER INSERT ON "public"."evaluations" REFERENCING NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."evaluations_bump_project_versions"();
+CREATE OR REPLACE TRIGGER "trg_evaluations_versions_update" AFTER UPDATE ON "public"."evaluations" REFERENCING OLD TABLE AS "old_rows" NEW TABLE AS "new_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."evaluations_bump_project_versions"();
+CREATE OR REPLACE TRIGGER "trg_evaluations_versions_delete" AFTER DELETE ON "public"."evaluations" REFERENCING OLD TABLE AS "old_rows" FOR EACH STATEMENT EXECUTE FUNCTION "public"."evaluations_bump_project_versions"();
+
+CREATE OR REPLACE TRIGGER "trg_profiles_version" AFTER INSERT OR UPDATE OR DELETE ON "public"."profiles" FOR EACH STATEMENT EXECUTE FUNCTION "public"."profiles_bump_version"();
+
+
+-- 4. Backfill
+INSERT INTO "public"."project_versions" ("project_id", "version", "functional", "non_functional", "conjectural")
+SELECT p.id, 1,
+       (SELECT count(*) FROM "public"."requirements" r WHERE r.project_id = p.id AND r.type = 'functional'),
+       (SELECT count(*) FROM "public"."requirements" r WHERE r.project_id = p.id AND r.type = 'non_functional'),
+       (SELECT count(*) FROM "public"."conjectural_requirements" cr WHERE cr.project_id = p.id)
+FROM "public"."projects" p
+ON CONFLICT ("project_id") DO NOTHING;
+
+INSERT INTO "public"."resource_versions" ("resource", "version")
+VALUES ('projects', 1), ('profiles', 1)
+ON CONFLICT ("resource") DO NOTHING;
+
+
+-- 5. Versions a response depends on, in one round trip
+CREATE OR REPLACE FUNCTION "public"."get_change_versions"("p_project_id" "uuid" DEFAULT NULL) RETURNS "jsonb"
+    LANGUAGE "sql" STABLE
+    AS $$
+  SELECT jsonb_build_object(
+    'projects', COALESCE((SELECT version FROM resource_versions WHERE resource = 'projects'), 0),
+    'profiles', COALESCE((SELECT version FROM resource_versions WHERE resource = 'profiles'), 0),
+    'project', (
+      SELECT jsonb_build_object(
+        'version', pv.version,
+        'functional', pv.functional,
+        'non_functional', pv.non_functional,
+        'conjectural', pv.conjectural
+      )
+      FROM project_versions pv
+      WHERE pv.project_id = p_project_id
+    )
+  );
+$$;
+
+
+ALTER FUNCTION "public"."get_change_versions"("p_project_id" "uuid") OWNER TO "postgres";
+
+
+CREATE POLICY "Service role full access project versions" ON "public"."project_versions" USING (("auth"."role"() = 'service_role'::"text"));
+CREATE POLICY "Service role full access resource versions" ON "public"."resource_versions" USING (("auth"."role"() = 'service_role'::"text"));
+
+
+ALTER TABLE "public"."project_versions" ENABLE ROW LEVEL SECURITY;
+ALTER TABLE "public"."resource_versions" ENABLE ROW LEVEL SECURITY;
+
+
+GRANT ALL ON TABLE "public"."project_versions" TO "service_role";
+GRANT ALL ON TABLE "public"."resource_versions" TO "service_role";
+-- Versions are only bumped by the triggers, which run as the owner (the default privileges grant EXECUTE to everyone)
+REVOKE ALL ON FUNCTION "public"."bump_project_version"("p_project_id" "uuid", "p_functional" integer, "p_non_functional" integer, "p_conjectural" integer) FROM PUBLIC, "anon", "authenticated";
+REVOKE ALL ON FUNCTION "public"."bump_resource_version"("p_resource" "text") FROM PUBLIC, "anon", "authenticated";
+GRANT ALL ON FUNCTION "public"."get_change_versions"("p_project_id" "uuid") TO "service_role";